@@ -0,0 +1,553 @@
+import csv
+import datetime
+import io
+import itertools
+import json
+import random
+import re
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db.models import Sum
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from monitoring.load import summarize
+from monitoring.servers import seat_streams, servers
+from movie_shows.api.pagination import KeysetPagination
+from movie_shows.api.validators import validate_collisions
+from movie_shows.cache import get_schedule_cache
+from movie_shows.exceptions import BookingException, NoFreeSeatsException
+from movie_shows.imports import import_shows, parse_rows
+from movie_shows.models import CinemaHall, Movie, MovieShow, Order
+from movie_shows.reports import rebuild_rollups
+from movie_shows.schedule import rebuild_schedule
+from movie_shows.search import refresh_search_vectors, search_movies
+from movie_shows.services import book_seats
+from users.api.authentication import TokenExpiredAuthentication, get_token_cache
+from users.models import Customer
+
+SLOTS = [(datetime.time(hour), datetime.time(hour + 2)) for hour in range(9, 23, 2)]
+PASSWORD = 'bench-password'
+IMPORT_HALLS = 50
+IMPORT_TARGET_SECONDS = 10  # for 50k shows
+COLLISION_STEPS = 3
+REPORT_ORDERS = 100000
+POSTER_MOVIES = 10
+SEARCH_VOCABULARY = 50000
+# Relative frequency of the letters in English words.
+SEARCH_LETTERS = {'e': 12.7, 't': 9.1, 'a': 8.2, 'o': 7.5, 'i': 7.0, 'n': 6.7, 's': 6.3, 'h': 6.1, 'r': 6.0, 'd': 4.3,
+                  'l': 4.0, 'c': 2.8, 'u': 2.8, 'm': 2.4, 'w': 2.4, 'f': 2.2, 'g': 2.0, 'y': 2.0, 'p': 1.9, 'b': 1.5,
+                  'v': 1.0, 'k': 0.8, 'j': 0.2, 'x': 0.2, 'q': 0.1, 'z': 0.1}
+SEARCH_QUERIES = 100
+SEARCH_STOP_WORDS = ['the', 'of', 'and', 'a', 'to', 'in', 'is', 'it', 'that', 'was', 'he', 'for', 'on', 'are', 'as',
+                     'with', 'his', 'they', 'at', 'be', 'this', 'from', 'have', 'or', 'by', 'one', 'had', 'not', 'but',
+                     'what', 'all', 'were', 'when', 'we', 'there', 'can', 'an', 'your', 'which', 'their']
+
+
+@contextmanager
+def benchmark_database(keepdb=False):
+    old_name = connection.settings_dict['NAME']
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def load_templates():
+    with open(settings.BASE_DIR / 'cinema.json') as fixture:
+        objects = json.load(fixture)
+    templates = {}
+    for obj in objects:
+        templates.setdefault(obj['model'], []).append(obj['fields'])
+    return templates
+
+
+def seed_catalog(halls, movies, shows, customers, seed=42, batch_size=5000):
+    rng = random.Random(seed)
+    templates = load_templates()
+    today = timezone.now().date()
+
+    hall_objects = CinemaHall.objects.bulk_create([
+        CinemaHall(**{**template, 'name': f'{template["name"]} {index}'})
+        for index, template in enumerate(rng.choices(templates['movie_shows.cinemahall'], k=halls))
+    ])
+    movie_objects = Movie.objects.bulk_create([
+        Movie(**{**template, 'title': f'{template["title"]} {index}'})
+        for index, template in enumerate(rng.choices(templates['movie_shows.movie'], k=movies))
+    ], batch_size=batch_size)
+    prices = sorted({Decimal(template['ticket_price']) for template in templates['movie_shows.movieshow']})
+
+    show_objects = []
+    for index in range(shows):
+        start_date = today + datetime.timedelta(days=rng.randint(-365, 30))
+        start_time, end_time = rng.choice(SLOTS)
+        show_objects.append(MovieShow(
+                movie=rng.choice(movie_objects),
+                movie_hall=rng.choice(hall_objects),
+                start_date=start_date,
+                end_date=start_date + datetime.timedelta(days=rng.randint(0, 14)),
+                start_time=start_time,
+                end_time=end_time,
+                ticket_price=rng.choice(prices),
+        ))
+    MovieShow.objects.bulk_create(show_objects, batch_size=batch_size)
+    refresh_search_vectors(Movie.objects.all())
+    rebuild_schedule()
+    rebuild_rollups()
+
+    customer = Customer(username='bench_customer_0')
+    customer.set_password(PASSWORD)
+    Customer.objects.bulk_create([
+        Customer(username=f'bench_customer_{index}', password=customer.password) for index in range(customers)
+    ], batch_size=batch_size)
+    return {'halls': halls, 'movies': movies, 'shows': shows, 'customers': customers}
+
+
+def measure(requests, func):
+    samples = []
+    started = time.perf_counter()
+    for index in range(requests):
+        request_started = time.perf_counter()
+        func(index)
+        samples.append(time.perf_counter() - request_started)
+    elapsed = time.perf_counter() - started
+    return {**summarize(samples), 'requests_per_s': round(requests / elapsed, 1)}
+
+
+def check_status(response, expected=200):
+    if response.status_code != expected:
+        raise AssertionError(f'{response.request["PATH_INFO"]} returned {response.status_code}')
+    return response
+
+
+def fresh_token(customer):
+    # Tokens expire after TOKEN_TTL, so one left over from an earlier scenario may no longer be accepted.
+    Token.objects.filter(user=customer).delete()
+    return Token.objects.create(user=customer)
+
+
+def token_client(customer):
+    return Client(HTTP_AUTHORIZATION=f'Bearer {fresh_token(customer).key}')
+
+
+def upcoming_show_ids(limit=50):
+    return list(MovieShow.objects.filter(end_date__gte=timezone.now().date()).values_list('pk', flat=True)[:limit])
+
+
+def shows_api(options):
+    client = Client()
+    hall = CinemaHall.objects.values_list('pk', flat=True).first()
+    filters = {
+        'all': {},
+        'today': {'day': 'today'},
+        'next_day': {'day': 'next_day'},
+        'today_time_range': {'day': 'today', 'from': '10:00', 'to': '16:00'},
+        'today_hall': {'day': 'today', 'hall': hall},
+        'sort_price': {'sort_by': 'price'},
+        'sort_start_time_desc': {'sort_by': '-start_time'},
+        'cursor': {'pagination': 'cursor', 'sort_by': 'price'},
+    }
+    return {
+        name: measure(options['requests'], lambda index: check_status(client.get('/cinema/api/shows/', params)))
+        for name, params in filters.items()
+    }
+
+
+def show_list_html(options):
+    client = Client()
+
+    def uncached(index):
+        get_schedule_cache().clear()
+        check_status(client.get('/cinema/', {'page': index % 5 + 1}))
+
+    def cached(index):
+        check_status(client.get('/cinema/', {'page': index % 5 + 1}))
+
+    return {'uncached': measure(options['requests'], uncached), 'cached': measure(options['requests'], cached)}
+
+
+def login_api(options):
+    client = Client()
+    return measure(options['requests'], lambda index: check_status(client.post('/user/api/login/', {
+        'username': f'bench_customer_{index % options["customers"]}',
+        'password': PASSWORD,
+    })))
+
+
+def orders_api(options):
+    if connection.vendor == 'sqlite':
+        return {'skipped': 'needs a database that is shared between threads'}
+
+    threads = options['threads']
+    customers = list(Customer.objects.filter(username__startswith='bench_customer_')[:threads])
+    keys = [fresh_token(customer).key for customer in customers]
+    show_ids = upcoming_show_ids()
+    barrier = threading.Barrier(len(keys))
+
+    def place_orders(key):
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {key}')
+        samples = []
+        barrier.wait()
+        try:
+            for index in range(options['requests'] // len(keys)):
+                started = time.perf_counter()
+                client.post('/cinema/api/orders/', {'movie_show': show_ids[index % len(show_ids)],
+                                                    'seat_quantity': 1})
+                samples.append(time.perf_counter() - started)
+        finally:
+            connection.close()
+        return samples
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(keys)) as executor:
+        samples = sum(executor.map(place_orders, keys), [])
+    elapsed = time.perf_counter() - started
+    return {**summarize(samples), 'threads': len(keys), 'requests_per_s': round(len(samples) / elapsed, 1)}
+
+
+def bulk_orders_api(options):
+    client = token_client(Customer.objects.get(username='bench_customer_0'))
+    show_ids = upcoming_show_ids()
+    lines = [{'movie_show': show_ids[index % len(show_ids)], 'seat_quantity': 1}
+             for index in range(options['requests'])]
+    batch_size = settings.BULK_ORDER_MAX_LINES
+    batches = [lines[offset:offset + batch_size] for offset in range(0, len(lines), batch_size)]
+
+    single = measure(len(lines), lambda index: check_status(client.post('/cinema/api/orders/', lines[index]), 201))
+    bulk = measure(len(batches), lambda index: check_status(client.post(
+            '/cinema/api/orders/bulk/', {'orders': batches[index]}, content_type='application/json'), 201))
+    bulk_rate = bulk['requests_per_s'] * len(lines) / len(batches)
+    return {
+        'orders': len(lines),
+        'single': {**single, 'orders_per_s': single['requests_per_s']},
+        'bulk': {**bulk, 'batch_size': batch_size, 'orders_per_s': round(bulk_rate, 1)},
+        'speedup': round(bulk_rate / single['requests_per_s'], 1),
+    }
+
+
+def import_shows_csv(options):
+    halls = CinemaHall.objects.bulk_create([
+        CinemaHall(name=f'Import Hall {index}', seats=100) for index in range(IMPORT_HALLS)
+    ])
+    movie = Movie.objects.first()
+    start = timezone.now().date() + datetime.timedelta(days=60)
+    content = io.StringIO()
+    writer = csv.writer(content)
+    writer.writerow(['movie', 'movie_hall', 'start_date', 'end_date', 'start_time', 'end_time', 'ticket_price'])
+    for index in range(options['import_rows']):
+        hall = halls[index % len(halls)]
+        slot = index // len(halls)
+        day = start + datetime.timedelta(days=slot // len(SLOTS))
+        start_time, end_time = SLOTS[slot % len(SLOTS)]
+        writer.writerow([movie.pk, hall.pk, day, day, start_time, end_time, '10.00'])
+
+    started = time.perf_counter()
+    created = import_shows(parse_rows(content.getvalue(), 'csv'))
+    elapsed = time.perf_counter() - started
+    return {
+        'rows': created,
+        'seconds': round(elapsed, 2),
+        'rows_per_s': round(created / elapsed, 1),
+        'target_s': IMPORT_TARGET_SECONDS,
+        'within_target': elapsed <= IMPORT_TARGET_SECONDS * created / 50000,
+    }
+
+
+def reports_api(options):
+    staff = Customer.objects.get(username='bench_customer_0')
+    Customer.objects.filter(pk=staff.pk).update(is_staff=True)
+    client = token_client(staff)
+    customers = list(Customer.objects.values_list('pk', flat=True)[:options['customers']])
+    shows = list(MovieShow.objects.values_list('pk', 'ticket_price'))
+    rng = random.Random(options['seed'])
+    orders = [Order(customer_id=rng.choice(customers), movie_show_id=pk, seat_quantity=2, total_cost=price * 2)
+              for pk, price in rng.choices(shows, k=REPORT_ORDERS)]
+    Order.objects.bulk_create(orders, batch_size=5000)
+    rebuild_rollups()
+
+    reports = {
+        'revenue_by_movie': ('revenue', {'by': 'movie'}),
+        'tickets_by_show_date': ('tickets', {'by': 'show_date'}),
+        'fill_rate_by_hall': ('fill-rate', {'by': 'hall'}),
+    }
+    results = {
+        name: measure(options['requests'], lambda index: check_status(
+                client.get(f'/cinema/api/reports/{path}/', params)))
+        for name, (path, params) in reports.items()
+    }
+    # The same revenue report computed from the orders, which is what the rollups save every request.
+    results['revenue_by_movie_from_orders'] = measure(options['requests'], lambda index: list(
+            Order.objects.values('movie_show__movie').annotate(revenue=Sum('total_cost')).order_by(
+                    'movie_show__movie')))
+    return {'orders': REPORT_ORDERS, **results}
+
+
+def poster_png(rng, width=1200, height=1800):
+    # Upscaled noise compresses about as badly as a detailed poster, which is what makes PNG posters multi-megabyte.
+    small = Image.frombytes('RGB', (width // 8, height // 8), rng.randbytes(width // 8 * height // 8 * 3))
+    buffer = io.BytesIO()
+    small.resize((width, height), Image.BICUBIC).save(buffer, 'PNG')
+    return ContentFile(buffer.getvalue(), name='poster.png')
+
+
+def page_bytes(html, pattern, width):
+    total = 0
+    for srcset in re.findall(pattern, html):
+        # Like a browser, pick the smallest candidate that covers the displayed width.
+        candidates = sorted((int(size[:-1]), url) for url, size in (item.split() for item in srcset.split(', ')))
+        url = next((url for size, url in candidates if size >= width), candidates[-1][1])
+        total += default_storage.size(url[len(settings.MEDIA_URL):])
+    return total
+
+
+def movie_list_bytes(options):
+    rng = random.Random(options['seed'])
+    client = Client()
+    pages = max(1, POSTER_MOVIES // 2)
+    with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root, TASKS_EAGER=True):
+        posters = [poster_png(rng) for _ in range(POSTER_MOVIES)]
+        # Renditions are generated while the movie is saved, so this is the upload cost.
+        upload = measure(POSTER_MOVIES, lambda index: Movie.objects.create(
+                title=f'zz Poster {index:03}', description='', duration_in_minutes=120, director='Bench Director',
+                poster=posters[index]))
+        list_page = measure(options['requests'], lambda index: check_status(
+                client.get('/cinema/movies/', {'page': index % pages + 1})))
+
+        totals = {'html': 0, 'original': 0, 'webp_1x': 0, 'webp_2x': 0, 'jpeg_1x': 0}
+        for page in range(1, pages + 1):
+            response = check_status(client.get('/cinema/movies/', {'page': page}))
+            html = response.content.decode()
+            totals['html'] += len(response.content)
+            totals['original'] += sum(movie.poster.size for movie in response.context['movies'])
+            totals['webp_1x'] += page_bytes(html, r'<source type="image/webp" srcset="([^"]+)"', 250)
+            totals['webp_2x'] += page_bytes(html, r'<source type="image/webp" srcset="([^"]+)"', 500)
+            totals['jpeg_1x'] += page_bytes(html, r'<img src="[^"]+" srcset="([^"]+)"', 250)
+
+    per_page = {name: round(total / pages) for name, total in totals.items()}
+    return {
+        'pages': pages,
+        'bytes_per_page': per_page,
+        'reduction_webp_1x': round(per_page['original'] / per_page['webp_1x'], 1),
+        'upload': upload,
+        'list_page': list_page,
+    }
+
+
+def search_vocabulary(rng, size):
+    words = set()
+    for template in load_templates()['movie_shows.movie']:
+        text = ' '.join([template['title'], template['director'], template['description']])
+        words.update(re.findall(r'[a-z]+', text.lower()))
+    while len(words) < size:
+        letters = rng.choices(list(SEARCH_LETTERS), weights=list(SEARCH_LETTERS.values()), k=rng.randint(3, 10))
+        words.add(''.join(letters))
+    words = sorted(words - set(SEARCH_STOP_WORDS))
+    rng.shuffle(words)
+    # The most frequent words of real text are stop words.
+    return SEARCH_STOP_WORDS + words
+
+
+def movie_search(options):
+    rng = random.Random(options['seed'])
+    words = search_vocabulary(rng, SEARCH_VOCABULARY)
+    # Word frequencies follow Zipf's law like real text, a few words are in many titles and most are rare.
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+    names = [word.capitalize() for word in words[len(SEARCH_STOP_WORDS):5000]]
+
+    def text(count):
+        return ' '.join(rng.choices(words, cum_weights=cum_weights, k=count))
+
+    started = time.perf_counter()
+    for offset in range(0, options['search_movies'], 10000):
+        Movie.objects.bulk_create([
+            Movie(title=text(rng.randint(1, 4)).title(), description=text(rng.randint(15, 30)),
+                  duration_in_minutes=rng.randint(80, 180), director=f'{rng.choice(names)} {rng.choice(names)}')
+            for _ in range(min(10000, options['search_movies'] - offset))
+        ])
+    indexed = time.perf_counter()
+    refresh_search_vectors(Movie.objects.filter(search_vector=None))
+    finished = time.perf_counter()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('VACUUM ANALYZE movie_shows_movie')
+
+    # Searches for titles that exist, the way they are typed: a few letters, a word, then the whole title.
+    titles = Movie.objects.order_by('?').values_list('title', flat=True)[:SEARCH_QUERIES]
+    titles = [title.lower().split() for title in titles if len(title) > 3]
+    queries = {
+        'prefix_2': [title[0][:2] for title in titles],
+        'prefix_3': [title[0][:3] for title in titles],
+        'word': [title[0] for title in titles],
+        'title': [' '.join(title) for title in titles],
+        'title_typing': [' '.join(title)[:-1] for title in titles],
+    }
+    client = Client()
+    results = {
+        name: measure(options['requests'], lambda index: check_status(
+                client.get('/cinema/api/movies/search/', {'q': terms[index % len(terms)]})))
+        for name, terms in queries.items()
+    }
+    results['prefix_2_query'] = measure(options['requests'], lambda index: list(
+            search_movies(Movie.objects.all(), queries['prefix_2'][index % len(titles)])[:20]))
+    # What the admin search did before, an unindexed ILIKE over the titles.
+    results['word_title_ilike'] = measure(min(options['requests'], 20), lambda index: list(
+            Movie.objects.filter(title__icontains=queries['word'][index % len(titles)])[:20]))
+    return {
+        'movies': Movie.objects.count(),
+        'insert_s': round(indexed - started, 1),
+        'vectors_s': round(finished - indexed, 1),
+        **results,
+    }
+
+
+def token_auth(options):
+    key = fresh_token(Customer.objects.get(username='bench_customer_0')).key
+    authentication = TokenExpiredAuthentication()
+
+    def uncached(index):
+        get_token_cache().delete(key)
+        authentication.authenticate_credentials(key)
+
+    def cached(index):
+        authentication.authenticate_credentials(key)
+
+    results = {}
+    for name, func in [('uncached', uncached), ('cached', cached)]:
+        func(0)
+        with CaptureQueriesContext(connection) as queries:
+            func(0)
+        results[name] = {**measure(options['requests'], func), 'queries': len(queries)}
+    return results
+
+
+def deep_pagination(options):
+    client = Client()
+    page_size = KeysetPagination.page_size
+    page = max(2, min(options['page'], MovieShow.objects.count() // page_size))
+    results = {'page': page, 'page_size': page_size}
+    for sort_by, field in [('start_time', 'start_time'), ('price', 'ticket_price')]:
+        paginator = KeysetPagination()
+        paginator.ordering = paginator.get_ordering(MovieShow.objects.order_by(field))
+        ordering = [f'-{name}' if descending else name for name, descending in paginator.ordering]
+        boundary = MovieShow.objects.order_by(*ordering)[(page - 1) * page_size - 1]
+        cursor = paginator.encode_cursor(boundary)
+
+        results[f'offset_{sort_by}'] = measure(options['requests'], lambda index: check_status(
+                client.get('/cinema/api/shows/', {'sort_by': sort_by, 'page': page})))
+        results[f'cursor_{sort_by}'] = measure(options['requests'], lambda index: check_status(
+                client.get('/cinema/api/shows/', {'sort_by': sort_by, 'cursor': cursor})))
+    return results
+
+
+def show_collisions(options):
+    hall = CinemaHall.objects.create(name='Collision Hall', seats=100)
+    movie = Movie.objects.first()
+    today = timezone.now().date()
+    start_date = today + datetime.timedelta(days=30)
+    end_date = today + datetime.timedelta(days=40)
+    start_time, end_time = SLOTS[1]
+    validator = SimpleNamespace(instance=None)
+
+    # The hall's history grows between the measurements, the check should stay as fast.
+    history = options['collision_history']
+    checkpoints = sorted({history // 10 ** step for step in range(COLLISION_STEPS)} - {0})
+    results = {}
+    seeded = 0
+    for checkpoint in checkpoints:
+        shows = []
+        for index in range(seeded, checkpoint):
+            day = today - datetime.timedelta(days=1 + index // len(SLOTS))
+            show_start, show_end = SLOTS[index % len(SLOTS)]
+            shows.append(MovieShow(movie=movie, movie_hall=hall, start_date=day, end_date=day,
+                                   start_time=show_start, end_time=show_end, ticket_price=10))
+        MovieShow.objects.bulk_create(shows, batch_size=5000)
+        seeded = checkpoint
+        results[f'history_{checkpoint}'] = measure(options['requests'], lambda index: validate_collisions(
+                validator, hall, start_date, end_date, start_time, end_time))
+    return results
+
+
+def booking_contention(options):
+    if connection.vendor == 'sqlite':
+        return {'skipped': 'needs a database that is shared between threads'}
+
+    customers = list(Customer.objects.filter(username__startswith='bench_customer_')[:options['threads']])
+    hall = CinemaHall.objects.create(name='Booking Hall', seats=options['booking_seats'])
+    today = timezone.now().date()
+    movie_show = MovieShow.objects.create(movie=Movie.objects.first(), movie_hall=hall, start_date=today,
+                                          end_date=today, start_time='10:00', end_time='12:00', ticket_price=10)
+    barrier = threading.Barrier(len(customers))
+
+    def place_orders(customer):
+        outcomes = Counter()
+        barrier.wait()
+        try:
+            for _ in range(options['requests'] // len(customers)):
+                try:
+                    book_seats(customer, movie_show, 1)
+                    outcomes['booked'] += 1
+                except NoFreeSeatsException:
+                    outcomes['sold_out'] += 1
+                except BookingException:
+                    outcomes['conflict'] += 1
+        finally:
+            connection.close()
+        return outcomes
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(customers)) as executor:
+        outcomes = sum(executor.map(place_orders, customers), Counter())
+    elapsed = time.perf_counter() - started
+
+    movie_show.refresh_from_db()
+    ordered_seats = Order.objects.filter(movie_show=movie_show).aggregate(total=Sum('seat_quantity'))['total'] or 0
+    results = {
+        'threads': len(customers),
+        'hall_seats': hall.seats,
+        'sold_seats': movie_show.sold_seats,
+        'ordered_seats': ordered_seats,
+        'booked': outcomes['booked'],
+        'sold_out': outcomes['sold_out'],
+        'conflicts': outcomes['conflict'],
+        'attempts_per_s': round(sum(outcomes.values()) / elapsed, 1),
+        'orders_per_s': round(outcomes['booked'] / elapsed, 1),
+    }
+    if movie_show.sold_seats > hall.seats or movie_show.sold_seats != ordered_seats:
+        raise AssertionError(f'Seats were oversold: {results}')
+    return results
+
+
+SCENARIOS = {
+    'shows_api': shows_api,
+    'show_list_html': show_list_html,
+    'deep_pagination': deep_pagination,
+    'login_api': login_api,
+    'token_auth': token_auth,
+    'orders_api': orders_api,
+    'booking_contention': booking_contention,
+    'bulk_orders_api': bulk_orders_api,
+    'show_collisions': show_collisions,
+    'import_shows': import_shows_csv,
+    'reports_api': reports_api,
+    'movie_list_bytes': movie_list_bytes,
+    'movie_search': movie_search,
+    'servers': servers,
+    'seat_streams': seat_streams,
+}
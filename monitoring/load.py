@@ -0,0 +1,179 @@
+import asyncio
+import time
+
+from monitoring.stats import percentile
+
+
+class LoadError(Exception):
+    pass
+
+
+def summarize(samples):
+    return {
+        'count': len(samples),
+        'p50_ms': round(percentile(samples, 50) * 1000, 3) if samples else None,
+        'p99_ms': round(percentile(samples, 99) * 1000, 3) if samples else None,
+        'max_ms': round(max(samples) * 1000, 3) if samples else None,
+    }
+
+
+def raise_open_files_limit():
+    try:
+        import resource
+    except ImportError:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+def process_rss_mb(pid='self'):
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def process_tree_rss_mb(pid):
+    # Pre-forking servers serve from child processes, so their memory is counted too.
+    pids, total = [pid], 0
+    while pids:
+        pid = pids.pop()
+        total += process_rss_mb(pid) or 0
+        try:
+            with open(f'/proc/{pid}/task/{pid}/children') as children:
+                pids.extend(int(child) for child in children.read().split())
+        except OSError:
+            pass
+    return round(total, 1)
+
+
+async def connect(host, port, path, headers=None):
+    reader, writer = await asyncio.open_connection(host, port)
+    await send_request(writer, host, path, headers)
+    return reader, writer
+
+
+async def send_request(writer, host, path, headers=None):
+    lines = [f'GET {path} HTTP/1.1', f'Host: {host}']
+    lines.extend(f'{name}: {value}' for name, value in (headers or {}).items())
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+    await writer.drain()
+
+
+async def read_head(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise LoadError('The server closed the connection.')
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return int(status_line.split()[1]), headers
+
+
+async def read_chunk(reader):
+    size = int((await reader.readline()).split(b';')[0], 16)
+    chunk = await reader.readexactly(size + 2)
+    return chunk[:-2]
+
+
+async def read_body(reader, headers):
+    if headers.get('transfer-encoding') == 'chunked':
+        body = b''
+        while chunk := await read_chunk(reader):
+            body += chunk
+        return body
+    return await reader.readexactly(int(headers.get('content-length', 0)))
+
+
+async def iter_events(reader):
+    buffer = b''
+    while True:
+        chunk = await read_chunk(reader)
+        if not chunk:
+            return
+        buffer += chunk
+        while b'\n\n' in buffer:
+            event, buffer = buffer.split(b'\n\n', 1)
+            yield event.decode()
+
+
+async def keep_alive_client(host, port, paths, deadline, offset=0):
+    samples, errors = [], 0
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        index = offset
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await send_request(writer, host, paths[index % len(paths)])
+            status, headers = await read_head(reader)
+            await read_body(reader, headers)
+            if status == 200:
+                samples.append(time.perf_counter() - started)
+            else:
+                errors += 1
+            if headers.get('connection') == 'close':
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+            index += 1
+    finally:
+        writer.close()
+    return samples, errors
+
+
+async def run_clients(host, port, paths, clients, duration):
+    # Every client sends its requests back to back over one keep-alive connection, like a busy upstream proxy.
+    deadline = time.perf_counter() + duration
+    results = await asyncio.gather(*(keep_alive_client(host, port, paths, deadline, offset=index)
+                                     for index in range(clients)))
+    return [sample for samples, _ in results for sample in samples], sum(errors for _, errors in results)
+
+
+class EventStream:
+    def __init__(self):
+        self.ready = asyncio.Event()
+        self.updated = asyncio.Event()
+        self.updated_at = None
+        self.connected = False
+        self.closed = False
+        self.connect_time = None
+        self.error = None
+        self.keepalives = 0
+
+    async def run(self, host, port, path, semaphore):
+        writer = None
+        try:
+            async with semaphore:
+                started = time.perf_counter()
+                reader, writer = await connect(host, port, path, {'Accept': 'text/event-stream'})
+                status, _ = await read_head(reader)
+                if status != 200:
+                    raise LoadError(f'HTTP {status}')
+                events = iter_events(reader)
+                await anext(events)
+                self.connect_time = time.perf_counter() - started
+                self.connected = True
+            self.ready.set()
+            async for event in events:
+                if event.startswith(':'):
+                    self.keepalives += 1
+                elif not self.updated.is_set():
+                    self.updated_at = time.perf_counter()
+                    self.updated.set()
+            self.closed = True
+        except (OSError, EOFError, LoadError, ValueError, asyncio.IncompleteReadError) as e:
+            self.error = type(e).__name__ if not isinstance(e, LoadError) else str(e)
+            self.closed = True
+        finally:
+            self.ready.set()
+            if writer is not None:
+                writer.close()
@@ -0,0 +1,88 @@
+import json
+import subprocess
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from monitoring.benchmarks import SCENARIOS, benchmark_database, seed_catalog
+from monitoring.load import LoadError
+from monitoring.servers import SERVERS
+
+
+class Command(BaseCommand):
+    help = 'Seeds a generated catalog into a throwaway database and benchmarks the booking, listing and auth paths.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Write the results as JSON to this file.')
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the benchmark database between runs.')
+        parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                            help='Run only this scenario, can be repeated.')
+        parser.add_argument('--seed', type=int, default=42)
+
+        dataset = parser.add_argument_group('dataset')
+        dataset.add_argument('--halls', type=int, default=20)
+        dataset.add_argument('--movies', type=int, default=200)
+        dataset.add_argument('--shows', type=int, default=20000)
+        dataset.add_argument('--customers', type=int, default=50)
+
+        scenarios = parser.add_argument_group('scenarios')
+        scenarios.add_argument('--requests', type=int, default=200, help='Requests per measurement.')
+        scenarios.add_argument('--threads', type=int, default=8, help='Concurrent clients for the order benchmarks.')
+        scenarios.add_argument('--booking-seats', type=int, default=100,
+                               help='Seats of the hall every booking thread competes for.')
+        scenarios.add_argument('--page', type=int, default=1000, help='Page read by the deep pagination benchmark.')
+        scenarios.add_argument('--collision-history', type=int, default=100000,
+                               help='Past shows of the hall in the collision benchmark.')
+        scenarios.add_argument('--import-rows', type=int, default=50000, help='Rows in the show import benchmark.')
+        scenarios.add_argument('--search-movies', type=int, default=10000,
+                               help='Generated movies in the search benchmark.')
+
+        servers = parser.add_argument_group('servers')
+        servers.add_argument('--server', action='append', choices=sorted(SERVERS),
+                             help='Benchmark only this server, can be repeated.')
+        servers.add_argument('--clients', type=int, default=32, help='Concurrent keep-alive connections.')
+        servers.add_argument('--duration', type=float, default=15, help='Seconds measured per server.')
+        servers.add_argument('--warmup', type=float, default=3, help='Seconds of unmeasured load per server.')
+        servers.add_argument('--workers', type=int, default=1, help='Server processes.')
+        servers.add_argument('--server-threads', type=int, default=8, help='Threads per gunicorn worker.')
+        servers.add_argument('--port', type=int, default=8799)
+        servers.add_argument('--stream-connections', type=int, default=5000,
+                             help='Idle seat availability streams held open at once. The client and the server both '
+                                  'need an open file each, so the hard limit of ulimit -n has to allow a few more.')
+        servers.add_argument('--connect-concurrency', type=int, default=200,
+                             help='Streams being opened at any time while ramping up to --stream-connections.')
+        servers.add_argument('--stream-hold', type=float, default=20, help='Seconds to keep every stream open.')
+
+    def handle(self, *args, **options):
+        with benchmark_database(keepdb=options['keepdb']):
+            try:
+                results = self.run_benchmarks(**options)
+            except LoadError as e:
+                raise CommandError(e)
+
+        for name, value in results.items():
+            self.stdout.write(f'{name}: {value}')
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2, default=str)
+
+    def run_benchmarks(self, **options):
+        results = {
+            'commit': self.get_commit(),
+            'started_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'dataset': seed_catalog(options['halls'], options['movies'], options['shows'], options['customers'],
+                                    seed=options['seed']),
+        }
+        for name in options['scenario'] or SCENARIOS:
+            self.stderr.write(f'Running {name}...')
+            results[name] = SCENARIOS[name](options)
+        return results
+
+    def get_commit(self):
+        try:
+            commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return commit.stdout.strip()
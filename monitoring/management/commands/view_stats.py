@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from monitoring.stats import collect, summarize
+
+COLUMNS = ['view', 'requests', 'queries_p50', 'queries_max', 'db_ms_p50', 'db_ms_p99',
+           'latency_ms_p50', 'latency_ms_p95', 'latency_ms_p99', 'size_avg']
+
+
+class Command(BaseCommand):
+    help = 'Prints query count, DB time, latency and response size per view, as recorded by QueryStatsMiddleware.'
+
+    def handle(self, *args, **options):
+        rows = summarize(collect())
+        if not rows:
+            self.stdout.write('No requests have been recorded yet.')
+            return
+
+        widths = {column: max(len(column), *(len(str(row[column])) for row in rows)) for column in COLUMNS}
+        self.stdout.write('  '.join(column.ljust(widths[column]) for column in COLUMNS))
+        for row in rows:
+            self.stdout.write('  '.join(str(row[column]).ljust(widths[column]) for column in COLUMNS))
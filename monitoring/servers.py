@@ -0,0 +1,180 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models import F
+from django.urls import reverse
+
+from monitoring.load import EventStream, LoadError, process_tree_rss_mb, raise_open_files_limit, read_body, \
+    read_head, run_clients, send_request, summarize
+from movie_shows.models import CinemaHall, MovieShow
+
+HOST = '127.0.0.1'
+SERVERS = {
+    'wsgi': ['gunicorn', 'picture_palace_hub.wsgi:application', '--bind', f'{HOST}:{{port}}',
+             '--workers', '{workers}', '--threads', '{server_threads}'],
+    'asgi': ['uvicorn', 'picture_palace_hub.asgi:application', '--host', HOST, '--port', '{port}',
+             '--workers', '{workers}', '--log-level', 'warning'],
+    'asgi_async': ['uvicorn', 'picture_palace_hub.asgi:application', '--host', HOST, '--port', '{port}',
+                   '--workers', '{workers}', '--log-level', 'warning'],
+}
+SERVER_ENV = {
+    'asgi': {'ASYNC_SCHEDULE_API': '0'},
+    'asgi_async': {'ASYNC_SCHEDULE_API': '1'},
+}
+READY_TIMEOUT = 30  # seconds
+SKIPPED = {'skipped': 'needs a database that the server processes can open'}
+
+
+def schedule_paths():
+    show = MovieShow.objects.values_list('pk', flat=True).first()
+    hall = CinemaHall.objects.values_list('pk', flat=True).first()
+    shows = reverse('shows:movieshow-list')
+    return [
+        shows,
+        f'{shows}?day=today&sort_by=price',
+        f'{shows}?pagination=cursor',
+        reverse('shows:movieshow-detail', args=[show]),
+        reverse('shows:cinemahall-list'),
+        reverse('shows:cinemahall-detail', args=[hall]),
+        reverse('shows:movie-list'),
+    ]
+
+
+@contextmanager
+def running_server(name, paths, options):
+    # The servers run as separate processes, they find the benchmark database through DB_NAME.
+    env = {**os.environ, 'DB_NAME': str(connection.settings_dict['NAME']), **SERVER_ENV.get(name, {})}
+    command = [sys.executable, '-m'] + [part.format(**options) for part in SERVERS[name]]
+    with tempfile.TemporaryFile() as log:
+        process = subprocess.Popen(command, env=env, stdout=log, stderr=log)
+        try:
+            try:
+                asyncio.run(wait_until_ready(options['port'], paths))
+            except (OSError, asyncio.TimeoutError, LoadError):
+                log.seek(0)
+                raise LoadError(f'{name} did not start: {log.read().decode(errors="replace")[-2000:]}')
+            yield process
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+async def wait_until_ready(port, paths):
+    deadline = time.monotonic() + READY_TIMEOUT
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(HOST, port)
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+    try:
+        for path in paths:
+            await send_request(writer, HOST, path)
+            status, headers = await asyncio.wait_for(read_head(reader), READY_TIMEOUT)
+            await read_body(reader, headers)
+            if status != 200:
+                raise LoadError(f'{path} returned {status}')
+    finally:
+        writer.close()
+
+
+async def measure_server(pid, paths, options):
+    await run_clients(HOST, options['port'], paths, options['clients'], options['warmup'])
+    peak_rss = process_tree_rss_mb(pid)
+
+    async def sample_rss():
+        nonlocal peak_rss
+        while True:
+            await asyncio.sleep(0.5)
+            peak_rss = max(peak_rss, process_tree_rss_mb(pid))
+
+    sampler = asyncio.create_task(sample_rss())
+    try:
+        samples, errors = await run_clients(HOST, options['port'], paths, options['clients'], options['duration'])
+    finally:
+        sampler.cancel()
+    return {
+        'requests_per_s': round(len(samples) / options['duration'], 1),
+        'errors': errors,
+        'latency': summarize(samples),
+        'peak_rss_mb': peak_rss,
+    }
+
+
+def servers(options):
+    if connection.vendor == 'sqlite':
+        return SKIPPED
+    paths = schedule_paths()
+    results = {'paths': paths, 'clients': options['clients']}
+    for name in options['server'] or SERVERS:
+        with running_server(name, paths, options) as process:
+            results[name] = asyncio.run(measure_server(process.pid, paths, options))
+    return results
+
+
+async def hold_streams(show, path, pid, options):
+    semaphore = asyncio.Semaphore(options['connect_concurrency'])
+    streams = [EventStream() for _ in range(options['stream_connections'])]
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(stream.run(HOST, options['port'], path, semaphore)) for stream in streams]
+    await asyncio.gather(*(stream.ready.wait() for stream in streams))
+    ramp_up = time.perf_counter() - started
+
+    results = {
+        'path': path,
+        'connections': len(streams),
+        'connected': sum(stream.connected for stream in streams),
+        'failed': dict(Counter(stream.error for stream in streams if stream.error)),
+        'ramp_up_s': round(ramp_up, 2),
+        'connect': summarize([stream.connect_time for stream in streams if stream.connected]),
+    }
+    await asyncio.sleep(options['stream_hold'] / 2)
+    results['server_rss_mb'] = process_tree_rss_mb(pid)
+    results['fan_out'] = await time_fan_out(show, streams)
+    await asyncio.sleep(options['stream_hold'] / 2)
+
+    results['still_open'] = sum(stream.connected and not stream.closed for stream in streams)
+    results['keepalives'] = sum(stream.keepalives for stream in streams)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return results
+
+
+async def time_fan_out(show, streams):
+    live = [stream for stream in streams if stream.connected and not stream.closed]
+    if not live:
+        return None
+    updated = time.perf_counter()
+    await MovieShow.objects.filter(pk=show).aupdate(sold_seats=F('sold_seats') + 1)
+    try:
+        # Every stream has to wait out at most one poll interval, the rest is the fan-out itself.
+        await asyncio.wait([asyncio.create_task(stream.updated.wait()) for stream in live], timeout=30)
+    finally:
+        await MovieShow.objects.filter(pk=show).aupdate(sold_seats=F('sold_seats') - 1)
+    delivered = [stream.updated_at - updated for stream in live if stream.updated.is_set()]
+    return {'streams': len(live), 'missed': len(live) - len(delivered), **summarize(delivered)}
+
+
+def seat_streams(options):
+    if connection.vendor == 'sqlite':
+        return SKIPPED
+    show = MovieShow.objects.filter(sold_seats__lt=F('movie_hall__seats') - 1).values_list('pk', flat=True).first()
+    if show is None:
+        return {'skipped': 'there is no movie show with seats left to watch'}
+    limit = raise_open_files_limit()
+    if limit is not None and limit < options['stream_connections'] + 100:
+        raise LoadError(f'The open files limit is {limit}, raise it or lower --stream-connections.')
+
+    path = reverse('shows:show_seats', args=[show])
+    with running_server('asgi', schedule_paths(), options) as process:
+        return asyncio.run(hold_streams(show, path, process.pid, options))
@@ -0,0 +1,101 @@
+import math
+import os
+import socket
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.core.cache import caches
+
+WORKERS_KEY = 'query_stats:workers'
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+class ViewStats:
+    def __init__(self, max_samples):
+        self.max_samples = max_samples
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = defaultdict(int)
+        self.samples = defaultdict(lambda: deque(maxlen=self.max_samples))
+
+    def record(self, view_name, queries, db_time, latency, size):
+        with self.lock:
+            self.requests[view_name] += 1
+            self.samples[view_name].append((queries, db_time, latency, size))
+
+    def snapshot(self):
+        with self.lock:
+            return {name: {'requests': self.requests[name], 'samples': list(samples)}
+                    for name, samples in self.samples.items()}
+
+
+view_stats = ViewStats(settings.QUERY_STATS_SAMPLES)
+_last_published = 0
+
+
+def get_stats_cache():
+    return caches[settings.QUERY_STATS_CACHE_ALIAS]
+
+
+def publish(force=False):
+    global _last_published
+    now = time.monotonic()
+    if not force and now - _last_published < settings.QUERY_STATS_PUBLISH_INTERVAL:
+        return
+    _last_published = now
+
+    key = f'query_stats:{socket.gethostname()}:{os.getpid()}'
+    cache = get_stats_cache()
+    cache.set(key, view_stats.snapshot(), settings.QUERY_STATS_TTL)
+    workers = cache.get(WORKERS_KEY, set())
+    if key not in workers:
+        cache.set(WORKERS_KEY, workers | {key}, None)
+
+
+def collect():
+    cache = get_stats_cache()
+    workers = cache.get(WORKERS_KEY, set())
+    snapshots = cache.get_many(workers)
+    if len(snapshots) != len(workers):
+        cache.set(WORKERS_KEY, set(snapshots), None)
+
+    merged = defaultdict(lambda: {'requests': 0, 'samples': []})
+    for snapshot in snapshots.values():
+        for name, stats in snapshot.items():
+            merged[name]['requests'] += stats['requests']
+            merged[name]['samples'] += stats['samples']
+    return merged
+
+
+def to_ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def summarize(merged):
+    rows = []
+    for name, stats in merged.items():
+        queries, db_times, latencies, sizes = zip(*stats['samples'])
+        rows.append({
+            'view': name,
+            'requests': stats['requests'],
+            'queries_p50': percentile(queries, 50),
+            'queries_max': max(queries),
+            'db_ms_p50': to_ms(percentile(db_times, 50)),
+            'db_ms_p99': to_ms(percentile(db_times, 99)),
+            'latency_ms_p50': to_ms(percentile(latencies, 50)),
+            'latency_ms_p95': to_ms(percentile(latencies, 95)),
+            'latency_ms_p99': to_ms(percentile(latencies, 99)),
+            'size_avg': round(sum(sizes) / len(sizes)),
+        })
+    return sorted(rows, key=lambda row: row['latency_ms_p99'], reverse=True)
@@ -0,0 +1,64 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from monitoring.stats import view_stats, get_stats_cache
+from movie_shows.models import CinemaHall, Movie, MovieShow
+from movie_shows.schedule import rebuild_schedule
+from users.models import Customer
+
+
+@override_settings(QUERY_STATS_ENABLED=True)
+class QueryStatsMiddlewareTest(TestCase):
+    def setUp(self):
+        view_stats.reset()
+        get_stats_cache().clear()
+        cinema_hall = CinemaHall.objects.create(name='Test Hall', seats=100)
+        movie = Movie.objects.create(title='Test Movie', description='', duration_in_minutes=120,
+                                     director='Test Director')
+        MovieShow.objects.create(movie=movie, movie_hall=cinema_hall, start_time='12:00', end_time='14:00',
+                                 start_date=timezone.now().date(), end_date=timezone.now().date(), ticket_price=10)
+        rebuild_schedule()
+
+    def test_requests_are_recorded_per_view(self):
+        self.client.get(reverse('shows:show_list'), {'day': 'today'})
+        self.client.get(reverse('shows:show_list'), {'day': 'next_day'})
+
+        snapshot = view_stats.snapshot()
+        self.assertEqual(snapshot['shows:show_list']['requests'], 2)
+        queries, db_time, latency, size = snapshot['shows:show_list']['samples'][0]
+        self.assertEqual(queries, 3)
+        self.assertGreater(latency, db_time)
+        self.assertGreater(size, 0)
+
+    def test_stats_endpoint_is_staff_only(self):
+        customer = Customer.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_login(customer)
+        response = self.client.get(reverse('monitoring:view_stats'))
+        self.assertEqual(response.status_code, 403)
+
+    def test_stats_endpoint_reports_percentiles(self):
+        self.client.get(reverse('shows:show_list'))
+        staff = Customer.objects.create_user(username='staff', password='testpassword', is_staff=True)
+        self.client.force_login(staff)
+
+        response = self.client.get(reverse('monitoring:view_stats'))
+        self.assertEqual(response.status_code, 200)
+        rows = {row['view']: row for row in response.json()['views']}
+        self.assertEqual(rows['shows:show_list']['requests'], 1)
+        self.assertEqual(rows['shows:show_list']['queries_max'], 2)
+        self.assertIn('latency_ms_p99', rows['shows:show_list'])
+
+    def test_command_prints_table(self):
+        self.client.get(reverse('shows:show_list'))
+        staff = Customer.objects.create_user(username='staff', password='testpassword', is_staff=True)
+        self.client.force_login(staff)
+        self.client.get(reverse('monitoring:view_stats'))
+
+        out = StringIO()
+        call_command('view_stats', stdout=out)
+        self.assertIn('shows:show_list', out.getvalue())
+        self.assertIn('latency_ms_p99', out.getvalue())
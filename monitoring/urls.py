@@ -0,0 +1,9 @@
+from django.urls import path
+
+from monitoring.views import ViewStatsView
+
+app_name = 'monitoring'
+
+urlpatterns = [
+    path('stats/', ViewStatsView.as_view(), name='view_stats'),
+]
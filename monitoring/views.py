@@ -0,0 +1,16 @@
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.http import JsonResponse
+from django.views import View
+
+from monitoring.stats import collect, publish, summarize
+
+
+class ViewStatsView(UserPassesTestMixin, View):
+    raise_exception = True
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        publish(force=True)
+        return JsonResponse({'views': summarize(collect())})
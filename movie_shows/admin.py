@@ -2,6 +2,7 @@ from django.contrib import admin
 from rest_framework.authtoken.models import Token
 
 from movie_shows.models import Movie, CinemaHall, MovieShow, Order
+from movie_shows.search import match_movies
 
 
 @admin.register(Movie)
@@ -10,6 +11,12 @@ class MovieAdmin(admin.ModelAdmin):
     list_filter = ['title', 'duration_in_minutes']
     search_fields = ['title']
 
+    def get_search_results(self, request, queryset, search_term):
+        # Matches the indexed search vector instead of an ILIKE over every title.
+        if not search_term.strip():
+            return queryset, False
+        return match_movies(queryset, search_term), False
+
 
 @admin.register(CinemaHall)
 class CinemaHallAdmin(admin.ModelAdmin):
@@ -1,3 +1,7 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.utils.decorators import classonlymethod
 from rest_framework import status
 from rest_framework.response import Response
 
@@ -14,9 +18,69 @@ class CheckSoldSeatsMixin(object):
                                 status=status.HTTP_400_BAD_REQUEST)
 
         elif isinstance(instance, CinemaHall):
-            booked_shows = MovieShow.objects.filter(movie_hall=instance, sold_seats__gt=0)
-            if booked_shows.exists():
+            if instance.has_booked_shows():
                 return Response({'detail': 'Cannot delete a movie hall with booked movie shows.'},
                                 status=status.HTTP_400_BAD_REQUEST)
 
         return super().destroy(request, *args, **kwargs)
+
+
+class AsyncReadMixin(object):
+    # list and retrieve run on the event loop under ASGI, every other action keeps its sync code and gets a thread.
+
+    @classonlymethod
+    def as_view(cls, actions=None, **initkwargs):
+        return markcoroutinefunction(super().as_view(actions, **initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Authenticating a token can look it up in the database.
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(await self.aget_queryset())
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+            if page is not None:
+                return self.get_paginated_response(await self.aserialize(page, many=True))
+        return Response(await self.aserialize([row async for row in queryset], many=True))
+
+    async def retrieve(self, request, *args, **kwargs):
+        return Response(await self.aserialize(await self.aget_object()))
+
+    async def aget_queryset(self):
+        return self.get_queryset()
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(await self.aget_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, ValidationError, TypeError, ValueError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def aserialize(self, instance, many=False):
+        # The read serializers only use rows fetched above, a query slipping in here raises SynchronousOnlyOperation.
+        return self.get_serializer(instance, many=many).data
@@ -0,0 +1,125 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    keyset_by_default = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_keyset = self.wants_keyset(request)
+        if not self.use_keyset:
+            return super().paginate_queryset(queryset, request, view)
+        return self.set_keyset_page(list(self.get_keyset_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.use_keyset = self.wants_keyset(request)
+        if self.use_keyset:
+            return self.set_keyset_page([row async for row in self.get_keyset_queryset(queryset, request)])
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator counts with a blocking query the first time it needs to, so the count is filled in up front.
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [row async for row in self.page.object_list]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return list(self.page)
+
+    def wants_keyset(self, request):
+        return (self.keyset_by_default
+                or request.query_params.get(self.mode_query_param) == 'cursor'
+                or self.cursor_query_param in request.query_params)
+
+    def get_keyset_queryset(self, queryset, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*[f'-{name}' if descending else name for name, descending in self.ordering])
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            queryset = queryset.filter(self.get_keyset_filter(self.decode_cursor(queryset.model, encoded)))
+        return queryset[:self.page_size + 1]
+
+    def set_keyset_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        if not self.use_keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.use_keyset:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_previous_link(self):
+        if self.use_keyset:
+            return None
+        return super().get_previous_link()
+
+    def get_ordering(self, queryset):
+        ordering = []
+        for name in queryset.query.order_by or queryset.model._meta.ordering:
+            if not isinstance(name, str) or name == '?':
+                raise NotFound('Cursor pagination does not support this ordering.')
+            descending = name.startswith('-')
+            ordering.append((name.lstrip('-'), descending))
+
+        if not any(name in ('pk', queryset.model._meta.pk.name) for name, _ in ordering):
+            ordering.append(('pk', ordering[0][1] if ordering else False))
+        return ordering
+
+    def get_keyset_filter(self, values):
+        condition = Q()
+        for index, (name, descending) in enumerate(self.ordering):
+            term = Q(**{f'{name}__{"lt" if descending else "gt"}': values[index]})
+            for previous_index, (previous_name, _) in enumerate(self.ordering[:index]):
+                term &= Q(**{previous_name: values[previous_index]})
+            condition |= term
+        return condition
+
+    def get_field(self, model, name):
+        return model._meta.pk if name == 'pk' else model._meta.get_field(name)
+
+    def encode_cursor(self, instance):
+        values = [self.get_field(type(instance), name).value_to_string(instance) for name, _ in self.ordering]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, model, encoded):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return [self.get_field(model, name).to_python(value) for (name, _), value in zip(self.ordering, values)]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
@@ -1,38 +1,77 @@
-from datetime import timedelta
-
-from django.db import transaction
-from django.db.models import Q
-from django.utils import timezone
-from django.utils.datetime_safe import datetime
-from rest_framework import viewsets, serializers, mixins
-from rest_framework.permissions import IsAuthenticated
-
-from movie_shows.api.mixins import CheckSoldSeatsMixin
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from rest_framework import viewsets, serializers, mixins, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+
+from movie_shows.api.mixins import AsyncReadMixin, CheckSoldSeatsMixin
+from movie_shows.api.pagination import KeysetPagination
 from movie_shows.api.serializers import CinemaHallWriteSerializer, CinemaHallReadSerializer, MovieShowWriteSerializer, \
-    MovieShowReadSerializer, MovieReadSerializer, OrderWriteSerializer
+    MovieShowReadSerializer, MovieReadSerializer, MovieSearchSerializer, OrderWriteSerializer, OrderReadSerializer, \
+    BulkOrderSerializer, OrderExportSerializer, ReportQuerySerializer, ReportRowSerializer
+from movie_shows.exceptions import BookingException, ShowImportException
+from movie_shows.exports import CONTENT_TYPES, astream_orders, export_queryset, stream_orders
+from movie_shows.imports import import_shows, parse_rows
 from movie_shows.models import CinemaHall, MovieShow, Movie, Order
+from movie_shows.reports import sales_report
+from movie_shows.schedule import filter_shows
+from movie_shows.search import search_movies
+from movie_shows.services import book_seats, book_many
+from movie_shows.tasks import export_orders
 from users.api.permissions import IsAdminOrReadOnly
 
 
 class MovieViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Movie.objects.all()
     permission_classes = [IsAdminOrReadOnly]
+    pagination_class = KeysetPagination
     serializer_class = MovieReadSerializer
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        params = MovieSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        movies = search_movies(self.get_queryset(), params.validated_data['q'])[:params.validated_data['limit']]
+        return Response({'results': self.get_serializer(movies, many=True).data})
+
 
 class CinemaHallViewSet(CheckSoldSeatsMixin, viewsets.ModelViewSet):
     queryset = CinemaHall.objects.all()
     permission_classes = [IsAdminOrReadOnly]
+    pagination_class = KeysetPagination
 
     def get_serializer_class(self):
         if self.request.method in ['POST', 'PUT', 'PATCH', 'DELETE']:
             return CinemaHallWriteSerializer
         return CinemaHallReadSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method == 'GET' and self.action != 'shows':
+            upcoming = MovieShow.objects.upcoming(settings.HALL_UPCOMING_SHOWS_DAYS).select_related('movie')
+            queryset = queryset.prefetch_related(Prefetch(
+                    'shows',
+                    queryset=upcoming[:settings.HALL_UPCOMING_SHOWS_LIMIT],
+                    to_attr='upcoming_shows',
+            ))
+        return queryset
+
+    @action(detail=True, methods=['get'])
+    def shows(self, request, pk=None):
+        queryset = self.get_object().shows.select_related('movie').order_by('-start_date', '-start_time', '-id')
+        page = self.paginate_queryset(queryset)
+        serializer = MovieShowReadSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+
 
 class MovieShowViewSet(CheckSoldSeatsMixin, viewsets.ModelViewSet):
     queryset = MovieShow.objects.all()
     permission_classes = [IsAdminOrReadOnly]
+    pagination_class = KeysetPagination
 
     def get_serializer_class(self):
         if self.request.method in ['POST', 'PUT', 'PATCH', 'DELETE']:
@@ -42,43 +81,22 @@ class MovieShowViewSet(CheckSoldSeatsMixin, viewsets.ModelViewSet):
     def get_queryset(self):
         queryset = MovieShow.objects.all()
         if self.request.method == 'GET':
-            if self.request.query_params.get('day') == 'today':
-                today = timezone.now().date()
-                queryset = queryset.filter(start_date__lte=today, end_date__gte=today).order_by('start_time')
-
-                from_time = self.request.query_params.get('from', None)
-                to_time = self.request.query_params.get('to', None)
-                hall = self.request.query_params.get('hall', None)
-
-                if from_time and to_time:
-                    from_time = datetime.strptime(from_time, "%H:%M").time()
-                    to_time = datetime.strptime(to_time, "%H:%M").time()
-                    queryset = queryset.filter(
-                            (Q(start_time__gte=from_time) & Q(start_time__lte=to_time))
-                    ).order_by('start_time')
-
-                if hall:
-                    queryset = queryset.filter(movie_hall=hall).order_by('start_time')
-
-            elif self.request.query_params.get('day') == 'next_day':
-                next_day = timezone.now().date() + timedelta(days=1)
-                queryset = queryset.filter(
-                        start_date__lte=next_day,
-                        end_date__gte=next_day
-                )
-
-            sort_by = self.request.query_params.get('sort_by')
-            if sort_by == 'start_time':
-                queryset = queryset.order_by('start_time')
-            elif sort_by == '-start_time':
-                queryset = queryset.order_by('-start_time')
-            elif sort_by == 'price':
-                queryset = queryset.order_by('ticket_price')
-            elif sort_by == '-price':
-                queryset = queryset.order_by('-ticket_price')
-
+            queryset = filter_shows(queryset.for_listing(), self.request.query_params)
         return queryset
 
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_shows(self, request):
+        upload = request.FILES.get('file')
+        try:
+            if upload:
+                rows = parse_rows(upload.read(), 'json' if upload.name.endswith('.json') else 'csv')
+            else:
+                rows = request.data if isinstance(request.data, list) else request.data.get('shows')
+            created = import_shows(rows, dry_run=request.query_params.get('dry_run') == '1')
+        except ShowImportException as e:
+            return Response({'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'created': created}, status=status.HTTP_201_CREATED)
+
 
 class OrderViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     queryset = Order.objects.all()
@@ -87,17 +105,101 @@ class OrderViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
 
     def perform_create(self, serializer):
         try:
-            movie_show = serializer.validated_data['movie_show']
-            seat_quantity = serializer.validated_data['seat_quantity']
-
-            movie_show.sold_seats += seat_quantity
-            total_cost = seat_quantity * movie_show.ticket_price
-            customer = self.request.user
-            customer.balance -= total_cost
-
-            with transaction.atomic():
-                serializer.save(customer=self.request.user, total_cost=total_cost)
-                customer.save()
-                movie_show.save()
-        except Exception as e:
+            serializer.instance = book_seats(
+                    customer=self.request.user,
+                    movie_show=serializer.validated_data['movie_show'],
+                    seat_quantity=serializer.validated_data['seat_quantity'],
+            )
+        except BookingException as e:
             raise serializers.ValidationError(str(e))
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        serializer = BulkOrderSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        try:
+            results = book_many(serializer.validated_data['orders'])
+        except BookingException as e:
+            raise serializers.ValidationError(str(e))
+
+        lines = []
+        for index, result in enumerate(results):
+            if isinstance(result, Order):
+                lines.append({'line': index, 'order': OrderReadSerializer(result).data})
+            else:
+                lines.append({'line': index, 'error': str(result)})
+        created = sum('order' in line for line in lines)
+        return Response(
+                {'created': created, 'failed': len(lines) - created, 'results': lines},
+                status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST,
+        )
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def export(self, request):
+        # The format is read from ?output= because DRF reserves ?format= for picking a renderer.
+        serializer = OrderExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        output = serializer.validated_data.pop('output')
+
+        if serializer.validated_data.pop('background'):
+            # Large exports are written to MEDIA_ROOT by a worker, the task status links to the file once done.
+            filters = serializer.validated_data
+            job = export_orders.delay(
+                    output,
+                    start_date=str(filters['start_date']) if 'start_date' in filters else None,
+                    end_date=str(filters['end_date']) if 'end_date' in filters else None,
+                    hall=filters.get('hall'),
+            )
+            return Response({'task': job.pk, 'status_url': reverse('tasks:task_status', args=[job.pk])},
+                            status=status.HTTP_202_ACCEPTED)
+
+        queryset = export_queryset(**serializer.validated_data)
+        # Under ASGI a sync iterator would be read into a list first, so the rows are streamed from an async one.
+        # Only a WSGI server puts the wsgi.* keys into the environ.
+        if 'wsgi.version' in request.META:
+            stream = stream_orders(queryset, output)
+        else:
+            stream = astream_orders(queryset, output)
+        response = StreamingHttpResponse(stream, content_type=CONTENT_TYPES[output])
+        response['Content-Disposition'] = f'attachment; filename="orders.{output}"'
+        return response
+
+
+class ReportViewSet(viewsets.ViewSet):
+    permission_classes = [IsAdminUser]
+
+    def report(self, request, metric):
+        query = ReportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        rows = sales_report(metric, **query.validated_data)
+        return Response({
+            'metric': metric,
+            'by': query.validated_data['by'],
+            'results': ReportRowSerializer(rows, many=True).data,
+        })
+
+    @action(detail=False, methods=['get'])
+    def revenue(self, request):
+        return self.report(request, 'revenue')
+
+    @action(detail=False, methods=['get'])
+    def tickets(self, request):
+        return self.report(request, 'tickets')
+
+    @action(detail=False, methods=['get'], url_path='fill-rate')
+    def fill_rate(self, request):
+        return self.report(request, 'fill_rate')
+
+
+class AsyncMovieViewSet(AsyncReadMixin, MovieViewSet):
+    pass
+
+
+class AsyncCinemaHallViewSet(AsyncReadMixin, CinemaHallViewSet):
+    pass
+
+
+class AsyncMovieShowViewSet(AsyncReadMixin, MovieShowViewSet):
+    async def aget_queryset(self):
+        # filter_shows looks up whether a schedule day is materialized.
+        return await sync_to_async(self.get_queryset)()
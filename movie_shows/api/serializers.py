@@ -1,14 +1,24 @@
+from django.conf import settings
 from rest_framework import serializers
 
 from movie_shows.api.validators import validate_collisions, validate_past_date, validate_time_range, \
     validate_date_range, check_balance, validate_available_seats
+from movie_shows.exports import CONTENT_TYPES
+from movie_shows.renditions import poster_sources
+from movie_shows.reports import DIMENSIONS
 from movie_shows.models import CinemaHall, MovieShow, Movie, Order
 
 
 class MovieReadSerializer(serializers.ModelSerializer):
+    poster_srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = Movie
-        fields = ['id', 'title', 'description', 'duration_in_minutes', 'director']
+        fields = ['id', 'title', 'description', 'duration_in_minutes', 'director', 'poster', 'poster_srcset']
+
+    def get_poster_srcset(self, movie):
+        # Empty until the worker has resized the poster, clients show the original file meanwhile.
+        return {source['format']: source['srcset'] for source in poster_sources(movie)}
 
 
 class MovieShowReadSerializer(serializers.ModelSerializer):
@@ -41,15 +51,21 @@ class MovieShowWriteSerializer(serializers.ModelSerializer):
         validate_time_range(start_time, end_time)
         validate_past_date(end_date)
 
-        if self.instance:
-            if self.instance.sold_seats > 0:
-                raise serializers.ValidationError('You cannot delete or update a movie show with sold seats.')
-            validate_collisions(self, movie_hall, start_date, end_date, start_time, end_time)
+        if self.instance and self.instance.sold_seats > 0:
+            raise serializers.ValidationError('You cannot delete or update a movie show with sold seats.')
+        validate_collisions(self, movie_hall, start_date, end_date, start_time, end_time)
         return data
 
 
 class CinemaHallReadSerializer(serializers.ModelSerializer):
-    shows = MovieShowReadSerializer(many=True, read_only=True)
+    shows = serializers.SerializerMethodField()
+
+    def get_shows(self, obj):
+        shows = getattr(obj, 'upcoming_shows', None)
+        if shows is None:
+            shows = obj.shows.upcoming(settings.HALL_UPCOMING_SHOWS_DAYS).select_related('movie')[
+                    :settings.HALL_UPCOMING_SHOWS_LIMIT]
+        return MovieShowReadSerializer(shows, many=True, context=self.context).data
 
     class Meta:
         model = CinemaHall
@@ -62,7 +78,7 @@ class CinemaHallWriteSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'seats', 'screen_size', 'screen_type']
 
     def validate(self, data):
-        if any([show.sold_seats > 0 for show in self.instance.shows.all()]):
+        if self.instance and self.instance.has_booked_shows():
             raise serializers.ValidationError('You cannot modify a cinema hall with booked shows.')
         return data
 
@@ -93,3 +109,68 @@ class OrderWriteSerializer(serializers.ModelSerializer):
         check_balance(movie_show, seat_quantity, customer=self.context['request'].user)
 
         return data
+
+
+class BulkOrderLineSerializer(serializers.Serializer):
+    movie_show = serializers.IntegerField(min_value=1)
+    seat_quantity = serializers.IntegerField(min_value=1)
+    customer = serializers.IntegerField(min_value=1, required=False)
+
+
+class BulkOrderSerializer(serializers.Serializer):
+    orders = BulkOrderLineSerializer(many=True, allow_empty=False)
+
+    def validate_orders(self, orders):
+        if len(orders) > settings.BULK_ORDER_MAX_LINES:
+            raise serializers.ValidationError(f'Please submit at most {settings.BULK_ORDER_MAX_LINES} orders at once.')
+
+        user = self.context['request'].user
+        for line in orders:
+            line.setdefault('customer', user.pk)
+            if line['customer'] != user.pk and not user.is_staff:
+                raise serializers.ValidationError('You can only place orders for yourself.')
+        return orders
+
+
+class OrderExportSerializer(serializers.Serializer):
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    hall = serializers.IntegerField(min_value=1, required=False)
+    output = serializers.ChoiceField(choices=list(CONTENT_TYPES), default='csv')
+    background = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        validate_date_range(data.get('start_date'), data.get('end_date'))
+        return data
+
+
+class MovieSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=settings.SEARCH_RESULTS_LIMIT)
+
+
+class ReportQuerySerializer(serializers.Serializer):
+    by = serializers.ChoiceField(choices=list(DIMENSIONS), default='show_date')
+    # The dates are those the shows start on, which is also the day their orders are counted on.
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    movie = serializers.IntegerField(min_value=1, required=False)
+    hall = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, data):
+        validate_date_range(data.get('start_date'), data.get('end_date'))
+        return data
+
+
+class ReportRowSerializer(serializers.Serializer):
+    show_date = serializers.DateField(required=False)
+    movie = serializers.IntegerField(required=False)
+    movie_title = serializers.CharField(required=False)
+    movie_hall = serializers.IntegerField(required=False)
+    movie_hall_name = serializers.CharField(required=False)
+    shows = serializers.IntegerField(required=False)
+    orders = serializers.IntegerField(required=False)
+    tickets = serializers.IntegerField(required=False)
+    capacity = serializers.IntegerField(required=False)
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2, required=False)
+    fill_rate = serializers.FloatField(required=False)
@@ -0,0 +1,74 @@
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from movie_shows.api.resources import MovieShowViewSet, CinemaHallViewSet
+from movie_shows.models import CinemaHall, Movie, MovieShow
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.cinema_hall = CinemaHall.objects.create(name='Test Hall', seats=100)
+        self.movie = Movie.objects.create(title='Test Movie', description='', duration_in_minutes=120,
+                                          director='Test Director')
+        today = timezone.now().date()
+        for index in range(40):
+            MovieShow.objects.create(
+                    movie=self.movie,
+                    movie_hall=self.cinema_hall,
+                    start_time=f'{10 + index % 4}:00',
+                    start_date=today,
+                    end_time=f'{11 + index % 4}:00',
+                    end_date=today,
+                    ticket_price=5 + index % 3,
+            )
+
+    def crawl(self, view, params):
+        response = view(self.factory.get('/api/shows/', params))
+        ids = []
+        pages = 0
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            ids.extend(item['id'] for item in response.data['results'])
+            pages += 1
+            if not response.data['next']:
+                return ids, pages
+            response = view(self.factory.get(response.data['next']))
+
+    def test_default_is_page_number_pagination(self):
+        view = MovieShowViewSet.as_view({'get': 'list'})
+        response = view(self.factory.get('/api/shows/'))
+        self.assertEqual(response.data['count'], 40)
+
+    def test_cursor_crawl_visits_every_show_once(self):
+        view = MovieShowViewSet.as_view({'get': 'list'})
+        ids, pages = self.crawl(view, {'pagination': 'cursor'})
+        self.assertEqual(pages, 3)
+        self.assertEqual(sorted(ids), sorted(MovieShow.objects.values_list('id', flat=True)))
+
+    def test_cursor_crawl_is_stable_under_sort_options(self):
+        view = MovieShowViewSet.as_view({'get': 'list'})
+        orderings = {
+            'start_time': ['start_time', 'pk'],
+            '-start_time': ['-start_time', '-pk'],
+            'price': ['ticket_price', 'pk'],
+            '-price': ['-ticket_price', '-pk'],
+        }
+        for sort_by, ordering in orderings.items():
+            ids, _ = self.crawl(view, {'pagination': 'cursor', 'sort_by': sort_by})
+            self.assertEqual(ids, list(MovieShow.objects.order_by(*ordering).values_list('id', flat=True)))
+
+    def test_cursor_crawl_over_model_ordering(self):
+        for index in range(20):
+            CinemaHall.objects.create(name=f'Hall {index}', seats=50 + index % 2)
+        view = CinemaHallViewSet.as_view({'get': 'list'})
+        ids, _ = self.crawl(view, {'pagination': 'cursor'})
+        self.assertEqual(ids, list(CinemaHall.objects.order_by('seats', 'name', 'pk').values_list('id', flat=True)))
+
+    def test_invalid_cursor(self):
+        view = MovieShowViewSet.as_view({'get': 'list'})
+        response = view(self.factory.get('/api/shows/', {'cursor': 'not-a-cursor'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
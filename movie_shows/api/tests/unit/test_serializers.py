@@ -1,4 +1,5 @@
 from django.test import TestCase
+from django.utils import timezone
 
 from movie_shows.api.serializers import MovieReadSerializer, MovieShowReadSerializer, MovieShowWriteSerializer, \
     CinemaHallReadSerializer, CinemaHallWriteSerializer
@@ -19,7 +20,8 @@ class MovieReadSerializerTest(TestCase):
 
     def test_serializer_contains_expected_fields(self):
         data = self.serializer.data
-        self.assertEqual(set(data.keys()), {'id', 'title', 'description', 'duration_in_minutes', 'director'})
+        self.assertEqual(set(data.keys()), {'id', 'title', 'description', 'duration_in_minutes', 'director', 'poster',
+                                            'poster_srcset'})
 
     def test_serializer_data_matches_movie_instance(self):
         data = self.serializer.data
@@ -128,14 +130,24 @@ class CinemaHallReadSerializerTests(TestCase):
                 screen_type='2D'
         )
 
+        today = timezone.now().date()
         self.movie_show = MovieShow.objects.create(
+                movie=self.movie,
+                movie_hall=self.cinema_hall,
+                start_time='12:00:00',
+                start_date=today,
+                end_time='14:30:00',
+                end_date=today,
+                sold_seats=10,
+                ticket_price='15.00'
+        )
+        MovieShow.objects.create(
                 movie=self.movie,
                 movie_hall=self.cinema_hall,
                 start_time='12:00:00',
                 start_date='2023-12-25',
                 end_time='14:30:00',
                 end_date='2023-12-25',
-                sold_seats=10,
                 ticket_price='15.00'
         )
 
@@ -148,7 +160,7 @@ class CinemaHallReadSerializerTests(TestCase):
             'shows': [{
                 'id': self.movie_show.id, 'movie': 'Test Movie', 'movie_hall': 'Test Hall',
                 'start_time': '12:00:00',
-                'start_date': '2023-12-25', 'end_time': '14:30:00', 'end_date': '2023-12-25',
+                'start_date': today.isoformat(), 'end_time': '14:30:00', 'end_date': today.isoformat(),
                 'sold_seats': 10,
                 'ticket_price': '15.00'}]
         }
@@ -193,3 +205,15 @@ class CinemaHallWriteSerializerTests(TestCase):
         validated_data = self.serializer.validated_data
         for key, value in self.serializer_data.items():
             self.assertEqual(validated_data[key], value)
+
+    def test_serializer_rejects_hall_with_booked_shows(self):
+        movie = Movie.objects.create(title='Test Movie', description='', duration_in_minutes=120,
+                                     director='Test Director')
+        MovieShow.objects.create(movie=movie, movie_hall=self.cinema_hall, start_time='12:00:00',
+                                 start_date='2023-12-25', end_time='14:30:00', end_date='2023-12-25',
+                                 sold_seats=1, ticket_price='15.00')
+        self.assertFalse(self.serializer.is_valid())
+
+    def test_serializer_creates_new_hall(self):
+        serializer = CinemaHallWriteSerializer(data=self.serializer_data)
+        self.assertTrue(serializer.is_valid())
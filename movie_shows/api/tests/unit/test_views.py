@@ -1,9 +1,25 @@
-from django.test import TestCase
+import csv
+import io
+import json
+from urllib.parse import urlencode
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.handlers.asgi import ASGIRequest
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APIRequestFactory, force_authenticate
 from rest_framework import status
-from movie_shows.models import CinemaHall
-from movie_shows.api.resources import CinemaHallViewSet
+from movie_shows.models import CinemaHall, Movie, MovieShow, Order
+from movie_shows.api.resources import AsyncCinemaHallViewSet, AsyncMovieShowViewSet, AsyncMovieViewSet, \
+    CinemaHallViewSet, MovieShowViewSet, MovieViewSet, OrderViewSet, ReportViewSet
 from movie_shows.api.serializers import CinemaHallReadSerializer, CinemaHallWriteSerializer
+from movie_shows.schedule import rebuild_schedule
+from movie_shows.services import book_seats
+from movie_shows.tasks import export_orders
+from tasks.models import Task
 from users.models import Customer
 
 
@@ -31,3 +47,387 @@ class CinemaHallViewSetTests(TestCase):
         force_authenticate(request, user=self.non_admin_user)
         response = view(request)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class MovieShowViewSetQueryBudgetTests(TestCase):
+    QUERY_BUDGET = 2
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        for index in range(20):
+            hall = CinemaHall.objects.create(name=f'Hall {index}', seats=100)
+            movie = Movie.objects.create(title=f'Movie {index}', description='', duration_in_minutes=120,
+                                         director='Test Director')
+            MovieShow.objects.create(movie=movie, movie_hall=hall, start_time='12:00', start_date=timezone.now().date(),
+                                     end_time='14:00', end_date=timezone.now().date(), ticket_price=10.00)
+        rebuild_schedule()
+
+    def test_list_query_budget(self):
+        view = MovieShowViewSet.as_view({'get': 'list'})
+        request = self.factory.get('/api/shows/')
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            response = view(request)
+            response.render()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['movie'], 'Movie 0')
+
+    def test_filtered_list_query_budget(self):
+        view = MovieShowViewSet.as_view({'get': 'list'})
+        request = self.factory.get('/api/shows/', {'day': 'today', 'from': '10:00', 'to': '13:00', 'sort_by': 'price'})
+        # The day filter also looks up whether the day is materialized.
+        with self.assertNumQueries(self.QUERY_BUDGET + 1):
+            response = view(request)
+            response.render()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 20)
+
+
+class AsyncReadViewSetTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.admin_user = Customer.objects.create(username='admin', is_staff=True, is_superuser=True)
+        self.hall = CinemaHall.objects.create(name='Test Hall', seats=100)
+        self.movie = Movie.objects.create(title='Test Movie', description='', duration_in_minutes=120,
+                                          director='Test Director')
+        today = timezone.now().date()
+        self.shows = [
+            MovieShow.objects.create(movie=self.movie, movie_hall=self.hall, start_time=f'{hour:02}:00',
+                                     end_time=f'{hour:02}:30', start_date=today, end_date=today,
+                                     ticket_price=30 - hour)
+            for hour in range(20)
+        ]
+
+    def get(self, viewset, action, path, params=None, **kwargs):
+        view = viewset.as_view({'get': action})
+        if iscoroutinefunction(view):
+            view = async_to_sync(view)
+        response = view(self.factory.get(path, params), **kwargs)
+        response.render()
+        return response
+
+    def test_reads_match_the_sync_viewsets(self):
+        requests = [
+            (MovieShowViewSet, AsyncMovieShowViewSet, 'list', '/api/shows/', {}, {}),
+            (MovieShowViewSet, AsyncMovieShowViewSet, 'list', '/api/shows/', {'page': 2}, {}),
+            (MovieShowViewSet, AsyncMovieShowViewSet, 'list', '/api/shows/', {'day': 'today', 'sort_by': 'price'}, {}),
+            (MovieShowViewSet, AsyncMovieShowViewSet, 'list', '/api/shows/', {'pagination': 'cursor'}, {}),
+            (MovieShowViewSet, AsyncMovieShowViewSet, 'retrieve', '/api/shows/', {}, {'pk': self.shows[0].pk}),
+            (CinemaHallViewSet, AsyncCinemaHallViewSet, 'list', '/api/halls/', {}, {}),
+            (CinemaHallViewSet, AsyncCinemaHallViewSet, 'retrieve', '/api/halls/', {}, {'pk': self.hall.pk}),
+            (MovieViewSet, AsyncMovieViewSet, 'list', '/api/movies/', {}, {}),
+        ]
+        for sync_viewset, async_viewset, action, path, params, kwargs in requests:
+            with self.subTest(viewset=sync_viewset.__name__, action=action, **params):
+                expected = self.get(sync_viewset, action, path, params, **kwargs)
+                response = self.get(async_viewset, action, path, params, **kwargs)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.content, expected.content)
+
+    def test_list_query_budget(self):
+        rebuild_schedule()
+        with self.assertNumQueries(MovieShowViewSetQueryBudgetTests.QUERY_BUDGET + 1):
+            response = self.get(AsyncMovieShowViewSet, 'list', '/api/shows/', {'day': 'today'})
+        self.assertEqual(response.data['count'], 20)
+
+    def test_missing_rows_are_not_found(self):
+        self.assertEqual(self.get(AsyncMovieShowViewSet, 'retrieve', '/api/shows/', pk=999).status_code,
+                         status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.get(AsyncMovieShowViewSet, 'list', '/api/shows/', {'page': 9}).status_code,
+                         status.HTTP_404_NOT_FOUND)
+
+    def test_writes_keep_the_sync_code(self):
+        view = AsyncCinemaHallViewSet.as_view({'post': 'create'})
+        request = self.factory.post('/api/halls/', {'name': 'New Hall', 'seats': 50})
+        force_authenticate(request, user=self.admin_user)
+        response = async_to_sync(view)(request)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(CinemaHall.objects.filter(name='New Hall').exists())
+
+
+@override_settings(HALL_UPCOMING_SHOWS_DAYS=7, HALL_UPCOMING_SHOWS_LIMIT=5)
+class CinemaHallViewSetShowsTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.today = timezone.now().date()
+        self.movie = Movie.objects.create(title='Test Movie', description='', duration_in_minutes=120,
+                                          director='Test Director')
+        self.halls = [CinemaHall.objects.create(name=f'Hall {index}', seats=100) for index in range(5)]
+        for hall in self.halls:
+            self.create_shows(hall, range(10))
+            self.create_shows(hall, [30])
+
+    def create_shows(self, hall, offsets):
+        MovieShow.objects.bulk_create([
+            MovieShow(movie=self.movie, movie_hall=hall, start_time='12:00', end_time='14:00', ticket_price=10,
+                      start_date=self.today + timedelta(days=offset), end_date=self.today + timedelta(days=offset))
+            for offset in offsets
+        ])
+
+    def get_list(self):
+        view = CinemaHallViewSet.as_view({'get': 'list'})
+        response = view(self.factory.get('/api/halls/'))
+        response.render()
+        return response
+
+    def test_list_embeds_bounded_upcoming_shows(self):
+        # Count, halls page and a single prefetch for the shows of every hall.
+        with self.assertNumQueries(3):
+            response = self.get_list()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for hall in response.data['results']:
+            self.assertEqual([show['start_date'] for show in hall['shows']],
+                             [(self.today + timedelta(days=offset)).isoformat() for offset in range(5)])
+
+    def test_payload_size_does_not_grow_with_history(self):
+        size = len(self.get_list().content)
+        for hall in self.halls:
+            self.create_shows(hall, range(-100, 0))
+        self.assertEqual(len(self.get_list().content), size)
+
+    def test_shows_action_pages_full_history(self):
+        hall = self.halls[0]
+        self.create_shows(hall, range(-20, 0))
+        view = CinemaHallViewSet.as_view({'get': 'shows'})
+        response = view(self.factory.get(f'/api/halls/{hall.pk}/shows/'), pk=hall.pk)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 31)
+        self.assertEqual(len(response.data['results']), 15)
+        self.assertEqual(response.data['results'][0]['start_date'], (self.today + timedelta(days=30)).isoformat())
+
+
+class MovieViewSetSearchTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        for index in range(3):
+            Movie.objects.create(title=f'Star Voyage {index}', description='', duration_in_minutes=120,
+                                 director='Test Director')
+        Movie.objects.create(title='Heat', description='Two stars of the genre meet.', duration_in_minutes=170,
+                             director='Michael Mann')
+
+    def search(self, params):
+        view = MovieViewSet.as_view({'get': 'search'}, **MovieViewSet.search.kwargs)
+        return view(self.factory.get('/api/movies/search/', params))
+
+    def test_search_returns_ranked_matches(self):
+        response = self.search({'q': 'star', 'limit': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([movie['title'] for movie in response.data['results']], ['Star Voyage 0', 'Star Voyage 1'])
+        self.assertIn('poster_srcset', response.data['results'][0])
+
+    def test_search_needs_a_query(self):
+        self.assertEqual(self.search({}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.search({'q': 'star', 'limit': 0}).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(BULK_ORDER_MAX_LINES=5)
+class OrderViewSetBulkTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.customer = Customer.objects.create(username='user', balance=90)
+        self.staff = Customer.objects.create(username='staff', is_staff=True)
+        hall = CinemaHall.objects.create(name='Test Hall', seats=10)
+        movie = Movie.objects.create(title='Test Movie', description='', duration_in_minutes=120,
+                                     director='Test Director')
+        self.movie_show = MovieShow.objects.create(movie=movie, movie_hall=hall, start_time='12:00',
+                                                   start_date=timezone.now().date(), end_time='14:00',
+                                                   end_date=timezone.now().date(), ticket_price=10)
+
+    def post(self, user, orders):
+        view = OrderViewSet.as_view({'post': 'bulk'})
+        request = self.factory.post('/api/orders/bulk/', {'orders': orders}, format='json')
+        force_authenticate(request, user=user)
+        return view(request)
+
+    def test_bulk_reports_partial_failures(self):
+        response = self.post(self.customer, [
+            {'movie_show': self.movie_show.pk, 'seat_quantity': 6},
+            {'movie_show': self.movie_show.pk, 'seat_quantity': 6},
+            {'movie_show': self.movie_show.pk, 'seat_quantity': 4},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 2))
+        self.assertEqual(response.data['results'][0]['order']['customer'], self.customer.pk)
+        self.assertIn('more seats', response.data['results'][1]['error'])
+        self.assertIn('enough funds', response.data['results'][2]['error'])
+
+    def test_bulk_with_no_successful_line(self):
+        response = self.post(self.customer, [{'movie_show': self.movie_show.pk, 'seat_quantity': 11}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['failed'], 1)
+
+    def test_bulk_rejects_orders_for_other_customers(self):
+        line = {'movie_show': self.movie_show.pk, 'seat_quantity': 1, 'customer': self.staff.pk}
+        self.assertEqual(self.post(self.customer, [line]).status_code, status.HTTP_400_BAD_REQUEST)
+
+        line['customer'] = self.customer.pk
+        self.assertEqual(self.post(self.staff, [line]).status_code, status.HTTP_201_CREATED)
+
+    def test_bulk_line_limit(self):
+        lines = [{'movie_show': self.movie_show.pk, 'seat_quantity': 1}] * 6
+        response = self.post(self.customer, lines)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+
+class OrderViewSetExportTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.customer = Customer.objects.create(username='user', email='user@example.com')
+        self.staff = Customer.objects.create(username='staff', is_staff=True)
+        movie = Movie.objects.create(title='Test, "Quoted" Movie', description='', duration_in_minutes=120,
+                                     director='Test Director')
+        self.halls = [CinemaHall.objects.create(name=f'Hall {index}', seats=10) for index in range(2)]
+        today = timezone.now().date()
+        for hall in self.halls:
+            movie_show = MovieShow.objects.create(movie=movie, movie_hall=hall, start_time='12:00', start_date=today,
+                                                  end_time='14:00', end_date=today, ticket_price=10)
+            Order.objects.create(customer=self.customer, movie_show=movie_show, seat_quantity=2, total_cost=20)
+        self.orders = list(Order.objects.order_by('pk'))
+        Order.objects.filter(pk=self.orders[0].pk).update(ordered_at=today - timedelta(days=10))
+
+    def get(self, user, **params):
+        view = OrderViewSet.as_view({'get': 'export'}, **OrderViewSet.export.kwargs)
+        request = self.factory.get('/api/orders/export/', params)
+        force_authenticate(request, user=user)
+        return view(request)
+
+    def content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_is_staff_only(self):
+        self.assertEqual(self.get(self.customer).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_csv_export(self):
+        response = self.get(self.staff)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertFalse(response.is_async)
+        rows = list(csv.DictReader(io.StringIO(self.content(response))))
+        self.assertEqual([int(row['order_id']) for row in rows], [order.pk for order in self.orders])
+        self.assertEqual(rows[0]['movie_title'], 'Test, "Quoted" Movie')
+        self.assertEqual((rows[0]['customer_email'], rows[0]['total_cost']), ('user@example.com', '20.00'))
+
+    def test_jsonl_export_with_filters(self):
+        today = timezone.now().date()
+        response = self.get(self.staff, output='jsonl', start_date=today.isoformat(), hall=self.halls[1].pk)
+        lines = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual([line['order_id'] for line in lines], [self.orders[1].pk])
+        self.assertEqual(lines[0]['hall_name'], 'Hall 1')
+
+        response = self.get(self.staff, output='jsonl', hall=self.halls[0].pk, end_date=today.isoformat())
+        self.assertEqual(len(self.content(response).splitlines()), 1)
+
+    def test_asgi_export_streams_from_an_async_iterator(self):
+        view = OrderViewSet.as_view({'get': 'export'}, **OrderViewSet.export.kwargs)
+        request = ASGIRequest({'type': 'http', 'method': 'GET', 'path': '/api/orders/export/', 'headers': [],
+                               'query_string': urlencode({'output': 'jsonl'}).encode()}, io.BytesIO())
+        force_authenticate(request, user=self.staff)
+        response = view(request)
+        self.assertTrue(response.is_async)
+
+        async def content():
+            return b''.join([part async for part in response]).decode()
+
+        lines = [json.loads(line) for line in async_to_sync(content)().splitlines()]
+        self.assertEqual([line['order_id'] for line in lines], [order.pk for order in self.orders])
+
+    @override_settings(TASKS_EAGER=False)
+    def test_background_export_queues_a_task(self):
+        today = timezone.now().date()
+        response = self.get(self.staff, output='jsonl', background='true', start_date=today.isoformat(),
+                            hall=self.halls[1].pk)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        job = Task.objects.get(pk=response.data['task'])
+        self.assertEqual(response.data['status_url'], reverse('tasks:task_status', args=[job.pk]))
+        self.assertEqual((job.name, job.queue, job.status), (export_orders.name, 'exports', Task.QUEUED))
+        self.assertEqual(job.args, ['jsonl'])
+        self.assertEqual(job.kwargs, {'start_date': today.isoformat(), 'end_date': None, 'hall': self.halls[1].pk})
+
+    def test_invalid_filters(self):
+        today = timezone.now().date()
+        for params in [{'output': 'xml'}, {'start_date': 'yesterday'},
+                       {'start_date': today.isoformat(), 'end_date': (today - timedelta(days=1)).isoformat()}]:
+            with self.subTest(**params):
+                self.assertEqual(self.get(self.staff, **params).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ReportViewSetTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.customer = Customer.objects.create(username='user', balance=100)
+        self.staff = Customer.objects.create(username='staff', is_staff=True)
+        hall = CinemaHall.objects.create(name='Test Hall', seats=10)
+        movie = Movie.objects.create(title='Test Movie', description='', duration_in_minutes=120,
+                                     director='Test Director')
+        movie_show = MovieShow.objects.create(movie=movie, movie_hall=hall, start_time='12:00',
+                                              start_date=timezone.now().date(), end_time='14:00',
+                                              end_date=timezone.now().date(), ticket_price=10)
+        book_seats(self.customer, movie_show, 4)
+
+    def get(self, user, action, **params):
+        view = ReportViewSet.as_view({'get': action}, **getattr(ReportViewSet, action).kwargs)
+        request = self.factory.get(f'/api/reports/{action}/', params)
+        force_authenticate(request, user=user)
+        return view(request)
+
+    def test_reports_are_staff_only(self):
+        self.assertEqual(self.get(self.customer, 'revenue').status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reports(self):
+        response = self.get(self.staff, 'revenue', by='movie')
+        self.assertEqual(response.data['results'],
+                         [{'movie': Movie.objects.get().pk, 'movie_title': 'Test Movie', 'orders': 1,
+                           'revenue': '40.00'}])
+        response = self.get(self.staff, 'fill_rate', by='hall')
+        self.assertEqual(response.data['results'][0]['fill_rate'], 0.4)
+        response = self.get(self.staff, 'tickets')
+        self.assertEqual(response.data['results'][0]['tickets'], 4)
+
+    def test_invalid_dimension(self):
+        self.assertEqual(self.get(self.staff, 'tickets', by='customer').status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MovieShowViewSetImportTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.admin_user = Customer.objects.create(username='admin', is_staff=True, is_superuser=True)
+        self.hall = CinemaHall.objects.create(name='Test Hall', seats=100)
+        self.movie = Movie.objects.create(title='Test Movie', description='', duration_in_minutes=120,
+                                          director='Test Director')
+        day = (timezone.now().date() + timedelta(days=1)).isoformat()
+        self.rows = [
+            {'movie': self.movie.pk, 'movie_hall': self.hall.pk, 'start_date': day, 'end_date': day,
+             'start_time': start_time, 'end_time': end_time, 'ticket_price': '10.00'}
+            for start_time, end_time in [('10:00', '12:00'), ('12:00', '14:00')]
+        ]
+
+    def post(self, data, user=None, **kwargs):
+        view = MovieShowViewSet.as_view({'post': 'import_shows'})
+        request = self.factory.post('/api/shows/import/', data, **kwargs)
+        force_authenticate(request, user=user or self.admin_user)
+        return view(request)
+
+    def test_import_json(self):
+        response = self.post(self.rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+
+    def test_import_csv_upload_reports_collisions(self):
+        content = 'movie,movie_hall,start_date,end_date,start_time,end_time,ticket_price\n' + ''.join(
+                ','.join(str(value) for value in {**row, 'end_time': '13:00'}.values()) + '\n' for row in self.rows)
+        upload = SimpleUploadedFile('shows.csv', content.encode())
+        response = self.post({'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], [{'row': 2, 'error': 'Collides with row 1.'}])
+        self.assertFalse(MovieShow.objects.exists())
+
+    def test_import_rejects_files_that_are_not_utf8(self):
+        upload = SimpleUploadedFile('shows.csv', 'movie,movie_hall\nKinosaal \u00e4,1\n'.encode('latin-1'))
+        response = self.post({'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0]['row'], None)
+        self.assertIn('not valid UTF-8', response.data['errors'][0]['error'])
+
+    def test_import_is_admin_only(self):
+        user = Customer.objects.create(username='user')
+        self.assertEqual(self.post(self.rows, user=user, format='json').status_code, status.HTTP_403_FORBIDDEN)
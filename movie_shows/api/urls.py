@@ -1,14 +1,22 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework import routers
 
-from movie_shows.api.resources import CinemaHallViewSet, MovieShowViewSet, MovieViewSet, OrderViewSet
+from movie_shows.api.resources import AsyncCinemaHallViewSet, AsyncMovieShowViewSet, AsyncMovieViewSet, \
+    CinemaHallViewSet, MovieShowViewSet, MovieViewSet, OrderViewSet, ReportViewSet
 
 router = routers.SimpleRouter()
 
-router.register(r'halls', CinemaHallViewSet),
-router.register(r'shows', MovieShowViewSet),
-router.register(r'movies', MovieViewSet),
+if settings.ASYNC_SCHEDULE_API:
+    router.register(r'halls', AsyncCinemaHallViewSet),
+    router.register(r'shows', AsyncMovieShowViewSet),
+    router.register(r'movies', AsyncMovieViewSet),
+else:
+    router.register(r'halls', CinemaHallViewSet),
+    router.register(r'shows', MovieShowViewSet),
+    router.register(r'movies', MovieViewSet),
 router.register(r'orders', OrderViewSet),
+router.register(r'reports', ReportViewSet, basename='reports'),
 
 urlpatterns = [
     path('', include(router.urls)),
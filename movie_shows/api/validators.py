@@ -20,13 +20,12 @@ def validate_past_date(end_date):
 
 
 def validate_collisions(self, movie_hall, start_date, end_date, start_time, end_time):
-    if all([movie_hall, start_date, end_date, end_time]):
-        previous_shows = MovieShow.objects.filter(movie_hall=movie_hall)
+    if all([movie_hall, start_date, end_date, start_time, end_time]):
+        collisions = MovieShow.objects.colliding(movie_hall, start_date, end_date, start_time, end_time)
         if self.instance:
-            previous_shows = previous_shows.exclude(pk=self.instance.pk)
-        for show in previous_shows:
-            if show.end_date > start_date and show.end_time > start_time:
-                raise serializers.ValidationError('This show collides with another show in this hall.')
+            collisions = collisions.exclude(pk=self.instance.pk)
+        if collisions.exists():
+            raise serializers.ValidationError('This show collides with another show in this hall.')
 
 
 def validate_available_seats(movie_show, seat_quantity):
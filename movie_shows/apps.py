@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MovieShowsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'movie_shows'
+
+    def ready(self):
+        import movie_shows.signals  # noqa: F401
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import F
+from django.urls import Resolver404, resolve
+
+from movie_shows.models import MovieShow
+
+logger = logging.getLogger(__name__)
+
+EVENT_STREAM_HEADERS = {'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+
+def available_seats(shows):
+    rows = MovieShow.objects.filter(pk__in=shows).values_list('pk', F('movie_hall__seats') - F('sold_seats'))
+    return dict(rows)
+
+
+def seats_event(pk, available):
+    return f'event: seats\ndata: {json.dumps({"show": pk, "available_seats": available})}\n\n'
+
+
+def first_event(pk, available):
+    return f'retry: {settings.SEAT_STREAM_RETRY}\n' + seats_event(pk, available)
+
+
+class SeatPublisher:
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.seats = {}
+        self.task = None
+
+    async def fetch(self, shows):
+        try:
+            return await sync_to_async(available_seats)(shows)
+        except DatabaseError:
+            # Streams are served outside Django's request cycle, so nothing else drops a broken connection.
+            await sync_to_async(connection.close)()
+            raise
+
+    async def current(self, pk):
+        if pk not in self.seats:
+            seats = await self.fetch([pk])
+            if pk not in seats:
+                return None
+            self.seats[pk] = seats[pk]
+        return self.seats[pk]
+
+    def subscribe(self, pk):
+        # The newest count is all a client needs, so a slow client only ever holds one pending update.
+        queue = asyncio.Queue(maxsize=1)
+        self.subscribers[pk].add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.poll())
+        return queue
+
+    def unsubscribe(self, pk, queue):
+        queues = self.subscribers.get(pk)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self.subscribers[pk]
+            self.seats.pop(pk, None)
+
+    async def poll(self):
+        # Seats are sold with queryset updates from any process, so one query per interval for every watched show
+        # replaces each connection polling on its own.
+        while self.subscribers:
+            await asyncio.sleep(settings.SEAT_STREAM_POLL_INTERVAL)
+            if not self.subscribers:
+                break
+            try:
+                seats = await self.fetch(list(self.subscribers))
+            except DatabaseError:
+                logger.exception('Could not poll seat availability.')
+                continue
+            self.publish(seats)
+
+    def publish(self, seats):
+        for pk, available in seats.items():
+            if pk not in self.subscribers or self.seats.get(pk) == available:
+                continue
+            self.seats[pk] = available
+            for queue in self.subscribers[pk]:
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(available)
+
+
+publisher = SeatPublisher()
+
+
+async def seat_events(pk, available):
+    queue = publisher.subscribe(pk)
+    try:
+        yield first_event(pk, available)
+        while available > 0:
+            try:
+                available = await asyncio.wait_for(queue.get(), settings.SEAT_STREAM_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+            else:
+                yield seats_event(pk, available)
+    finally:
+        publisher.unsubscribe(pk, queue)
+
+
+class SeatStreamMiddleware:
+    # Django's ASGI handler keeps a thread for every request until its response ends and does not notice
+    # clients going away, so long-lived seat streams are answered here, ahead of it.
+    PATH_SUFFIX = '/seats/'
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        pk = self.match(scope)
+        try:
+            available = None if pk is None else await publisher.current(pk)
+        except DatabaseError:
+            # Django answers the request with its usual error response instead of the client getting none.
+            logger.exception('Could not read seat availability.')
+            available = None
+        if available is None:
+            return await self.app(scope, receive, send)
+
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(name.lower().encode(), value.encode()) for name, value in EVENT_STREAM_HEADERS.items()],
+        })
+        streaming = asyncio.create_task(self.stream(pk, available, send))
+        disconnect = asyncio.create_task(self.wait_for_disconnect(receive))
+        await asyncio.wait([streaming, disconnect], return_when=asyncio.FIRST_COMPLETED)
+        disconnect.cancel()
+        if not streaming.done():
+            streaming.cancel()
+            await asyncio.wait([streaming])
+            return
+        streaming.result()
+        await send({'type': 'http.response.body', 'body': b''})
+
+    def match(self, scope):
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            return None
+        path = scope['path'].removeprefix(scope.get('root_path', ''))
+        # Every other request skips resolving its path.
+        if not path.endswith(self.PATH_SUFFIX):
+            return None
+        try:
+            match = resolve(path)
+        except Resolver404:
+            return None
+        if match.view_name != 'shows:show_seats':
+            return None
+        return match.kwargs['pk']
+
+    async def stream(self, pk, available, send):
+        events = seat_events(pk, available)
+        try:
+            async for event in events:
+                await send({'type': 'http.response.body', 'body': event.encode(), 'more_body': True})
+        finally:
+            await events.aclose()
+
+    async def wait_for_disconnect(self, receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
@@ -0,0 +1,84 @@
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+GLOBAL_GENERATION_KEY = 'schedule:generation'
+HALL_GENERATION_KEY = 'schedule:generation:hall:{}'
+HITS_KEY = 'schedule:stats:hits'
+MISSES_KEY = 'schedule:stats:misses'
+
+
+def get_schedule_cache():
+    return caches[settings.SCHEDULE_CACHE_ALIAS]
+
+
+def get_generation(hall_id=None):
+    key = GLOBAL_GENERATION_KEY if hall_id is None else HALL_GENERATION_KEY.format(hall_id)
+    generation = get_schedule_cache().get(key)
+    if generation is None:
+        # A lost counter restarts from the clock, so it can never fall back to a value an old entry was stored under.
+        get_schedule_cache().add(key, time.time_ns(), timeout=None)
+        generation = get_schedule_cache().get(key)
+    return generation
+
+
+def _bump(key):
+    try:
+        get_schedule_cache().incr(key)
+    except ValueError:
+        get_schedule_cache().add(key, time.time_ns(), timeout=None)
+
+
+def _bump_generations(hall_id):
+    _bump(GLOBAL_GENERATION_KEY)
+    if hall_id is not None:
+        _bump(HALL_GENERATION_KEY.format(hall_id))
+
+
+def invalidate_schedule(hall_id=None):
+    _bump_generations(hall_id)
+    # Bump again once the write is visible, so a reader that slipped in before the commit cannot keep stale data.
+    transaction.on_commit(lambda: _bump_generations(hall_id))
+
+
+def _count(key):
+    try:
+        get_schedule_cache().incr(key)
+    except ValueError:
+        get_schedule_cache().add(key, 0, timeout=None)
+        get_schedule_cache().incr(key)
+
+
+def schedule_cache_key(prefix, params, hall_id=None):
+    query = urlencode(sorted(params.items()))
+    return f'schedule:{prefix}:{get_generation(hall_id)}:{query}'
+
+
+def get_or_build(key, build):
+    value = get_schedule_cache().get(key)
+    if value is not None:
+        _count(HITS_KEY)
+        return value
+
+    _count(MISSES_KEY)
+    value = build()
+    if value is not None:
+        get_schedule_cache().set(key, value, settings.SCHEDULE_CACHE_TIMEOUT)
+    return value
+
+
+def get_cache_stats():
+    hits = get_schedule_cache().get(HITS_KEY, 0)
+    misses = get_schedule_cache().get(MISSES_KEY, 0)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None,
+    }
+
+
+def reset_cache_stats():
+    get_schedule_cache().delete_many([HITS_KEY, MISSES_KEY])
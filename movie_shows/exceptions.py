@@ -1,3 +1,24 @@
+class BookingException(Exception):
+    pass
+
+
+class NoFreeSeatsException(BookingException):
+    pass
+
+
+class InsufficientBalanceException(BookingException):
+    pass
+
+
+class BookingConflictException(BookingException):
+    pass
+
+
+class ShowImportException(Exception):
+    def __init__(self, errors):
+        super().__init__(f'{len(errors)} problems found, nothing was imported.')
+        self.errors = errors
+
 # class MovieShowsCollideException(Exception):
 #     pass
 #
@@ -13,16 +34,9 @@
 #     pass
 #
 #
-# class NoFreeSeatsException(Exception):
-#     pass
-#
-#
 # class SeatsSoldException(Exception):
 #     pass
 #
 #
-# class InsufficientBalanceException(Exception):
-#     pass
-#
 # class ZeroSeatException(Exception):
 #     pass
@@ -0,0 +1,82 @@
+import csv
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from movie_shows.models import Order
+
+COLUMNS = [
+    ('order_id', 'pk'),
+    ('ordered_at', 'ordered_at'),
+    ('customer_id', 'customer_id'),
+    ('customer_username', 'customer__username'),
+    ('customer_email', 'customer__email'),
+    ('movie_show_id', 'movie_show_id'),
+    ('show_start_date', 'movie_show__start_date'),
+    ('show_end_date', 'movie_show__end_date'),
+    ('show_start_time', 'movie_show__start_time'),
+    ('movie_id', 'movie_show__movie_id'),
+    ('movie_title', 'movie_show__movie__title'),
+    ('hall_id', 'movie_show__movie_hall_id'),
+    ('hall_name', 'movie_show__movie_hall__name'),
+    ('ticket_price', 'movie_show__ticket_price'),
+    ('seat_quantity', 'seat_quantity'),
+    ('total_cost', 'total_cost'),
+]
+HEADER = [name for name, _ in COLUMNS]
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def export_queryset(start_date=None, end_date=None, hall=None):
+    queryset = Order.objects.all()
+    if start_date:
+        queryset = queryset.filter(ordered_at__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(ordered_at__lte=end_date)
+    if hall:
+        queryset = queryset.filter(movie_show__movie_hall=hall)
+    # values_list() skips model instances, the joined columns come back as plain tuples.
+    return queryset.order_by('ordered_at', 'id').values_list(*[lookup for _, lookup in COLUMNS])
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(HEADER)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_jsonl(rows):
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(HEADER, row))) + '\n'
+
+
+def stream_orders(queryset, format='csv', chunk_size=None):
+    # iterator() uses a server-side cursor on PostgreSQL, so only one chunk of rows is held at a time.
+    rows = queryset.iterator(chunk_size=chunk_size or settings.ORDER_EXPORT_CHUNK_SIZE)
+    return iter_jsonl(rows) if format == 'jsonl' else iter_csv(rows)
+
+
+async def astream_orders(queryset, format='csv', chunk_size=None):
+    # Django's ASGI handler reads a sync iterator into a list before it sends anything, which would hold the whole
+    # export in memory. The rows are read here one chunk at a time in the sync thread and sent before the next one.
+    chunk_size = chunk_size or settings.ORDER_EXPORT_CHUNK_SIZE
+    lines = stream_orders(queryset, format, chunk_size)
+    next_chunk = sync_to_async(lambda: ''.join(islice(lines, chunk_size)))
+    try:
+        while chunk := await next_chunk():
+            yield chunk
+    finally:
+        # A client that disconnects early leaves the generator, and with it the server-side cursor, open otherwise.
+        await sync_to_async(lines.close)()
@@ -43,14 +43,11 @@ class MovieShowCreateForm(forms.ModelForm):
             self.add_error('end_date', 'You cannot arrange movie shows for the past.')
 
         if hall and start_date and end_date and start_time and end_time:
-
-            previous_shows = MovieShow.objects.filter(movie_hall=hall)
+            collisions = MovieShow.objects.colliding(hall, start_date, end_date, start_time, end_time)
             if self.instance and self.instance.pk:
-                previous_shows = previous_shows.exclude(pk=self.instance.pk)
-            for show in previous_shows:
-                if show.end_date > start_date:
-                    if show.end_time > start_time:
-                        self.add_error(None, 'This show collide with another show.')
+                collisions = collisions.exclude(pk=self.instance.pk)
+            if collisions.exists():
+                self.add_error(None, 'This show collide with another show.')
 
 
 class OrderCreateForm(forms.ModelForm):
@@ -0,0 +1,139 @@
+import csv
+import heapq
+import io
+import json
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from rest_framework import serializers
+
+from movie_shows.api.validators import validate_date_range, validate_time_range, validate_past_date
+from movie_shows.cache import invalidate_schedule
+from movie_shows.exceptions import ShowImportException
+from movie_shows.models import CinemaHall, Movie, MovieShow
+from movie_shows.reports import record_shows
+from movie_shows.schedule import refresh_schedule, schedule_window
+
+FIELDS = ['movie', 'movie_hall', 'start_date', 'end_date', 'start_time', 'end_time', 'ticket_price']
+BATCH_SIZE = 2000
+
+
+def parse_rows(content, format):
+    if isinstance(content, bytes):
+        try:
+            content = content.decode('utf-8-sig')
+        except UnicodeDecodeError as e:
+            raise ShowImportException([{'row': None, 'error': f'The file is not valid UTF-8: {e}'}])
+    if format == 'json':
+        try:
+            rows = json.loads(content)
+        except ValueError as e:
+            raise ShowImportException([{'row': None, 'error': f'Invalid JSON: {e}'}])
+    else:
+        rows = list(csv.DictReader(io.StringIO(content)))
+    return rows
+
+
+def clean_row(row):
+    values = {}
+    for name in FIELDS:
+        value = row.get(name)
+        if value in (None, ''):
+            raise ValidationError(f'{name} is required.')
+        field = MovieShow._meta.get_field(name)
+        # Related rows are checked for the whole batch at once, clean() would look every one of them up.
+        values[field.attname] = field.to_python(value) if field.is_relation else field.clean(value, None)
+
+    try:
+        validate_date_range(values['start_date'], values['end_date'])
+        validate_time_range(values['start_time'], values['end_time'])
+        validate_past_date(values['end_date'])
+    except serializers.ValidationError as e:
+        raise ValidationError(e.detail[0])
+    return MovieShow(**values)
+
+
+def find_collisions(shows, existing):
+    by_hall = defaultdict(list)
+    for number, show in shows:
+        by_hall[show.movie_hall_id].append(
+                (show.start_date, show.end_date, show.start_time, show.end_time, number, None))
+    for pk, hall_id, start_date, end_date, start_time, end_time in existing:
+        if hall_id in by_hall:
+            by_hall[hall_id].append((start_date, end_date, start_time, end_time, None, pk))
+
+    errors = []
+    for intervals in by_hall.values():
+        intervals.sort(key=lambda interval: interval[0])
+        # Sweep by start date, so times are only compared against the shows still running on that date.
+        active = []
+        for index, interval in enumerate(intervals):
+            while active and active[0][0] < interval[0]:
+                heapq.heappop(active)
+            for _, _, other in active:
+                if other[2] >= interval[3] or other[3] <= interval[2]:
+                    continue
+                rows = [candidate for candidate in (interval, other) if candidate[4] is not None]
+                if rows:
+                    row = max(rows, key=lambda candidate: candidate[4])
+                    errors.append({'row': row[4], 'error': describe(other if row is interval else interval)})
+            heapq.heappush(active, (interval[1], index, interval))
+    return errors
+
+
+def describe(interval):
+    if interval[4] is None:
+        return f'Collides with movie show {interval[5]}.'
+    return f'Collides with row {interval[4]}.'
+
+
+def import_shows(rows, dry_run=False):
+    if not isinstance(rows, list):
+        raise ShowImportException([{'row': None, 'error': 'Expected a list of movie shows.'}])
+
+    shows, errors = [], []
+    for number, row in enumerate(rows, start=1):
+        try:
+            shows.append((number, clean_row(row)))
+        except ValidationError as e:
+            errors.extend({'row': number, 'error': message} for message in e.messages)
+        except AttributeError:
+            errors.append({'row': number, 'error': 'Expected an object.'})
+
+    hall_ids = {show.movie_hall_id for _, show in shows}
+    movie_ids = {show.movie_id for _, show in shows}
+    known_halls = set(CinemaHall.objects.filter(pk__in=hall_ids).values_list('pk', flat=True))
+    known_movies = set(Movie.objects.filter(pk__in=movie_ids).values_list('pk', flat=True))
+    for number, show in shows:
+        if show.movie_hall_id not in known_halls:
+            errors.append({'row': number, 'error': f'Cinema hall {show.movie_hall_id} does not exist.'})
+        if show.movie_id not in known_movies:
+            errors.append({'row': number, 'error': f'Movie {show.movie_id} does not exist.'})
+
+    with transaction.atomic():
+        if shows:
+            # Locking the halls keeps two imports for the same hall from both passing the check. Shows created through
+            # the form or the API do not take these locks, so they can still collide with an import running meanwhile.
+            list(CinemaHall.objects.select_for_update().filter(pk__in=hall_ids).order_by('pk').values_list('pk'))
+            existing = MovieShow.objects.filter(
+                    movie_hall__in=hall_ids,
+                    end_date__gte=min(show.start_date for _, show in shows),
+                    start_date__lte=max(show.end_date for _, show in shows),
+            ).values_list('pk', 'movie_hall_id', 'start_date', 'end_date', 'start_time', 'end_time')
+            errors.extend(find_collisions(shows, existing.iterator(chunk_size=BATCH_SIZE)))
+
+        if errors:
+            raise ShowImportException(sorted(errors, key=lambda error: error['row'] or 0))
+        if dry_run:
+            return len(shows)
+
+        MovieShow.objects.bulk_create([show for _, show in shows], batch_size=BATCH_SIZE)
+        window = schedule_window()
+        upcoming = [show.pk for _, show in shows if show.start_date <= window[-1] and show.end_date >= window[0]]
+        if upcoming:
+            refresh_schedule(shows=upcoming, days=window)
+        record_shows(show for _, show in shows)
+        for hall_id in hall_ids:
+            invalidate_schedule(hall_id)
+    return len(shows)
@@ -0,0 +1,30 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from movie_shows.exports import CONTENT_TYPES, export_queryset, stream_orders
+
+
+class Command(BaseCommand):
+    help = 'Streams orders with their show, movie, hall and customer as CSV or JSON lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(CONTENT_TYPES), default='csv')
+        parser.add_argument('--start-date', type=datetime.date.fromisoformat)
+        parser.add_argument('--end-date', type=datetime.date.fromisoformat)
+        parser.add_argument('--hall', type=int)
+        parser.add_argument('--output', help='Defaults to stdout.')
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, **options):
+        if options['start_date'] and options['end_date'] and options['start_date'] > options['end_date']:
+            raise CommandError('The start date is after the end date.')
+
+        queryset = export_queryset(options['start_date'], options['end_date'], options['hall'])
+        chunks = stream_orders(queryset, options['format'], options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as target:
+                target.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
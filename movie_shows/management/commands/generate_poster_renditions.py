@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from movie_shows.models import Movie
+from movie_shows.renditions import FAILED_HASH, ensure_renditions
+
+
+class Command(BaseCommand):
+    help = 'Generates the resized WebP and JPEG renditions of every movie poster that does not have them yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate renditions for every poster.')
+
+    def handle(self, *args, **options):
+        movies = Movie.objects.exclude(poster='').exclude(poster__isnull=True)
+        if options['force']:
+            movies.update(poster_hash='', poster_width=None)
+        else:
+            # Posters that failed before are tried again, their files may have been restored since.
+            movies = movies.filter(poster_hash__in=['', FAILED_HASH])
+
+        generated = failed = 0
+        for movie in movies.only('poster', 'poster_hash', 'poster_width').iterator():
+            if ensure_renditions(movie):
+                generated += 1
+            else:
+                failed += 1
+                self.stderr.write(f'Could not read the poster of movie {movie.pk}: {movie.poster.name}')
+        self.stdout.write(f'Generated renditions for {generated} posters, {failed} failed')
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from movie_shows.exceptions import ShowImportException
+from movie_shows.imports import import_shows, parse_rows
+
+
+class Command(BaseCommand):
+    help = 'Imports movie shows from a CSV or JSON file, nothing is saved if any row is invalid or collides.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'json'], help='Defaults to the file extension.')
+        parser.add_argument('--dry-run', action='store_true', help='Only validate the file.')
+
+    def handle(self, *args, **options):
+        format = options['format'] or ('json' if options['path'].endswith('.json') else 'csv')
+        with open(options['path'], 'rb') as source:
+            content = source.read()
+
+        try:
+            created = import_shows(parse_rows(content, format), dry_run=options['dry_run'])
+        except ShowImportException as e:
+            for error in e.errors:
+                self.stderr.write(f'row {error["row"]}: {error["error"]}')
+            raise CommandError(str(e))
+
+        if options['dry_run']:
+            self.stdout.write(f'{created} movie shows are valid')
+        else:
+            self.stdout.write(f'Imported {created} movie shows')
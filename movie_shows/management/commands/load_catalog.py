@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from movie_shows.cache import invalidate_schedule
+from movie_shows.models import Movie, MovieShow, Order
+from movie_shows.reports import rebuild_rollups
+from movie_shows.schedule import rebuild_schedule
+from movie_shows.search import refresh_search_vectors
+from picture_palace_hub.fixtures import FixtureFormatError, StreamingLoader, open_fixture
+from users.models import Customer
+from users.totals import backfill_totals, customer_id_batches
+
+
+class Command(BaseCommand):
+    help = ('Loads a cinema.json style fixture without reading it into memory at once, '
+            'rows are inserted in batches and foreign keys are checked once at the end.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='A JSON fixture, optionally gzipped.')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--ignore-nonexistent', action='store_true',
+                            help='Skip fields that no longer exist on the models.')
+
+    def handle(self, *args, **options):
+        loader = StreamingLoader(
+                batch_size=options['batch_size'],
+                ignore_nonexistent=options['ignore_nonexistent'],
+                progress=lambda stats: self.stdout.write(f'{stats["rows"]} rows, {stats["rows_per_s"]} rows/s'),
+        )
+        try:
+            with open_fixture(options['path']) as source:
+                stats = loader.load(source)
+        except (FixtureFormatError, IntegrityError) as e:
+            raise CommandError(f'Nothing was loaded: {e}')
+
+        models = set(loader.counts)
+        if Movie in models:
+            refresh_search_vectors(Movie.objects.filter(search_vector=None))
+        if MovieShow in models:
+            rebuild_schedule()
+        if MovieShow in models or Order in models:
+            rebuild_rollups()
+        if Customer in models or Order in models:
+            for ids in customer_id_batches(options['batch_size']):
+                backfill_totals(ids)
+        invalidate_schedule()
+
+        for label, count in stats['models'].items():
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(f'Loaded {stats["rows"]} rows in {stats["seconds"]}s ({stats["rows_per_s"]} rows/s), '
+                          f'peak RSS {stats["peak_rss_mb"]} MB')
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from movie_shows.reports import rebuild_rollups
+from movie_shows.tasks import rebuild_sales_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the daily sales rollups behind the reports API from the movie shows and orders.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--background', action='store_true', help='Queue the rebuild for a task worker.')
+
+    def handle(self, *args, **options):
+        if options['background']:
+            job = rebuild_sales_rollups.delay_once('rebuild_sales_rollups')
+            self.stdout.write(f'Queued as task {job.pk}')
+        else:
+            self.stdout.write(f'{rebuild_rollups()} sales rollup rows')
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from movie_shows.schedule import rebuild_schedule, schedule_window
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the materialized daily schedule, meant to run once a day shortly after midnight.'
+
+    def handle(self, *args, **options):
+        created = rebuild_schedule()
+        days = ', '.join(day.isoformat() for day in schedule_window())
+        self.stdout.write(f'{created} schedule rows for {days}')
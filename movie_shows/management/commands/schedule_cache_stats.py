@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from movie_shows.cache import get_cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Shows hit and miss counters of the public schedule cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them.')
+
+    def handle(self, *args, **options):
+        for name, value in get_cache_stats().items():
+            self.stdout.write(f'{name}: {value}')
+        if options['reset']:
+            reset_cache_stats()
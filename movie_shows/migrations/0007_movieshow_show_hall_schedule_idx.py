@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_shows', '0006_alter_movieshow_options'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movieshow',
+            index=models.Index(fields=['movie_hall', 'end_date', 'start_date', 'start_time', 'end_time'], name='show_hall_schedule_idx'),
+        ),
+    ]
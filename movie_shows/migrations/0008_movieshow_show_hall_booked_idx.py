@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 12:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_shows', '0007_movieshow_show_hall_schedule_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movieshow',
+            index=models.Index(condition=models.Q(('sold_seats__gt', 0)), fields=['movie_hall'], name='show_hall_booked_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-18 12:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_shows', '0008_movieshow_show_hall_booked_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movieshow',
+            index=models.Index(fields=['end_date', 'start_date', 'start_time'], include=('movie', 'movie_hall', 'end_time', 'sold_seats', 'ticket_price'), name='show_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movieshow',
+            index=models.Index(fields=['start_time', 'id'], name='show_start_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movieshow',
+            index=models.Index(fields=['ticket_price', 'id'], name='show_ticket_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer', 'ordered_at', 'id'], name='order_customer_history_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2 on 2026-10-18 12:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_shows', '0009_schedule_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('ticket_price', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('seats_left', models.IntegerField()),
+                ('movie_hall', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_days', to='movie_shows.cinemahall')),
+                ('movie_show', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_days', to='movie_shows.movieshow')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='dailyschedule',
+            index=models.Index(fields=['date', 'start_time'], name='schedule_day_start_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyschedule',
+            index=models.Index(fields=['date', 'movie_hall', 'start_time'], name='schedule_day_hall_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyschedule',
+            constraint=models.UniqueConstraint(fields=('date', 'movie_show'), name='schedule_day_show_unique'),
+        ),
+    ]
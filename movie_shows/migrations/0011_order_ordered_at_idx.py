@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_shows', '0010_dailyschedule'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['ordered_at', 'id'], name='order_ordered_at_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2 on 2026-10-18 13:03
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class AddPostgresIndex(migrations.AddIndex):
+    # Only PostgreSQL has GIN indexes and the "C" collation, other databases search with LIKE and skip the indexes.
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+def index_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+            "UPDATE movie_shows_movie SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(director, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'C')")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_shows', '0013_movie_poster_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(index_search_vectors, migrations.RunPython.noop),
+        AddPostgresIndex(
+            model_name='movie',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='movie_search_idx'),
+        ),
+        AddPostgresIndex(
+            model_name='movie',
+            index=models.Index(
+                    django.db.models.functions.comparison.Collate(
+                            django.db.models.functions.text.Lower('title'), 'C'),
+                    name='movie_title_prefix_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2 on 2026-10-18 14:10
+
+from django.db import migrations
+from django.db.models import Count, Sum
+
+DAYS_PER_BATCH = 31
+
+
+def backfill_rollups(apps, schema_editor):
+    # Reports read only the rollups and bookings only add to rows that exist, so the shows and orders already in
+    # place are summed up once here.
+    MovieShow = apps.get_model('movie_shows', 'MovieShow')
+    Order = apps.get_model('movie_shows', 'Order')
+    SalesRollup = apps.get_model('movie_shows', 'SalesRollup')
+
+    SalesRollup.objects.all().delete()
+    dates = list(MovieShow.objects.order_by('start_date').values_list('start_date', flat=True).distinct())
+    for offset in range(0, len(dates), DAYS_PER_BATCH):
+        batch = dates[offset:offset + DAYS_PER_BATCH]
+        shows = MovieShow.objects.filter(start_date__gte=batch[0], start_date__lte=batch[-1])
+        rollups = {}
+        for row in shows.order_by().values('start_date', 'movie', 'movie_hall').annotate(
+                shows=Count('pk'), capacity=Sum('movie_hall__seats')):
+            rollups[(row['start_date'], row['movie'], row['movie_hall'])] = SalesRollup(
+                    date=row['start_date'], movie_id=row['movie'], movie_hall_id=row['movie_hall'],
+                    shows=row['shows'], capacity=row['capacity'])
+        orders = Order.objects.filter(movie_show__in=shows.values('pk')).order_by().values(
+                'movie_show__start_date', 'movie_show__movie', 'movie_show__movie_hall',
+        ).annotate(orders=Count('pk'), tickets=Sum('seat_quantity'), revenue=Sum('total_cost'))
+        for row in orders:
+            rollup = rollups[(row['movie_show__start_date'], row['movie_show__movie'], row['movie_show__movie_hall'])]
+            rollup.orders, rollup.tickets, rollup.revenue = row['orders'], row['tickets'], row['revenue']
+        SalesRollup.objects.bulk_create(rollups.values(), batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_shows', '0014_movie_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
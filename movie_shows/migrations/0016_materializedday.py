@@ -0,0 +1,20 @@
+# Generated by Django 4.2 on 2026-10-18 13:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_shows', '0015_backfill_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaterializedDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+            ],
+        ),
+    ]
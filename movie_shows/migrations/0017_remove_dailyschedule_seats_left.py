@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 15:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_shows', '0016_materializedday'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='dailyschedule',
+            name='seats_left',
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_shows', '0017_remove_dailyschedule_seats_left'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='salesrollup',
+            name='sales_rollup_unique',
+        ),
+        migrations.RenameField(
+            model_name='salesrollup',
+            old_name='date',
+            new_name='show_date',
+        ),
+        migrations.AddConstraint(
+            model_name='salesrollup',
+            constraint=models.UniqueConstraint(fields=('show_date', 'movie', 'movie_hall'), name='sales_rollup_unique'),
+        ),
+    ]
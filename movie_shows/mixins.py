@@ -1,8 +1,10 @@
 from django.contrib import messages
 from django.contrib.auth.mixins import UserPassesTestMixin
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, HttpResponse
 
+from movie_shows.cache import schedule_cache_key, get_or_build
 from movie_shows.models import MovieShow, CinemaHall
+from movie_shows.schedule import resolve_day
 
 
 class AdminRequiredMixin(UserPassesTestMixin):
@@ -12,32 +14,47 @@ class AdminRequiredMixin(UserPassesTestMixin):
 
 class SoldTicketCheckMixin:
     def get(self, request, *args, **kwargs):
-        self.object = self.get_object()
-
-        if isinstance(self.object, MovieShow) and self.object.sold_seats > 0:
-            messages.error(self.request, 'This movie show is already booked.')
-            return HttpResponseRedirect(self.object.get_absolute_url())
-
-        if isinstance(self.object, CinemaHall) and hasattr(self.object, 'shows') and any(
-                show.sold_seats > 0 for show in self.object.shows.all()):
-            messages.error(self.request, 'A movie show in this hall is already booked.')
-            return HttpResponseRedirect(self.object.get_absolute_url())
-
-        return super().get(request, *args, **kwargs)
+        return self.check_sold_tickets() or super().get(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
+        return self.check_sold_tickets() or super().post(request, *args, **kwargs)
+
+    def check_sold_tickets(self):
         self.object = self.get_object()
 
         if isinstance(self.object, MovieShow) and self.object.sold_seats > 0:
             messages.error(self.request, 'This movie show is already booked.')
             return HttpResponseRedirect(self.object.get_absolute_url())
 
-        if isinstance(self.object, CinemaHall) and hasattr(self.object, 'shows') and any(
-                show.sold_seats > 0 for show in self.object.shows.all()):
+        if isinstance(self.object, CinemaHall) and self.object.has_booked_shows():
             messages.error(self.request, 'A movie show in this hall is already booked.')
             return HttpResponseRedirect(self.object.get_absolute_url())
 
-        return super().post(request, *args, **kwargs)
+        return None
 
     def get_success_url(self):
         raise NotImplementedError
+
+
+class ScheduleCacheMixin:
+    cache_prefix = None
+    cache_params = ['sort_by', 'sort_order', 'day', 'page']
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated or len(messages.get_messages(request)):
+            return super().get(request, *args, **kwargs)
+
+        params = {name: request.GET[name] for name in self.cache_params if name in request.GET}
+        if resolve_day(params.get('day')):
+            # "today" names another date after midnight, so the key holds the date it stands for.
+            params['day'] = resolve_day(params['day']).isoformat()
+        response = None
+
+        def render():
+            nonlocal response
+            response = super(ScheduleCacheMixin, self).get(request, *args, **kwargs)
+            response.render()
+            return response.content if response.status_code == 200 else None
+
+        content = get_or_build(schedule_cache_key(self.cache_prefix, params), render)
+        return response or HttpResponse(content)
@@ -1,5 +1,11 @@
+import datetime
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Collate, Lower
 from django.urls import reverse
+from django.utils import timezone
 
 from users.models import Customer
 
@@ -39,6 +45,9 @@ class CinemaHall(models.Model):
     def get_absolute_url(self):
         return reverse('shows:hall_detail', args=[self.id])
 
+    def has_booked_shows(self):
+        return self.shows.booked().exists()
+
     class Meta:
         ordering = ['seats', 'name']
 
@@ -54,12 +63,47 @@ class Movie(models.Model):
             null=True,
             blank=True,
             default='static/img/movie_poster.jpg')
+    poster_hash = models.CharField(max_length=64, blank=True, editable=False)
+    poster_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         return f'{self.title}'
 
     class Meta:
         ordering = ['title', 'duration_in_minutes']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='movie_search_idx'),
+            # Byte order lets the same index find titles by their beginning and return them shortest first.
+            models.Index(Collate(Lower('title'), 'C'), name='movie_title_prefix_idx'),
+        ]
+
+
+class MovieShowQuerySet(models.QuerySet):
+    def colliding(self, movie_hall, start_date, end_date, start_time, end_time):
+        return self.filter(
+                movie_hall=movie_hall,
+                start_date__lte=end_date,
+                end_date__gte=start_date,
+                start_time__lt=end_time,
+                end_time__gt=start_time,
+        )
+
+    def booked(self):
+        return self.filter(sold_seats__gt=0)
+
+    def upcoming(self, days):
+        today = timezone.now().date()
+        return self.filter(
+                end_date__gte=today,
+                start_date__lte=today + datetime.timedelta(days=days),
+        ).order_by('start_date', 'start_time', 'id')
+
+    def for_listing(self):
+        return self.select_related('movie', 'movie_hall').only(
+                'start_time', 'start_date', 'end_time', 'end_date', 'sold_seats', 'ticket_price',
+                'movie__title', 'movie_hall__name', 'movie_hall__seats',
+        )
 
 
 class MovieShow(models.Model):
@@ -72,12 +116,83 @@ class MovieShow(models.Model):
     sold_seats = models.PositiveIntegerField(default=0)
     ticket_price = models.DecimalField(max_digits=6, decimal_places=2)
 
+    objects = MovieShowQuerySet.as_manager()
+
     def __str__(self):
         return f'{self.movie} at {self.start_time}'
 
     def get_absolute_url(self):
         return reverse('shows:show_detail', args=[self.id])
 
+    class Meta:
+        indexes = [
+            models.Index(
+                    fields=['movie_hall', 'end_date', 'start_date', 'start_time', 'end_time'],
+                    name='show_hall_schedule_idx',
+            ),
+            models.Index(fields=['movie_hall'], condition=models.Q(sold_seats__gt=0), name='show_hall_booked_idx'),
+            models.Index(
+                    fields=['end_date', 'start_date', 'start_time'],
+                    include=['movie', 'movie_hall', 'end_time', 'sold_seats', 'ticket_price'],
+                    name='show_day_idx',
+            ),
+            models.Index(fields=['start_time', 'id'], name='show_start_time_idx'),
+            models.Index(fields=['ticket_price', 'id'], name='show_ticket_price_idx'),
+        ]
+
+
+class DailySchedule(models.Model):
+    date = models.DateField()
+    movie_hall = models.ForeignKey(CinemaHall, on_delete=models.CASCADE, related_name='schedule_days')
+    movie_show = models.ForeignKey(MovieShow, on_delete=models.CASCADE, related_name='schedule_days')
+    start_time = models.TimeField()
+    ticket_price = models.DecimalField(max_digits=6, decimal_places=2)
+
+    def __str__(self):
+        return f'{self.movie_show_id} on {self.date}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'movie_show'], name='schedule_day_show_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'start_time'], name='schedule_day_start_time_idx'),
+            models.Index(fields=['date', 'movie_hall', 'start_time'], name='schedule_day_hall_idx'),
+        ]
+
+
+class MaterializedDay(models.Model):
+    date = models.DateField(unique=True)
+
+    def __str__(self):
+        return str(self.date)
+
+
+class SalesRollup(models.Model):
+    # Orders are counted on the start date of their show, not on the day they were sold, like the shows and seats
+    # they fill.
+    show_date = models.DateField()
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='sales_rollups')
+    movie_hall = models.ForeignKey(CinemaHall, on_delete=models.CASCADE, related_name='sales_rollups')
+    shows = models.PositiveIntegerField(default=0)
+    capacity = models.PositiveIntegerField(default=0)
+    orders = models.PositiveIntegerField(default=0)
+    tickets = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f'{self.movie_id} in {self.movie_hall_id} on {self.show_date}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['show_date', 'movie', 'movie_hall'], name='sales_rollup_unique'),
+        ]
+
+
+class OrderQuerySet(models.QuerySet):
+    def history(self):
+        return self.order_by('-ordered_at', '-id')
+
 
 class Order(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='orders')
@@ -86,5 +201,13 @@ class Order(models.Model):
     total_cost = models.DecimalField(max_digits=10, decimal_places=2, default=0.0)
     ordered_at = models.DateField(auto_now_add=True)
 
+    objects = OrderQuerySet.as_manager()
+
     def __str__(self):
         return f'Order {self.id} by {self.customer.username}'
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['customer', 'ordered_at', 'id'], name='order_customer_history_idx'),
+            models.Index(fields=['ordered_at', 'id'], name='order_ordered_at_idx'),
+        ]
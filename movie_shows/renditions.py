@@ -0,0 +1,100 @@
+import hashlib
+import io
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from movie_shows.models import Movie
+
+# Stored as the hash of a poster that could not be resized, it is served as uploaded until it is replaced or the
+# generate_poster_renditions command tries it again.
+FAILED_HASH = 'failed'
+FORMATS = {
+    'webp': ('WEBP', 'webp', 'image/webp'),
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg'),
+}
+
+
+def rendition_name(digest, width, format):
+    return f'{settings.POSTER_RENDITIONS_DIR}/{digest[:2]}/{digest}-{width}.{FORMATS[format][1]}'
+
+
+def rendition_widths(original_width):
+    # Posters are never scaled up, a small original only gets a rendition at its own width.
+    return sorted({min(width, original_width) for width in settings.POSTER_RENDITION_WIDTHS})
+
+
+def encode(image, format):
+    if format == 'jpeg' and image.mode == 'RGBA':
+        # JPEG has no alpha channel, so transparent posters are flattened onto white.
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    buffer = io.BytesIO()
+    image.save(buffer, FORMATS[format][0], quality=settings.POSTER_RENDITION_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def generate_renditions(movie):
+    with movie.poster.open('rb') as source:
+        content = source.read()
+    digest = hashlib.sha256(content).hexdigest()[:32]
+
+    with Image.open(io.BytesIO(content)) as original:
+        image = ImageOps.exif_transpose(original)
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+        for width in rendition_widths(image.width):
+            names = {format: rendition_name(digest, width, format) for format in settings.POSTER_RENDITION_FORMATS}
+            missing = {format: name for format, name in names.items() if not default_storage.exists(name)}
+            if not missing:
+                continue
+            resized = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+            for format, name in missing.items():
+                default_storage.save(name, ContentFile(encode(resized, format)))
+
+    Movie.objects.filter(pk=movie.pk).update(poster_hash=digest, poster_width=image.width)
+    movie.poster_hash, movie.poster_width = digest, image.width
+    return digest
+
+
+def needs_renditions(movie):
+    # The placeholder poster is a static file, there is nothing uploaded to resize.
+    return bool(movie.poster) and not movie.poster_hash and movie.poster.name != Movie._meta.get_field('poster').default
+
+
+def record_failure(movie):
+    Movie.objects.filter(pk=movie.pk).update(poster_hash=FAILED_HASH, poster_width=None)
+    movie.poster_hash, movie.poster_width = FAILED_HASH, None
+
+
+def ensure_renditions(movie):
+    if not movie.poster:
+        return False
+    if movie.poster_hash and movie.poster_hash != FAILED_HASH:
+        return True
+    try:
+        generate_renditions(movie)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        # A missing or unreadable poster keeps being served as it is.
+        record_failure(movie)
+        return False
+    return True
+
+
+def poster_sources(movie):
+    if not movie.poster_hash or movie.poster_hash == FAILED_HASH:
+        return []
+    sources = []
+    for format in settings.POSTER_RENDITION_FORMATS:
+        urls = [(default_storage.url(rendition_name(movie.poster_hash, width, format)), width)
+                for width in rendition_widths(movie.poster_width)]
+        sources.append({
+            'format': format,
+            'type': FORMATS[format][2],
+            'src': urls[0][0],
+            'srcset': ', '.join(f'{url} {width}w' for url, width in urls),
+        })
+    return sources
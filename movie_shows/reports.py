@@ -0,0 +1,177 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+
+from movie_shows.models import CinemaHall, MovieShow, Order, SalesRollup
+
+BATCH_SIZE = 2000
+KEYS_PER_QUERY = 100
+DAYS_PER_BATCH = 31
+DIMENSIONS = {
+    'show_date': ['show_date'],
+    'movie': ['movie', 'movie__title'],
+    'hall': ['movie_hall', 'movie_hall__name'],
+}
+METRICS = {
+    'revenue': ['orders', 'revenue'],
+    'tickets': ['orders', 'tickets'],
+    'fill_rate': ['shows', 'capacity', 'tickets'],
+}
+
+
+def show_key(show):
+    return show.start_date, show.movie_id, show.movie_hall_id
+
+
+def order_key(order):
+    if Order.movie_show.is_cached(order):
+        return show_key(order.movie_show)
+    return MovieShow.objects.filter(pk=order.movie_show_id).values_list('start_date', 'movie', 'movie_hall').first()
+
+
+def compute_rollups(shows):
+    rollups = {}
+    for row in shows.order_by().values('start_date', 'movie', 'movie_hall').annotate(
+            shows=Count('pk'), capacity=Sum('movie_hall__seats')):
+        rollups[(row['start_date'], row['movie'], row['movie_hall'])] = SalesRollup(
+                show_date=row['start_date'],
+                movie_id=row['movie'],
+                movie_hall_id=row['movie_hall'],
+                shows=row['shows'],
+                capacity=row['capacity'],
+        )
+
+    orders = Order.objects.filter(movie_show__in=shows.values('pk')).order_by().values(
+            'movie_show__start_date', 'movie_show__movie', 'movie_show__movie_hall',
+    ).annotate(orders=Count('pk'), tickets=Sum('seat_quantity'), revenue=Sum('total_cost'))
+    for row in orders:
+        rollup = rollups[(row['movie_show__start_date'], row['movie_show__movie'], row['movie_show__movie_hall'])]
+        rollup.orders, rollup.tickets, rollup.revenue = row['orders'], row['tickets'], row['revenue']
+    return rollups
+
+
+def refresh_rollups(keys):
+    keys = list({key for key in keys if key is not None})
+    if not keys:
+        return 0
+    created = 0
+    with transaction.atomic():
+        for offset in range(0, len(keys), KEYS_PER_QUERY):
+            chunk = keys[offset:offset + KEYS_PER_QUERY]
+            SalesRollup.objects.filter(_keys_condition(chunk)).delete()
+            shows = MovieShow.objects.filter(_keys_condition(chunk, date_field='start_date'))
+            created += len(SalesRollup.objects.bulk_create(compute_rollups(shows).values(), batch_size=BATCH_SIZE))
+    return created
+
+
+def rebuild_rollups():
+    dates = list(MovieShow.objects.order_by('start_date').values_list('start_date', flat=True).distinct())
+    created = 0
+    with transaction.atomic():
+        SalesRollup.objects.all().delete()
+        for offset in range(0, len(dates), DAYS_PER_BATCH):
+            batch = dates[offset:offset + DAYS_PER_BATCH]
+            shows = MovieShow.objects.filter(start_date__gte=batch[0], start_date__lte=batch[-1])
+            created += len(SalesRollup.objects.bulk_create(compute_rollups(shows).values(), batch_size=BATCH_SIZE))
+    return created
+
+
+def record_orders(orders, sign=1):
+    totals = defaultdict(lambda: [0, 0, Decimal(0)])
+    for key, seat_quantity, total_cost in orders:
+        if key is None:
+            continue
+        totals[key][0] += sign
+        totals[key][1] += sign * seat_quantity
+        totals[key][2] += sign * Decimal(str(total_cost))
+    fields = ['orders', 'tickets', 'revenue']
+    for key in _increment(totals, fields):
+        # A show saved without signals, like a bulk insert, has no row yet, so it is built from every order in place,
+        # this one included. When a concurrent booking creates the row first, this order is added to it instead.
+        rollup = compute_rollups(MovieShow.objects.filter(_keys_condition([key], date_field='start_date'))).get(key)
+        if rollup is None:
+            continue
+        try:
+            with transaction.atomic():
+                rollup.save()
+        except IntegrityError:
+            _increment({key: totals[key]}, fields)
+
+
+def record_shows(shows):
+    shows = list(shows)
+    seats = dict(CinemaHall.objects.filter(pk__in={show.movie_hall_id for show in shows}).values_list('pk', 'seats'))
+    totals = defaultdict(lambda: [0, 0])
+    for show in shows:
+        totals[show_key(show)][0] += 1
+        totals[show_key(show)][1] += seats[show.movie_hall_id]
+    if not totals:
+        return
+
+    dates = [date for date, _, _ in totals]
+    # One range query finds the rows that already exist, most keys of an import are new.
+    existing = set(SalesRollup.objects.filter(
+            show_date__gte=min(dates), show_date__lte=max(dates), movie_hall__in=seats,
+    ).values_list('show_date', 'movie', 'movie_hall')).intersection(totals)
+    _increment({key: totals[key] for key in existing}, ['shows', 'capacity'])
+    # New shows have no orders, so a missing row starts from the show counts alone.
+    SalesRollup.objects.bulk_create([
+        SalesRollup(show_date=key[0], movie_id=key[1], movie_hall_id=key[2], shows=totals[key][0],
+                    capacity=totals[key][1])
+        for key in totals if key not in existing
+    ], batch_size=BATCH_SIZE)
+
+
+def _increment(totals, fields):
+    missing = []
+    keys = list(totals)
+    for offset in range(0, len(keys), KEYS_PER_QUERY):
+        chunk = keys[offset:offset + KEYS_PER_QUERY]
+        condition = _keys_condition(chunk)
+        updated = SalesRollup.objects.filter(condition).update(**{
+            field: F(field) + Case(
+                    *[When(_keys_condition([key]), then=Value(totals[key][index])) for key in chunk],
+                    default=Value(0),
+                    output_field=SalesRollup._meta.get_field(field),
+            )
+            for index, field in enumerate(fields)
+        })
+        if updated < len(chunk):
+            existing = set(SalesRollup.objects.filter(condition).values_list('show_date', 'movie', 'movie_hall'))
+            missing.extend(key for key in chunk if key not in existing)
+    return missing
+
+
+def _keys_condition(keys, date_field='show_date'):
+    condition = Q()
+    for date, movie_id, hall_id in keys:
+        condition |= Q(**{date_field: date}, movie=movie_id, movie_hall=hall_id)
+    return condition
+
+
+def resize_hall(hall):
+    SalesRollup.objects.filter(movie_hall=hall).update(capacity=F('shows') * hall.seats)
+
+
+def sales_report(metric, by='show_date', start_date=None, end_date=None, movie=None, hall=None):
+    queryset = SalesRollup.objects.all()
+    if start_date:
+        queryset = queryset.filter(show_date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(show_date__lte=end_date)
+    if movie:
+        queryset = queryset.filter(movie=movie)
+    if hall:
+        queryset = queryset.filter(movie_hall=hall)
+
+    dimension = DIMENSIONS[by]
+    rows = queryset.values(*dimension).annotate(**{name: Sum(name) for name in METRICS[metric]}).order_by(*dimension)
+    results = []
+    for row in rows:
+        row = {name.replace('__', '_'): value for name, value in row.items()}
+        if metric == 'fill_rate':
+            row['fill_rate'] = round(row['tickets'] / row['capacity'], 4) if row['capacity'] else None
+        results.append(row)
+    return results
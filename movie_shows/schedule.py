@@ -0,0 +1,100 @@
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from movie_shows.models import DailySchedule, MaterializedDay, MovieShow
+
+BATCH_SIZE = 2000
+
+
+def resolve_day(day):
+    if day == 'today':
+        return timezone.now().date()
+    if day == 'next_day':
+        return timezone.now().date() + datetime.timedelta(days=1)
+    return None
+
+
+def schedule_window():
+    today = timezone.now().date()
+    return [today + datetime.timedelta(days=offset) for offset in range(settings.DAILY_SCHEDULE_DAYS)]
+
+
+def refresh_schedule(shows=None, days=None):
+    days = schedule_window() if days is None else days
+    rows = DailySchedule.objects.filter(date__in=days)
+    source = MovieShow.objects.only('movie_hall', 'start_time', 'start_date', 'end_date', 'ticket_price')
+    if shows is not None:
+        rows = rows.filter(movie_show__in=shows)
+        source = source.filter(pk__in=shows)
+
+    created = 0
+    with transaction.atomic():
+        rows.delete()
+        for day in days:
+            batch = []
+            for show in source.filter(start_date__lte=day, end_date__gte=day).iterator(chunk_size=BATCH_SIZE):
+                batch.append(DailySchedule(
+                        date=day,
+                        movie_hall_id=show.movie_hall_id,
+                        movie_show_id=show.pk,
+                        start_time=show.start_time,
+                        ticket_price=show.ticket_price,
+                ))
+                if len(batch) == BATCH_SIZE:
+                    created += len(DailySchedule.objects.bulk_create(batch, ignore_conflicts=True))
+                    batch = []
+            created += len(DailySchedule.objects.bulk_create(batch, ignore_conflicts=True))
+    return created
+
+
+def rebuild_schedule():
+    days = schedule_window()
+    with transaction.atomic():
+        DailySchedule.objects.exclude(date__in=days).delete()
+        created = refresh_schedule(days=days)
+        MaterializedDay.objects.exclude(date__in=days).delete()
+        MaterializedDay.objects.bulk_create([MaterializedDay(date=day) for day in days], ignore_conflicts=True)
+    return created
+
+
+def shows_on_day(queryset, day, **conditions):
+    # Days are only written by rebuild_schedule and the show signals, a day they have not reached yet is read live.
+    if not MaterializedDay.objects.filter(date=day).exists():
+        return queryset.filter(start_date__lte=day, end_date__gte=day, **conditions)
+    # A single filter() call keeps every condition on the same schedule row.
+    return queryset.filter(**{f'schedule_days__{name}': value for name, value in {'date': day, **conditions}.items()})
+
+
+def filter_shows(queryset, params):
+    day = params.get('day')
+    if day == 'today':
+        from_time = params.get('from', None)
+        to_time = params.get('to', None)
+        hall = params.get('hall', None)
+
+        conditions = {}
+        if from_time and to_time:
+            conditions['start_time__gte'] = datetime.datetime.strptime(from_time, "%H:%M").time()
+            conditions['start_time__lte'] = datetime.datetime.strptime(to_time, "%H:%M").time()
+        if hall:
+            conditions['movie_hall'] = hall
+
+        queryset = shows_on_day(queryset, resolve_day(day), **conditions).order_by('start_time')
+
+    elif day == 'next_day':
+        queryset = shows_on_day(queryset, resolve_day(day))
+
+    sort_by = params.get('sort_by')
+    if sort_by == 'start_time':
+        queryset = queryset.order_by('start_time')
+    elif sort_by == '-start_time':
+        queryset = queryset.order_by('-start_time')
+    elif sort_by == 'price':
+        queryset = queryset.order_by('ticket_price')
+    elif sort_by == '-price':
+        queryset = queryset.order_by('-ticket_price')
+
+    return queryset
@@ -0,0 +1,78 @@
+import re
+import sys
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import Case, F, Q, When
+from django.db.models.functions import Collate, Length, Lower
+
+# Stop words like "the" are in nearly every description, so an index entry for one would list most of the catalog.
+# The english configuration leaves them out and matches words by their stem.
+SEARCH_CONFIG = 'english'
+SEARCH_FIELDS = {'title': 'A', 'director': 'B', 'description': 'C'}
+
+
+def is_postgresql(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def search_terms(text):
+    return re.findall(r'\w+', text.lower())[:settings.SEARCH_MAX_TERMS]
+
+
+def search_vector():
+    vectors = [SearchVector(field, weight=weight, config=SEARCH_CONFIG) for field, weight in SEARCH_FIELDS.items()]
+    return vectors[0] + vectors[1] + vectors[2]
+
+
+def search_query(terms):
+    # The last term matches as a prefix, so results show up while it is still being typed. Earlier words are complete,
+    # and matching them, or the first few letters, as prefixes would make the index merge every word they start.
+    if len(terms[-1]) >= settings.SEARCH_MIN_PREFIX:
+        terms = terms[:-1] + [f'{terms[-1]}:*']
+    return SearchQuery(' & '.join(terms), config=SEARCH_CONFIG, search_type='raw')
+
+
+def refresh_search_vectors(queryset):
+    if not is_postgresql(queryset):
+        return 0
+    return queryset.update(search_vector=search_vector())
+
+
+def match_movies(queryset, text):
+    terms = search_terms(text)
+    if not terms:
+        return queryset.none()
+    if is_postgresql(queryset):
+        return queryset.filter(search_vector=search_query(terms))
+    for term in terms:
+        queryset = queryset.filter(Q(title__icontains=term) | Q(director__icontains=term)
+                                   | Q(description__icontains=term))
+    return queryset
+
+
+def search_movies(queryset, text):
+    terms = search_terms(text)
+    if not terms:
+        return queryset.none()
+    prefix = ' '.join(text.lower().split())
+    if not is_postgresql(queryset):
+        title_match = Case(When(title__istartswith=prefix, then=Length('title')))
+        return match_movies(queryset, text).annotate(title_match=title_match).order_by(
+                F('title_match').asc(nulls_last=True), 'title', 'pk')
+
+    query = search_query(terms)
+    queryset = queryset.alias(lower_title=Collate(Lower('title'), 'C'))
+    # Ranking reads the vector of every match, so a search matching much of the catalog only ranks the first candidates
+    # of each index. Titles that start with the text come first, shortest first, then the best full-text matches.
+    limit = settings.SEARCH_CANDIDATES
+    # The same titles as startswith, but the planner estimates a range much better than a LIKE and walks the index.
+    after = prefix[:-1] + chr(min(ord(prefix[-1]) + 1, sys.maxunicode))
+    titles = queryset.filter(lower_title__gte=prefix, lower_title__lt=after)
+    candidates = titles.order_by('lower_title').values('pk')[:limit].union(
+            queryset.filter(search_vector=query).order_by().values('pk')[:limit])
+    return queryset.filter(pk__in=candidates).annotate(
+            title_match=Case(When(lower_title__startswith=prefix, then=Length('title'))),
+            rank=SearchRank(F('search_vector'), query),
+    ).order_by(F('title_match').asc(nulls_last=True), '-rank', 'pk')
@@ -0,0 +1,135 @@
+from collections import Counter
+from decimal import Decimal
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction, OperationalError
+from django.db.models import Case, F, OuterRef, Subquery, Value, When
+
+from movie_shows.cache import invalidate_schedule
+from movie_shows.exceptions import BookingException, NoFreeSeatsException, InsufficientBalanceException, \
+    BookingConflictException
+from movie_shows.models import CinemaHall, MovieShow, Order
+from movie_shows.reports import record_orders, show_key
+from users.api.authentication import evict_user_tokens
+from users.models import Customer
+
+
+def book_seats(customer, movie_show, seat_quantity):
+    return _with_retries(_reserve_and_charge, customer, movie_show, seat_quantity)
+
+
+def book_many(lines):
+    return _with_retries(_reserve_and_charge_many, lines)
+
+
+def _with_retries(func, *args):
+    for attempt in range(settings.BOOKING_RETRIES):
+        try:
+            return func(*args)
+        except OperationalError:
+            # Deadlocks and serialization failures roll the whole booking back, so it is safe to replay it.
+            continue
+    raise BookingConflictException('The booking could not be completed right now, please try again.')
+
+
+def _reserve_and_charge(customer, movie_show, seat_quantity):
+    total_cost = seat_quantity * movie_show.ticket_price
+    hall_seats = CinemaHall.objects.filter(pk=OuterRef('movie_hall_id')).values('seats')
+
+    with transaction.atomic():
+        reserved = MovieShow.objects.filter(
+                pk=movie_show.pk,
+                sold_seats__lte=Subquery(hall_seats) - seat_quantity,
+        ).update(sold_seats=F('sold_seats') + seat_quantity)
+        if not reserved:
+            raise NoFreeSeatsException('You specified more seats than available for this movie show.')
+
+        charged = Customer.objects.filter(
+                pk=customer.pk,
+                balance__gte=total_cost,
+        ).update(
+                balance=F('balance') - total_cost,
+                total_spent=F('total_spent') + total_cost,
+                order_count=F('order_count') + 1,
+        )
+        if not charged:
+            raise InsufficientBalanceException(
+                    'Sorry, it seems you do not have enough funds to complete this transaction.')
+        transaction.on_commit(partial(evict_user_tokens, [customer.pk]))
+
+        order = Order(
+                customer=customer,
+                movie_show=movie_show,
+                seat_quantity=seat_quantity,
+                total_cost=total_cost,
+        )
+        # The totals were added together with the charge, so the post_save of the order leaves them alone.
+        order._totals_applied = True
+        order.save()
+        return order
+
+
+def _increments(totals, field='pk', zero=0):
+    return Case(*[When(**{field: pk}, then=Value(amount)) for pk, amount in totals.items()], default=Value(zero))
+
+
+def _reserve_and_charge_many(lines):
+    show_ids = {line['movie_show'] for line in lines}
+    customer_ids = {line['customer'] for line in lines}
+    results = []
+
+    with transaction.atomic():
+        # Rows are locked in primary key order, the same order every batch uses, so two batches cannot deadlock.
+        shows = {show.pk: show for show in MovieShow.objects.select_for_update(of=('self',)).filter(
+                pk__in=show_ids).select_related('movie_hall').only(
+                'start_date', 'movie', 'sold_seats', 'ticket_price', 'movie_hall__seats').order_by('pk')}
+        balances = dict(Customer.objects.select_for_update().filter(
+                pk__in=customer_ids).order_by('pk').values_list('pk', 'balance'))
+
+        seats_left = {pk: show.movie_hall.seats - show.sold_seats for pk, show in shows.items()}
+        seats, spent, orders, counts = Counter(), Counter(), [], Counter()
+        for line in lines:
+            show = shows.get(line['movie_show'])
+            customer_id = line['customer']
+            if show is None:
+                results.append(BookingException('Movie show not found.'))
+                continue
+            if customer_id not in balances:
+                results.append(BookingException('Customer not found.'))
+                continue
+
+            total_cost = line['seat_quantity'] * show.ticket_price
+            if line['seat_quantity'] > seats_left[show.pk]:
+                results.append(NoFreeSeatsException('You specified more seats than available for this movie show.'))
+                continue
+            if total_cost > balances[customer_id]:
+                results.append(InsufficientBalanceException(
+                        'Sorry, it seems you do not have enough funds to complete this transaction.'))
+                continue
+
+            seats_left[show.pk] -= line['seat_quantity']
+            balances[customer_id] -= total_cost
+            seats[show.pk] += line['seat_quantity']
+            spent[customer_id] += total_cost
+            counts[customer_id] += 1
+            order = Order(customer_id=customer_id, movie_show_id=show.pk, seat_quantity=line['seat_quantity'],
+                          total_cost=total_cost)
+            orders.append(order)
+            results.append(order)
+
+        if orders:
+            MovieShow.objects.filter(pk__in=seats).update(sold_seats=F('sold_seats') + _increments(seats))
+            Customer.objects.filter(pk__in=spent).update(
+                    balance=F('balance') - _increments(spent, zero=Decimal(0)),
+                    total_spent=F('total_spent') + _increments(spent, zero=Decimal(0)),
+                    order_count=F('order_count') + _increments(counts),
+            )
+            transaction.on_commit(partial(evict_user_tokens, list(spent)))
+            Order.objects.bulk_create(orders)
+            # bulk_create() sends no post_save, so the totals above and the rollups are fed here.
+            record_orders([(show_key(shows[order.movie_show_id]), order.seat_quantity, order.total_cost)
+                           for order in orders])
+            for hall_id in {shows[pk].movie_hall_id for pk in seats}:
+                invalidate_schedule(hall_id)
+    return results
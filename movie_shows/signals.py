@@ -0,0 +1,115 @@
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from movie_shows.cache import invalidate_schedule
+from movie_shows.models import CinemaHall, Movie, MovieShow, Order
+from movie_shows.reports import order_key, record_orders, refresh_rollups, resize_hall, show_key
+from movie_shows.schedule import refresh_schedule
+from movie_shows.search import SEARCH_FIELDS, refresh_search_vectors
+from movie_shows.tasks import request_renditions
+from users.totals import adjust_totals
+
+
+@receiver([post_save, post_delete], sender=CinemaHall)
+def invalidate_hall_schedule(sender, instance, **kwargs):
+    invalidate_schedule(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=MovieShow)
+def invalidate_show_schedule(sender, instance, **kwargs):
+    invalidate_schedule(instance.movie_hall_id)
+
+
+@receiver([post_save, post_delete], sender=Order)
+def invalidate_order_schedule(sender, instance, **kwargs):
+    if Order.movie_show.is_cached(instance):
+        hall_id = instance.movie_show.movie_hall_id
+    else:
+        hall_id = MovieShow.objects.filter(pk=instance.movie_show_id).values_list('movie_hall_id', flat=True).first()
+    invalidate_schedule(hall_id)
+
+
+@receiver(post_save, sender=MovieShow)
+def refresh_show_daily_schedule(sender, instance, raw, **kwargs):
+    if not raw:
+        refresh_schedule(shows=[instance.pk])
+
+
+@receiver(pre_save, sender=MovieShow)
+def remember_show_rollup(sender, instance, raw, **kwargs):
+    if instance.pk and not raw:
+        instance._previous_rollup = MovieShow.objects.filter(pk=instance.pk).values_list(
+                'start_date', 'movie', 'movie_hall').first()
+
+
+@receiver(post_save, sender=MovieShow)
+def refresh_show_rollups(sender, instance, raw, **kwargs):
+    if not raw:
+        refresh_rollups([getattr(instance, '_previous_rollup', None), show_key(instance)])
+
+
+@receiver(post_delete, sender=MovieShow)
+def remove_show_rollups(sender, instance, **kwargs):
+    refresh_rollups([show_key(instance)])
+
+
+@receiver(post_save, sender=CinemaHall)
+def resize_hall_rollups(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        resize_hall(instance)
+
+
+@receiver(post_save, sender=Order)
+def record_order_rollup(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        record_orders([(order_key(instance), instance.seat_quantity, instance.total_cost)])
+
+
+@receiver(post_delete, sender=Order)
+def remove_order_rollup(sender, instance, **kwargs):
+    record_orders([(order_key(instance), instance.seat_quantity, instance.total_cost)], sign=-1)
+
+
+@receiver(pre_save, sender=Order)
+def remember_order_totals(sender, instance, raw, **kwargs):
+    if instance.pk and not raw:
+        instance._previous_totals = Order.objects.filter(pk=instance.pk).values_list(
+                'customer', 'total_cost').first()
+
+
+@receiver(post_save, sender=Order)
+def add_customer_totals(sender, instance, raw, **kwargs):
+    applied = getattr(instance, '_totals_applied', False)
+    previous = getattr(instance, '_previous_totals', None)
+    instance._totals_applied, instance._previous_totals = False, None
+    if raw or applied:
+        return
+    # An edited order moves its cost out of the totals it was counted in and into those of its current customer.
+    if previous is not None:
+        adjust_totals(*previous, sign=-1)
+    adjust_totals(instance.customer_id, instance.total_cost)
+
+
+@receiver(post_delete, sender=Order)
+def remove_customer_totals(sender, instance, **kwargs):
+    adjust_totals(instance.customer_id, instance.total_cost, sign=-1)
+
+
+@receiver(pre_save, sender=Movie)
+def reset_poster_renditions(sender, instance, raw, **kwargs):
+    if instance.pk and not raw:
+        previous = Movie.objects.filter(pk=instance.pk).values_list('poster', flat=True).first()
+        if previous != instance.poster.name:
+            instance.poster_hash, instance.poster_width = '', None
+
+
+@receiver(post_save, sender=Movie)
+def generate_poster_renditions(sender, instance, raw, **kwargs):
+    if not raw:
+        request_renditions(instance)
+
+
+@receiver(post_save, sender=Movie)
+def update_search_vector(sender, instance, update_fields, **kwargs):
+    if update_fields is None or not SEARCH_FIELDS.keys().isdisjoint(update_fields):
+        refresh_search_vectors(Movie.objects.filter(pk=instance.pk))
@@ -0,0 +1,60 @@
+import datetime
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from movie_shows.exports import export_queryset, stream_orders
+from movie_shows.models import Movie
+from movie_shows.renditions import FAILED_HASH, generate_renditions, needs_renditions, record_failure
+from movie_shows.reports import rebuild_rollups
+from tasks.models import Task
+from tasks.queue import task
+
+
+@task(queue='posters')
+def generate_poster_renditions(movie_id):
+    movie = Movie.objects.filter(pk=movie_id).first()
+    if movie is None:
+        return None
+    if needs_renditions(movie) or movie.poster_hash == FAILED_HASH:
+        try:
+            generate_renditions(movie)
+        except Exception:
+            # The original is served meanwhile, the retries of this task still get to resize it.
+            record_failure(movie)
+            raise
+    return {'hash': movie.poster_hash, 'width': movie.poster_width}
+
+
+def request_renditions(movie):
+    if not needs_renditions(movie):
+        return
+    job = generate_poster_renditions.delay_once(f'poster:{movie.pk}', movie.pk)
+    if job.status == Task.DONE and job.result:
+        movie.poster_hash, movie.poster_width = job.result['hash'], job.result['width']
+    elif job.status == Task.FAILED:
+        movie.poster_hash, movie.poster_width = FAILED_HASH, None
+
+
+@task(queue='reports', max_attempts=1)
+def rebuild_sales_rollups():
+    return rebuild_rollups()
+
+
+@task(queue='exports')
+def export_orders(format='csv', start_date=None, end_date=None, hall=None):
+    queryset = export_queryset(
+            datetime.date.fromisoformat(start_date) if start_date else None,
+            datetime.date.fromisoformat(end_date) if end_date else None,
+            hall,
+    )
+    with tempfile.TemporaryFile() as target:
+        for chunk in stream_orders(queryset, format):
+            target.write(chunk.encode('utf-8'))
+        target.seek(0)
+        name = default_storage.save(f'{settings.EXPORTS_DIR}/orders-{timezone.now():%Y%m%d-%H%M%S}.{format}',
+                                    File(target))
+    return {'path': name, 'url': default_storage.url(name)}
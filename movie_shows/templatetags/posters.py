@@ -0,0 +1,17 @@
+from django import template
+from django.conf import settings
+
+from movie_shows.renditions import poster_sources
+
+register = template.Library()
+
+
+@register.inclusion_tag('movie_shows/movies/poster.html')
+def poster(movie):
+    sources = poster_sources(movie)
+    return {
+        'movie': movie,
+        'sources': sources[:-1],
+        'fallback': sources[-1] if sources else None,
+        'sizes': settings.POSTER_DISPLAY_SIZES,
+    }
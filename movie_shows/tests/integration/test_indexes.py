@@ -0,0 +1,76 @@
+import unittest
+
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from monitoring.benchmarks import seed_catalog
+from movie_shows.api.resources import MovieShowViewSet
+from movie_shows.models import CinemaHall, MovieShow, Order
+from movie_shows.views import MovieShowListView
+from users.models import Customer
+
+LARGE_TABLES = [MovieShow._meta.db_table, Order._meta.db_table]
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'EXPLAIN plans are only checked on PostgreSQL')
+class ScheduleQueryPlanTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_catalog(halls=20, movies=200, shows=50000, customers=200)
+        shows = list(MovieShow.objects.values_list('pk', 'ticket_price')[:500])
+        Order.objects.bulk_create([
+            Order(customer=customer, movie_show_id=pk, total_cost=price)
+            for customer in Customer.objects.all()
+            for pk, price in shows[:100]
+        ], batch_size=5000)
+        with connection.cursor() as cursor:
+            for table in LARGE_TABLES:
+                cursor.execute(f'ANALYZE {table}')
+
+    def api_queryset(self, **params):
+        view = MovieShowViewSet(action='list', format_kwarg=None)
+        view.request = Request(APIRequestFactory().get('/api/shows/', params))
+        return view.get_queryset()
+
+    def html_queryset(self, **params):
+        view = MovieShowListView()
+        view.setup(RequestFactory().get('/', params))
+        return view.get_queryset()
+
+    def assertNoSeqScan(self, queryset):
+        plan = queryset.explain()
+        for table in LARGE_TABLES:
+            self.assertNotIn(f'Seq Scan on {table}', plan, plan)
+
+    def test_api_schedule_queries(self):
+        hall = CinemaHall.objects.first().pk
+        for params in [
+            {'day': 'today'},
+            {'day': 'next_day'},
+            {'day': 'today', 'from': '10:00', 'to': '16:00'},
+            {'day': 'today', 'hall': hall},
+            {'sort_by': 'start_time'},
+            {'sort_by': '-start_time'},
+            {'sort_by': 'price'},
+            {'sort_by': '-price'},
+        ]:
+            with self.subTest(**params):
+                self.assertNoSeqScan(self.api_queryset(**params)[:15])
+
+    def test_html_schedule_queries(self):
+        for params in [
+            {},
+            {'sort_order': 'desc'},
+            {'sort_by': 'ticket_price'},
+            {'day': 'today'},
+            {'day': 'next_day', 'sort_by': 'ticket_price'},
+        ]:
+            with self.subTest(**params):
+                self.assertNoSeqScan(self.html_queryset(**params)[:3])
+
+    def test_order_history_query(self):
+        customer = Customer.objects.first()
+        self.assertNoSeqScan(customer.orders.history()[:20])
@@ -0,0 +1,84 @@
+import asyncio
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from movie_shows.availability import SeatStreamMiddleware, publisher
+from movie_shows.models import CinemaHall, Movie, MovieShow
+
+
+@override_settings(SEAT_STREAM_POLL_INTERVAL=0.01)
+class SeatStreamTest(TestCase):
+    def setUp(self):
+        hall = CinemaHall.objects.create(name='Test Hall', seats=10)
+        movie = Movie.objects.create(title='Test Movie', description='', duration_in_minutes=120,
+                                     director='Test Director')
+        self.movie_show = MovieShow.objects.create(movie=movie, movie_hall=hall, start_time='12:00',
+                                                   start_date=timezone.now().date(), end_time='14:00',
+                                                   end_date=timezone.now().date(), ticket_price=10, sold_seats=4)
+        self.url = reverse('shows:show_seats', args=[self.movie_show.pk])
+        self.passed_on = []
+        self.sent = None
+        self.disconnected = None
+
+    async def django_app(self, scope, receive, send):
+        self.passed_on.append(scope['path'])
+
+    async def receive(self):
+        await self.disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        await self.sent.put(message)
+
+    async def next_message(self):
+        return await asyncio.wait_for(self.sent.get(), 1)
+
+    def open_stream(self, path):
+        self.sent = asyncio.Queue()
+        self.disconnected = asyncio.Event()
+        scope = {'type': 'http', 'method': 'GET', 'path': path}
+        return asyncio.create_task(SeatStreamMiddleware(self.django_app)(scope, self.receive, self.send))
+
+    def test_view_sends_the_current_count_without_asgi(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertIn('"available_seats": 6', response.content.decode())
+        self.assertEqual(self.client.get(reverse('shows:show_seats', args=[999])).status_code, 404)
+
+    async def test_stream_pushes_sales_until_sold_out(self):
+        stream = self.open_stream(self.url)
+        self.assertEqual((await self.next_message())['status'], 200)
+        self.assertIn(b'"available_seats": 6', (await self.next_message())['body'])
+
+        await MovieShow.objects.filter(pk=self.movie_show.pk).aupdate(sold_seats=10)
+        self.assertIn(b'"available_seats": 0', (await self.next_message())['body'])
+        self.assertFalse((await self.next_message()).get('more_body'))
+        await stream
+        self.assertFalse(publisher.subscribers)
+
+    async def test_disconnect_ends_the_subscription(self):
+        stream = self.open_stream(self.url)
+        await self.next_message()
+        await self.next_message()
+        self.assertEqual(len(publisher.subscribers[self.movie_show.pk]), 1)
+
+        self.disconnected.set()
+        await asyncio.wait_for(stream, 1)
+        self.assertFalse(publisher.subscribers)
+
+    async def test_other_requests_reach_django(self):
+        with mock.patch('movie_shows.availability.resolve', wraps=resolve) as resolving:
+            for path in ['/cinema/', reverse('shows:show_seats', args=[999])]:
+                await self.open_stream(path)
+        self.assertEqual(self.passed_on, ['/cinema/', reverse('shows:show_seats', args=[999])])
+        self.assertEqual(resolving.call_count, 1)
+
+    async def test_database_errors_reach_django(self):
+        with mock.patch.object(publisher, 'fetch', side_effect=DatabaseError), \
+                self.assertLogs('movie_shows.availability', 'ERROR'):
+            await self.open_stream(self.url)
+        self.assertEqual(self.passed_on, [self.url])
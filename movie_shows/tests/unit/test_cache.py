@@ -0,0 +1,105 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from movie_shows.cache import get_cache_stats, get_schedule_cache
+from movie_shows.models import CinemaHall, Movie, MovieShow
+from movie_shows.services import book_seats
+
+
+class ScheduleCacheTest(TestCase):
+    def setUp(self):
+        get_schedule_cache().clear()
+        self.cinema_hall = CinemaHall.objects.create(name='Test Hall', seats=100)
+        self.movie = Movie.objects.create(
+                title='Test Movie',
+                description='This is a test movie description.',
+                duration_in_minutes=120,
+                director='Test Director',
+        )
+        self.movie_show = self.create_movie_show('12:00', '14:00')
+        self.url = reverse('shows:show_list')
+
+    def create_movie_show(self, start_time, end_time):
+        return MovieShow.objects.create(
+                movie=self.movie,
+                movie_hall=self.cinema_hall,
+                start_time=start_time,
+                start_date=timezone.now().date(),
+                end_time=end_time,
+                end_date=timezone.now().date(),
+                ticket_price=10.00,
+        )
+
+    def test_anonymous_show_list_is_cached(self):
+        first = self.client.get(self.url, {'sort_by': 'ticket_price'})
+        second = self.client.get(self.url, {'sort_by': 'ticket_price'})
+
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(get_cache_stats()['misses'], 1)
+        self.assertEqual(get_cache_stats()['hits'], 1)
+
+    def test_query_parameters_are_part_of_the_key(self):
+        self.client.get(self.url, {'sort_by': 'ticket_price'})
+        self.client.get(self.url, {'sort_by': 'start_time'})
+        self.client.get(self.url, {'day': 'today'})
+
+        self.assertEqual(get_cache_stats()['misses'], 3)
+        self.assertEqual(get_cache_stats()['hits'], 0)
+
+    def test_day_filter_is_keyed_by_date(self):
+        self.client.get(self.url, {'day': 'today'})
+        tomorrow = timezone.now() + timedelta(days=1)
+        with mock.patch('django.utils.timezone.now', return_value=tomorrow):
+            response = self.client.get(self.url, {'day': 'today'})
+            self.client.get(self.url, {'day': 'today'})
+
+        self.assertEqual(get_cache_stats()['misses'], 2)
+        self.assertEqual(get_cache_stats()['hits'], 1)
+        self.assertNotContains(response, '12:00')
+
+    def test_show_changes_invalidate_the_list(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_movie_show('15:00', '17:00')
+        response = self.client.get(self.url)
+
+        self.assertEqual(get_cache_stats()['hits'], 0)
+        self.assertContains(response, '15:00')
+
+    def test_orders_invalidate_the_list(self):
+        customer = get_user_model().objects.create_user(username='testuser', password='testpassword')
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            book_seats(customer, self.movie_show, 7)
+        response = self.client.get(self.url)
+
+        self.assertEqual(get_cache_stats()['hits'], 0)
+        self.assertContains(response, 'Sold seats: 7')
+
+    def test_authenticated_users_bypass_the_cache(self):
+        customer = get_user_model().objects.create_user(username='testuser', password='testpassword')
+        self.client.force_login(customer)
+        self.client.get(self.url)
+        self.client.get(self.url)
+
+        self.assertEqual(get_cache_stats()['misses'], 0)
+        self.assertEqual(get_cache_stats()['hits'], 0)
+
+    def test_hall_shows_are_cached_per_hall(self):
+        customer = get_user_model().objects.create_user(username='testuser', password='testpassword')
+        self.client.force_login(customer)
+        url = reverse('shows:hall_detail', kwargs={'pk': self.cinema_hall.pk})
+        self.client.get(url)
+        self.client.get(url)
+        self.assertEqual(get_cache_stats()['hits'], 1)
+
+        other_hall = CinemaHall.objects.create(name='Other Hall', seats=50)
+        MovieShow.objects.create(movie=self.movie, movie_hall=other_hall, start_time='12:00', end_time='14:00',
+                                 start_date=timezone.now().date(), end_date=timezone.now().date(), ticket_price=5)
+        self.client.get(url)
+        self.assertEqual(get_cache_stats()['hits'], 2)
@@ -0,0 +1,43 @@
+import csv
+import io
+import json
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from movie_shows.models import CinemaHall, Movie, MovieShow, Order
+from users.models import Customer
+
+
+class ExportOrdersCommandTest(TestCase):
+    def setUp(self):
+        customer = Customer.objects.create(username='testuser')
+        hall = CinemaHall.objects.create(name='Test Hall', seats=100)
+        movie = Movie.objects.create(title='Test Movie', description='', duration_in_minutes=120,
+                                     director='Test Director')
+        movie_show = MovieShow.objects.create(movie=movie, movie_hall=hall, start_time='12:00',
+                                              start_date=timezone.now().date(), end_time='14:00',
+                                              end_date=timezone.now().date(), ticket_price=10)
+        self.orders = [Order.objects.create(customer=customer, movie_show=movie_show, total_cost=10) for _ in range(5)]
+
+    def export(self, *args):
+        out = io.StringIO()
+        call_command('export_orders', *args, stdout=out)
+        return out.getvalue()
+
+    def test_csv_in_small_chunks(self):
+        rows = list(csv.DictReader(io.StringIO(self.export('--chunk-size', '2'))))
+        self.assertEqual([int(row['order_id']) for row in rows], [order.pk for order in self.orders])
+        self.assertEqual(rows[0]['customer_username'], 'testuser')
+
+    def test_jsonl_with_filters(self):
+        today = timezone.now().date().isoformat()
+        lines = self.export('--format', 'jsonl', '--start-date', today, '--end-date', today).splitlines()
+        self.assertEqual(json.loads(lines[0])['movie_title'], 'Test Movie')
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(self.export('--format', 'jsonl', '--hall', '999'), '')
+
+    def test_rejects_reversed_range(self):
+        with self.assertRaises(CommandError):
+            self.export('--start-date', '2024-02-01', '--end-date', '2024-01-01')
@@ -78,6 +78,51 @@ class MovieShowCreateFormTest(TestCase):
         self.assertFalse(form.is_valid())
         self.assertIn('start_date', form.errors)
 
+    def test_colliding_show(self):
+        MovieShow.objects.create(
+                movie=self.movie,
+                movie_hall=self.hall,
+                start_date=timezone.now().date(),
+                start_time='12:00',
+                end_date=(timezone.now() + timedelta(days=3)).date(),
+                end_time='14:00',
+                ticket_price=10.0,
+        )
+        form_data = {
+            'movie': self.movie.pk,
+            'movie_hall': self.hall.pk,
+            'start_date': (timezone.now() + timedelta(days=1)).date(),
+            'start_time': '13:00',
+            'end_date': (timezone.now() + timedelta(days=5)).date(),
+            'end_time': '15:00',
+            'ticket_price': 10.0,
+        }
+        form = MovieShowCreateForm(data=form_data)
+        self.assertFalse(form.is_valid())
+        self.assertIn('__all__', form.errors)
+
+    def test_show_after_another_show(self):
+        MovieShow.objects.create(
+                movie=self.movie,
+                movie_hall=self.hall,
+                start_date=timezone.now().date(),
+                start_time='12:00',
+                end_date=(timezone.now() + timedelta(days=3)).date(),
+                end_time='14:00',
+                ticket_price=10.0,
+        )
+        form_data = {
+            'movie': self.movie.pk,
+            'movie_hall': self.hall.pk,
+            'start_date': (timezone.now() + timedelta(days=1)).date(),
+            'start_time': '14:00',
+            'end_date': (timezone.now() + timedelta(days=5)).date(),
+            'end_time': '16:00',
+            'ticket_price': 10.0,
+        }
+        form = MovieShowCreateForm(data=form_data)
+        self.assertTrue(form.is_valid(), form.errors)
+
 
 # class OrderCreateFormTest(TestCase):
 #
@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+from django.utils import timezone
+
+from movie_shows.exceptions import ShowImportException
+from movie_shows.imports import import_shows, parse_rows
+from movie_shows.models import CinemaHall, DailySchedule, Movie, MovieShow
+
+
+class ImportShowsTest(TestCase):
+    def setUp(self):
+        self.today = timezone.now().date()
+        self.cinema_hall = CinemaHall.objects.create(name='Test Hall', seats=100)
+        self.other_hall = CinemaHall.objects.create(name='Other Hall', seats=100)
+        self.movie = Movie.objects.create(
+                title='Test Movie',
+                description='This is a test movie description.',
+                duration_in_minutes=120,
+                director='Test Director',
+        )
+        self.movie_show = MovieShow.objects.create(
+                movie=self.movie,
+                movie_hall=self.cinema_hall,
+                start_time='12:00',
+                start_date=self.today,
+                end_time='14:00',
+                end_date=self.today + timedelta(days=10),
+                ticket_price='10.00',
+        )
+
+    def row(self, start_time, end_time, offset=0, days=1, hall=None):
+        return {
+            'movie': str(self.movie.pk),
+            'movie_hall': str((hall or self.other_hall).pk),
+            'start_date': (self.today + timedelta(days=offset)).isoformat(),
+            'end_date': (self.today + timedelta(days=offset + days - 1)).isoformat(),
+            'start_time': start_time,
+            'end_time': end_time,
+            'ticket_price': '12.50',
+        }
+
+    def import_errors(self, rows):
+        with self.assertRaises(ShowImportException) as context:
+            import_shows(rows)
+        return [(error['row'], error['error']) for error in context.exception.errors]
+
+    def test_import_creates_shows(self):
+        created = import_shows([self.row('10:00', '12:00'), self.row('12:00', '14:00'), self.row('10:00', '12:00', 1)])
+        self.assertEqual(created, 3)
+        self.assertEqual(MovieShow.objects.filter(movie_hall=self.other_hall).count(), 3)
+        self.assertEqual(DailySchedule.objects.filter(movie_hall=self.other_hall, date=self.today).count(), 2)
+
+    def test_collisions_within_the_batch(self):
+        errors = self.import_errors([
+            self.row('10:00', '12:00', days=5),
+            self.row('16:00', '18:00', 1),
+            self.row('11:00', '13:00', 4),
+            self.row('17:00', '19:00', 1),
+            self.row('11:00', '13:00', 5),
+        ])
+        self.assertEqual(errors, [(3, 'Collides with row 1.'), (4, 'Collides with row 2.')])
+        self.assertEqual(MovieShow.objects.count(), 1)
+
+    def test_collisions_with_existing_shows(self):
+        errors = self.import_errors([
+            self.row('13:00', '15:00', 10, hall=self.cinema_hall),
+            self.row('13:00', '15:00', 11, hall=self.cinema_hall),
+            self.row('14:00', '16:00', 0, hall=self.cinema_hall),
+        ])
+        self.assertEqual(errors, [(1, f'Collides with movie show {self.movie_show.pk}.')])
+
+    def test_invalid_rows_are_all_reported(self):
+        missing_price = self.row('10:00', '12:00')
+        del missing_price['ticket_price']
+        errors = self.import_errors([
+            self.row('12:00', '10:00'),
+            self.row('10:00', '12:00', -5),
+            missing_price,
+            {**self.row('10:00', '12:00', 3), 'movie_hall': '999'},
+            'not a row',
+        ])
+        self.assertEqual([row for row, _ in errors], [1, 2, 3, 4, 5])
+        self.assertEqual(errors[3], (4, 'Cinema hall 999 does not exist.'))
+
+    def test_dry_run_saves_nothing(self):
+        self.assertEqual(import_shows([self.row('10:00', '12:00')], dry_run=True), 1)
+        self.assertEqual(MovieShow.objects.count(), 1)
+
+    def test_parse_csv_and_json(self):
+        rows = [self.row('10:00', '12:00')]
+        content = ','.join(rows[0]) + '\n' + ','.join(rows[0].values()) + '\n'
+        self.assertEqual(parse_rows(content, 'csv'), rows)
+        self.assertEqual(parse_rows(json.dumps(rows), 'json'), rows)
+        with self.assertRaises(ShowImportException):
+            parse_rows('[', 'json')
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as source:
+            json.dump([self.row('10:00', '12:00'), self.row('11:00', '13:00')], source)
+        self.addCleanup(os.remove, source.name)
+
+        with self.assertRaises(CommandError):
+            call_command('import_shows', source.name, stderr=StringIO())
+        self.assertEqual(MovieShow.objects.count(), 1)
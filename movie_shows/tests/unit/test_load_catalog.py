@@ -0,0 +1,131 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db.models import QuerySet
+from django.test import TestCase, TransactionTestCase
+
+from movie_shows.cache import get_schedule_cache
+from movie_shows.models import CinemaHall, Movie, MovieShow, Order
+from picture_palace_hub.fixtures import FixtureFormatError, iter_objects
+from users.models import Customer
+
+CATALOG = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'cinema.json')
+
+
+class IterObjectsTest(TestCase):
+    def test_objects_split_across_chunks(self):
+        objects = [{'model': 'movie_shows.cinemahall', 'pk': pk, 'fields': {'name': f'Hall {pk}', 'seats': 10}}
+                   for pk in range(1, 6)]
+        text = json.dumps(objects, indent=2)
+        for chunk_size in (1, 7, len(text)):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(list(iter_objects(io.StringIO(text), chunk_size)), objects)
+
+    def test_empty_list(self):
+        self.assertEqual(list(iter_objects(io.StringIO(' [ ] '), 1)), [])
+
+    def test_invalid_fixtures(self):
+        for text in ['', '{"model": "movie_shows.movie"}', '[{"model": "movie_shows.movie"}', '[{"model": ']:
+            with self.subTest(text=text), self.assertRaises(FixtureFormatError):
+                list(iter_objects(io.StringIO(text), 4))
+
+
+class LoadCatalogCommandTest(TransactionTestCase):
+    def setUp(self):
+        get_schedule_cache().clear()
+
+    def write_fixture(self, objects, compress=False):
+        handle, path = tempfile.mkstemp(suffix='.json.gz' if compress else '.json')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        with (gzip.open(path, 'wt') if compress else open(path, 'w')) as target:
+            json.dump(objects, target)
+        return path
+
+    def test_loads_catalog(self):
+        out = io.StringIO()
+        call_command('load_catalog', CATALOG, '--ignore-nonexistent', '--batch-size', '4', stdout=out)
+
+        with open(CATALOG) as source:
+            expected = json.load(source)
+        for model in (CinemaHall, Movie, MovieShow, Order, Customer):
+            label = model._meta.label_lower
+            self.assertEqual(model.objects.count(), len([obj for obj in expected if obj['model'] == label]), label)
+        self.assertIn('Loaded 40 rows', out.getvalue())
+
+        customer = Order.objects.first().customer
+        self.assertEqual(customer.order_count, customer.orders.count())
+        self.assertEqual({str(order.ordered_at) for order in Order.objects.all()},
+                         {obj['fields']['ordered_at'] for obj in expected if obj['model'] == 'movie_shows.order'})
+
+        # Sequences continue after the loaded primary keys.
+        hall = CinemaHall.objects.create(name='New Hall', seats=10)
+        self.assertGreater(hall.pk, max(obj['pk'] for obj in expected if obj['model'] == 'movie_shows.cinemahall'))
+
+    def test_field_definitions_are_left_alone(self):
+        ordered_at = Order._meta.get_field('ordered_at')
+        bulk_create = QuerySet.bulk_create
+        stamped = []
+
+        def recording_bulk_create(queryset, *args, **kwargs):
+            stamped.append(ordered_at.auto_now_add)
+            return bulk_create(queryset, *args, **kwargs)
+
+        # Other threads keep saving orders while a catalog loads, they still need their dates.
+        with mock.patch.object(QuerySet, 'bulk_create', recording_bulk_create):
+            call_command('load_catalog', CATALOG, '--ignore-nonexistent', stdout=io.StringIO())
+        self.assertTrue(stamped)
+        self.assertTrue(all(stamped))
+
+    def test_gzipped_fixture(self):
+        path = self.write_fixture([{'model': 'movie_shows.cinemahall', 'pk': 1,
+                                    'fields': {'name': 'Hall', 'seats': 10}}], compress=True)
+        call_command('load_catalog', path, stdout=io.StringIO())
+        self.assertEqual(CinemaHall.objects.get().name, 'Hall')
+
+    def test_existing_rows_are_replaced(self):
+        CinemaHall.objects.create(pk=1, name='Old Hall', seats=10)
+        path = self.write_fixture([{'model': 'movie_shows.cinemahall', 'pk': 1,
+                                    'fields': {'name': 'Hall', 'seats': 20}}])
+        call_command('load_catalog', path, stdout=io.StringIO())
+        hall = CinemaHall.objects.get()
+        self.assertEqual((hall.name, hall.seats), ('Hall', 20))
+
+    def test_loading_a_fixture_twice(self):
+        path = self.write_fixture([
+            {'model': 'auth.group', 'pk': 1, 'fields': {'name': 'Cashiers', 'permissions': []}},
+            {'model': 'users.customer', 'pk': 1, 'fields': {'username': 'cashier', 'password': '!', 'groups': [1]}},
+        ])
+        call_command('load_catalog', path, stdout=io.StringIO())
+        call_command('load_catalog', path, stdout=io.StringIO())
+        customer = Customer.objects.get()
+        self.assertEqual(list(customer.groups.values_list('name', flat=True)), ['Cashiers'])
+
+    def test_rows_may_reference_later_rows(self):
+        path = self.write_fixture([
+            {'model': 'movie_shows.movieshow', 'pk': 1, 'fields': {
+                'movie': 1, 'movie_hall': 1, 'start_date': '2099-01-01', 'end_date': '2099-01-02',
+                'start_time': '10:00', 'end_time': '12:00', 'ticket_price': '10.00'}},
+            {'model': 'movie_shows.cinemahall', 'pk': 1, 'fields': {'name': 'Hall', 'seats': 10}},
+            {'model': 'movie_shows.movie', 'pk': 1, 'fields': {
+                'title': 'Movie', 'description': 'Description', 'duration_in_minutes': 120, 'director': 'Director'}},
+        ])
+        call_command('load_catalog', path, stdout=io.StringIO())
+        self.assertEqual(MovieShow.objects.get().ticket_price, Decimal('10.00'))
+
+    def test_dangling_foreign_key_rolls_back(self):
+        path = self.write_fixture([
+            {'model': 'movie_shows.cinemahall', 'pk': 1, 'fields': {'name': 'Hall', 'seats': 10}},
+            {'model': 'movie_shows.movieshow', 'pk': 1, 'fields': {
+                'movie': 99, 'movie_hall': 1, 'start_date': '2099-01-01', 'end_date': '2099-01-02',
+                'start_time': '10:00', 'end_time': '12:00', 'ticket_price': '10.00'}},
+        ])
+        with self.assertRaises(CommandError):
+            call_command('load_catalog', path, stdout=io.StringIO())
+        self.assertFalse(CinemaHall.objects.exists())
@@ -227,3 +227,87 @@ class OrderModelTest(TestCase):
 
         expected_str = f'Order {order.id} by {self.user.username}'
         self.assertEqual(str(order), expected_str)
+
+
+class MovieShowCollisionTest(TestCase):
+
+    def setUp(self):
+        self.movie = Movie.objects.create(
+                title='Test Movie',
+                description='This is a test movie description.',
+                duration_in_minutes=120,
+                director='Test Director',
+        )
+        self.cinema_hall = CinemaHall.objects.create(name='Test Hall', seats=100)
+        self.movie_show = MovieShow.objects.create(
+                movie=self.movie,
+                movie_hall=self.cinema_hall,
+                start_time='12:00',
+                start_date='2023-01-10',
+                end_time='14:00',
+                end_date='2023-01-20',
+                ticket_price='10.00',
+        )
+
+    def colliding(self, start_date, end_date, start_time, end_time, movie_hall=None):
+        return list(MovieShow.objects.colliding(
+                movie_hall or self.cinema_hall, start_date, end_date, start_time, end_time))
+
+    def test_overlapping_dates_and_times_collide(self):
+        self.assertEqual(self.colliding('2023-01-15', '2023-01-25', '13:00', '15:00'), [self.movie_show])
+
+    def test_show_inside_another_show_collides(self):
+        self.assertEqual(self.colliding('2023-01-12', '2023-01-13', '12:30', '13:30'), [self.movie_show])
+
+    def test_show_wrapping_another_show_collides(self):
+        self.assertEqual(self.colliding('2023-01-01', '2023-01-31', '10:00', '16:00'), [self.movie_show])
+
+    def test_shared_boundary_date_collides(self):
+        self.assertEqual(self.colliding('2023-01-20', '2023-01-22', '12:00', '14:00'), [self.movie_show])
+
+    def test_back_to_back_times_do_not_collide(self):
+        self.assertEqual(self.colliding('2023-01-10', '2023-01-20', '14:00', '16:00'), [])
+        self.assertEqual(self.colliding('2023-01-10', '2023-01-20', '10:00', '12:00'), [])
+
+    def test_earlier_dates_do_not_collide(self):
+        self.assertEqual(self.colliding('2023-01-01', '2023-01-09', '12:00', '14:00'), [])
+
+    def test_later_dates_do_not_collide(self):
+        self.assertEqual(self.colliding('2023-01-21', '2023-01-30', '11:00', '13:00'), [])
+
+    def test_other_hall_does_not_collide(self):
+        other_hall = CinemaHall.objects.create(name='Other Hall', seats=100)
+        self.assertEqual(self.colliding('2023-01-10', '2023-01-20', '12:00', '14:00', other_hall), [])
+
+
+class CinemaHallBookedShowsTest(TestCase):
+
+    def setUp(self):
+        self.movie = Movie.objects.create(
+                title='Test Movie',
+                description='This is a test movie description.',
+                duration_in_minutes=120,
+                director='Test Director',
+        )
+        self.cinema_hall = CinemaHall.objects.create(name='Test Hall', seats=100)
+        MovieShow.objects.bulk_create([
+            MovieShow(movie=self.movie, movie_hall=self.cinema_hall, start_time='12:00', start_date='2023-01-10',
+                      end_time='14:00', end_date='2023-01-10', ticket_price='10.00')
+            for _ in range(50)
+        ])
+
+    def test_hall_without_bookings(self):
+        with self.assertNumQueries(1):
+            self.assertFalse(self.cinema_hall.has_booked_shows())
+
+    def test_hall_with_a_booked_show(self):
+        self.cinema_hall.shows.filter(pk=self.cinema_hall.shows.last().pk).update(sold_seats=1)
+        with self.assertNumQueries(1):
+            self.assertTrue(self.cinema_hall.has_booked_shows())
+
+    def test_booked_shows_in_other_halls_are_ignored(self):
+        other_hall = CinemaHall.objects.create(name='Other Hall', seats=100)
+        MovieShow.objects.create(movie=self.movie, movie_hall=other_hall, start_time='12:00',
+                                 start_date='2023-01-10', end_time='14:00', end_date='2023-01-10',
+                                 ticket_price='10.00', sold_seats=5)
+        self.assertFalse(self.cinema_hall.has_booked_shows())
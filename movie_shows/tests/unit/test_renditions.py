@@ -0,0 +1,126 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from movie_shows.api.serializers import MovieReadSerializer
+from movie_shows.models import Movie
+from movie_shows.renditions import FAILED_HASH, poster_sources, rendition_name
+from tasks.models import Task
+from tasks.queue import claim, execute
+
+
+def png(width, height, color=(200, 30, 30, 128)):
+    buffer = io.BytesIO()
+    Image.new('RGBA', (width, height), color).save(buffer, 'PNG')
+    return SimpleUploadedFile('poster.png', buffer.getvalue(), content_type='image/png')
+
+
+class PosterRenditionTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings = override_settings(MEDIA_ROOT=self.media_root, POSTER_RENDITION_WIDTHS=[250, 500, 750],
+                                     TASKS_EAGER=True)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def create_movie(self, poster):
+        return Movie.objects.create(title='Test Movie', description='', duration_in_minutes=120,
+                                    director='Test Director', poster=poster)
+
+    def rendition(self, movie, width, format):
+        return Image.open(os.path.join(self.media_root, rendition_name(movie.poster_hash, width, format)))
+
+    def test_upload_generates_renditions(self):
+        movie = self.create_movie(png(600, 900))
+        movie.refresh_from_db()
+        self.assertEqual(movie.poster_width, 600)
+        for width in (250, 500, 600):
+            for format, name in (('webp', 'WEBP'), ('jpeg', 'JPEG')):
+                with self.rendition(movie, width, format) as image:
+                    self.assertEqual((image.format, image.width, image.height), (name, width, width * 3 // 2))
+
+    def test_same_content_shares_renditions(self):
+        first = self.create_movie(png(300, 450))
+        second = self.create_movie(png(300, 450))
+        self.assertEqual(first.poster_hash, second.poster_hash)
+        self.assertNotEqual(first.poster.name, second.poster.name)
+
+    def test_replacing_the_poster_regenerates(self):
+        movie = self.create_movie(png(300, 450))
+        previous = movie.poster_hash
+        movie.poster = png(300, 450, color=(0, 0, 255, 255))
+        movie.save()
+        self.assertNotEqual(movie.poster_hash, previous)
+
+        movie.title = 'Renamed'
+        movie.save()
+        self.assertEqual(Movie.objects.get(pk=movie.pk).poster_hash, movie.poster_hash)
+
+    def test_template_and_serializer_srcsets(self):
+        movie = self.create_movie(png(600, 900))
+        html = Template('{% load posters %}{% poster movie %}').render(Context({'movie': movie}))
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn(f'/media/{rendition_name(movie.poster_hash, 500, "webp")} 500w', html)
+        self.assertIn(f'src="/media/{rendition_name(movie.poster_hash, 250, "jpeg")}"', html)
+
+        self.assertEqual([source['format'] for source in poster_sources(movie)], ['webp', 'jpeg'])
+
+    def test_uploads_are_resized_by_the_worker(self):
+        with self.settings(TASKS_EAGER=False):
+            movie = self.create_movie(png(300, 450))
+            self.assertEqual(poster_sources(movie), [])
+            task = Task.objects.get(name='movie_shows.tasks.generate_poster_renditions')
+            self.assertEqual((task.queue, task.args, task.status), ('posters', [movie.pk], Task.QUEUED))
+
+            # Reading the movie while the task is pending serves the original and writes nothing.
+            movie = Movie.objects.get(pk=movie.pk)
+            with self.assertNumQueries(0):
+                html = Template('{% load posters %}{% poster movie %}').render(Context({'movie': movie}))
+                self.assertEqual(MovieReadSerializer(movie).data['poster_srcset'], {})
+            self.assertIn(f'src="{movie.poster.url}"', html)
+            self.assertEqual(Task.objects.count(), 1)
+
+            for pk in claim('test-worker', ['posters'], limit=10):
+                execute(pk)
+        movie.refresh_from_db()
+        self.assertEqual(movie.poster_width, 300)
+        self.assertEqual(Task.objects.get().status, Task.DONE)
+
+    def test_unreadable_poster_falls_back_to_the_original(self):
+        movie = self.create_movie(SimpleUploadedFile('poster.png', b'not an image', content_type='image/png'))
+        self.assertEqual(movie.poster_hash, FAILED_HASH)
+        html = Template('{% load posters %}{% poster movie %}').render(Context({'movie': movie}))
+        self.assertIn(f'src="{movie.poster.url}"', html)
+        self.assertNotIn('srcset', html)
+
+    def test_failed_posters_are_not_queued_again(self):
+        with self.settings(TASKS_EAGER=False):
+            movie = self.create_movie(SimpleUploadedFile('poster.png', b'not an image', content_type='image/png'))
+            Task.objects.update(max_attempts=1)
+            for pk in claim('test-worker', ['posters'], limit=10):
+                execute(pk)
+            self.assertEqual(Task.objects.get().status, Task.FAILED)
+
+            movie = Movie.objects.get(pk=movie.pk)
+            with self.assertNumQueries(0):
+                Template('{% load posters %}{% poster movie %}').render(Context({'movie': movie}))
+            self.assertEqual(Task.objects.count(), 1)
+
+        # Replacing the poster clears the failure.
+        movie.poster = png(300, 450)
+        movie.save()
+        self.assertEqual(movie.poster_width, 300)
+
+    def test_command_backfills_missing_renditions(self):
+        movie = self.create_movie(png(300, 450))
+        Movie.objects.filter(pk=movie.pk).update(poster_hash=FAILED_HASH, poster_width=None)
+        call_command('generate_poster_renditions', stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertEqual(Movie.objects.get(pk=movie.pk).poster_hash, movie.poster_hash)
@@ -0,0 +1,119 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from movie_shows.imports import import_shows
+from movie_shows.models import CinemaHall, Movie, MovieShow, Order, SalesRollup
+from movie_shows import reports
+from movie_shows.reports import rebuild_rollups, sales_report
+from movie_shows.services import book_many, book_seats
+from users.models import Customer
+
+
+class SalesRollupTest(TestCase):
+    def setUp(self):
+        self.today = timezone.now().date()
+        self.customer = Customer.objects.create(username='testuser', balance=1000)
+        self.halls = [CinemaHall.objects.create(name=f'Hall {index}', seats=10) for index in range(2)]
+        self.movie = Movie.objects.create(title='Test Movie', description='', duration_in_minutes=120,
+                                          director='Test Director')
+        self.shows = [
+            self.create_movie_show(self.halls[0], '10:00', '12:00'),
+            self.create_movie_show(self.halls[0], '14:00', '16:00'),
+            self.create_movie_show(self.halls[1], '10:00', '12:00', offset=1),
+        ]
+
+    def create_movie_show(self, cinema_hall, start_time, end_time, offset=0):
+        return MovieShow.objects.create(movie=self.movie, movie_hall=cinema_hall, start_time=start_time,
+                                        end_time=end_time, start_date=self.today + timedelta(days=offset),
+                                        end_date=self.today + timedelta(days=offset), ticket_price=Decimal('10.00'))
+
+    def rollups(self):
+        return sorted(SalesRollup.objects.values_list(
+                'show_date', 'movie_hall', 'shows', 'capacity', 'orders', 'tickets', 'revenue'))
+
+    def test_rollups_follow_shows_and_orders(self):
+        book_seats(self.customer, self.shows[0], 3)
+        book_many([{'customer': self.customer.pk, 'movie_show': self.shows[1].pk, 'seat_quantity': 2},
+                   {'customer': self.customer.pk, 'movie_show': self.shows[2].pk, 'seat_quantity': 5}])
+        self.assertEqual(self.rollups(), [
+            (self.today, self.halls[0].pk, 2, 20, 2, 5, Decimal('50.00')),
+            (self.today + timedelta(days=1), self.halls[1].pk, 1, 10, 1, 5, Decimal('50.00')),
+        ])
+
+        incremental = self.rollups()
+        rebuild_rollups()
+        self.assertEqual(self.rollups(), incremental)
+
+    def test_moving_and_deleting_shows(self):
+        book_seats(self.customer, self.shows[1], 4)
+        self.shows[1].start_date = self.shows[1].end_date = self.today + timedelta(days=1)
+        self.shows[1].movie_hall = self.halls[1]
+        self.shows[1].save()
+        self.assertEqual(self.rollups(), [
+            (self.today, self.halls[0].pk, 1, 10, 0, 0, Decimal('0.00')),
+            (self.today + timedelta(days=1), self.halls[1].pk, 2, 20, 1, 4, Decimal('40.00')),
+        ])
+
+        self.shows[2].delete()
+        self.assertEqual(self.rollups()[1], (self.today + timedelta(days=1), self.halls[1].pk, 1, 10, 1, 4,
+                                             Decimal('40.00')))
+
+    def test_resizing_a_hall_updates_capacity(self):
+        self.halls[0].seats = 50
+        self.halls[0].save()
+        self.assertEqual(self.rollups()[0][3], 100)
+
+    def test_orders_for_shows_without_a_rollup(self):
+        SalesRollup.objects.all().delete()
+        book_seats(self.customer, self.shows[0], 2)
+        self.assertEqual(self.rollups(), [(self.today, self.halls[0].pk, 2, 20, 1, 2, Decimal('20.00'))])
+
+    def test_row_created_by_a_concurrent_order(self):
+        SalesRollup.objects.all().delete()
+        increment = reports._increment
+
+        def create_concurrently(totals, fields):
+            # Another booking creates the missing row between the update and the insert of this one.
+            missing = increment(totals, fields)
+            if missing:
+                SalesRollup.objects.create(show_date=self.today, movie=self.movie, movie_hall=self.halls[0], shows=2,
+                                           capacity=20, orders=1, tickets=1, revenue=10)
+            return missing
+
+        with mock.patch('movie_shows.reports._increment', side_effect=create_concurrently):
+            book_seats(self.customer, self.shows[0], 2)
+        self.assertEqual(self.rollups(), [(self.today, self.halls[0].pk, 2, 20, 2, 3, Decimal('30.00'))])
+
+    def test_imported_shows(self):
+        day = (self.today + timedelta(days=1)).isoformat()
+        import_shows([
+            {'movie': self.movie.pk, 'movie_hall': self.halls[1].pk, 'start_date': day, 'end_date': day,
+             'start_time': '14:00', 'end_time': '16:00', 'ticket_price': '10.00'},
+            {'movie': self.movie.pk, 'movie_hall': self.halls[0].pk, 'start_date': day, 'end_date': day,
+             'start_time': '14:00', 'end_time': '16:00', 'ticket_price': '10.00'},
+        ])
+        self.assertEqual([row[:4] for row in self.rollups()], [
+            (self.today, self.halls[0].pk, 2, 20),
+            (self.today + timedelta(days=1), self.halls[0].pk, 1, 10),
+            (self.today + timedelta(days=1), self.halls[1].pk, 2, 20),
+        ])
+
+    def test_reports(self):
+        book_seats(self.customer, self.shows[0], 5)
+        book_seats(self.customer, self.shows[2], 1)
+        Order.objects.create(customer=self.customer, movie_show=self.shows[2], seat_quantity=1, total_cost=10)
+
+        by_hall = sales_report('fill_rate', by='hall')
+        self.assertEqual([(row['movie_hall_name'], row['fill_rate']) for row in by_hall],
+                         [('Hall 0', 0.25), ('Hall 1', 0.2)])
+        # Both orders were placed today, they count on the day their show starts.
+        by_day = sales_report('revenue', by='show_date', start_date=self.today + timedelta(days=1))
+        self.assertEqual(by_day,
+                         [{'show_date': self.today + timedelta(days=1), 'orders': 2, 'revenue': Decimal('20.00')}])
+        by_movie = sales_report('tickets', by='movie', hall=self.halls[0].pk)
+        self.assertEqual(by_movie, [{'movie': self.movie.pk, 'movie_title': 'Test Movie', 'orders': 1, 'tickets': 5}])
@@ -0,0 +1,97 @@
+from datetime import time, timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from movie_shows.cache import get_schedule_cache
+from movie_shows.models import CinemaHall, DailySchedule, MaterializedDay, Movie, MovieShow
+from movie_shows.schedule import filter_shows, rebuild_schedule, shows_on_day
+
+
+@override_settings(DAILY_SCHEDULE_DAYS=2)
+class DailyScheduleTest(TestCase):
+    def setUp(self):
+        get_schedule_cache().clear()
+        self.today = timezone.now().date()
+        self.cinema_hall = CinemaHall.objects.create(name='Test Hall', seats=100)
+        self.movie = Movie.objects.create(
+                title='Test Movie',
+                description='This is a test movie description.',
+                duration_in_minutes=120,
+                director='Test Director',
+        )
+        self.movie_show = self.create_movie_show(self.cinema_hall, '12:00', '14:00', days=5)
+
+    def create_movie_show(self, cinema_hall, start_time, end_time, offset=0, days=1):
+        return MovieShow.objects.create(
+                movie=self.movie,
+                movie_hall=cinema_hall,
+                start_time=start_time,
+                start_date=self.today + timedelta(days=offset),
+                end_time=end_time,
+                end_date=self.today + timedelta(days=offset + days - 1),
+                ticket_price=Decimal('10.00'),
+        )
+
+    def rows(self, movie_show):
+        return list(DailySchedule.objects.filter(movie_show=movie_show).order_by('date').values_list(
+                'date', 'start_time'))
+
+    def test_saving_a_show_materializes_the_window(self):
+        self.assertEqual([row[0] for row in self.rows(self.movie_show)],
+                         [self.today, self.today + timedelta(days=1)])
+
+    def test_moving_a_show_moves_its_rows(self):
+        self.movie_show.start_date = self.today + timedelta(days=1)
+        self.movie_show.start_time = '16:00'
+        self.movie_show.end_time = '18:00'
+        self.movie_show.save()
+        self.assertEqual([row[:2] for row in self.rows(self.movie_show)],
+                         [(self.today + timedelta(days=1), time(16, 0))])
+
+    def test_deleting_a_show_removes_its_rows(self):
+        self.movie_show.delete()
+        self.assertFalse(DailySchedule.objects.exists())
+
+    def test_unmaterialized_days_are_read_live(self):
+        MovieShow.objects.bulk_create([MovieShow(
+                movie=self.movie, movie_hall=self.cinema_hall, start_time='20:00', end_time='22:00',
+                start_date=self.today, end_date=self.today, ticket_price=Decimal('10.00'))])
+        rows = DailySchedule.objects.count()
+        with self.assertNumQueries(2):
+            self.assertEqual(shows_on_day(MovieShow.objects.all(), self.today).count(), 2)
+        self.assertEqual(DailySchedule.objects.count(), rows)
+        self.assertFalse(MaterializedDay.objects.exists())
+
+    def test_materialized_days_are_read_from_the_schedule(self):
+        rebuild_schedule()
+        # bulk_create() sends no post_save, so the show only shows up once the schedule is rebuilt.
+        MovieShow.objects.bulk_create([MovieShow(
+                movie=self.movie, movie_hall=self.cinema_hall, start_time='20:00', end_time='22:00',
+                start_date=self.today, end_date=self.today, ticket_price=Decimal('10.00'))])
+        self.assertEqual(shows_on_day(MovieShow.objects.all(), self.today).count(), 1)
+        rebuild_schedule()
+        self.assertEqual(shows_on_day(MovieShow.objects.all(), self.today).count(), 2)
+
+    def test_rebuild_drops_past_days(self):
+        DailySchedule.objects.create(date=self.today - timedelta(days=1), movie_hall=self.cinema_hall,
+                                     movie_show=self.movie_show, start_time='12:00', ticket_price=Decimal('10.00'))
+        self.assertEqual(rebuild_schedule(), 2)
+        self.assertEqual(DailySchedule.objects.filter(date__lt=self.today).count(), 0)
+
+    def test_today_filters_match_a_single_schedule_row(self):
+        other_hall = CinemaHall.objects.create(name='Other Hall', seats=100)
+        evening_show = self.create_movie_show(other_hall, '20:00', '22:00')
+        self.create_movie_show(self.cinema_hall, '10:00', '11:00', offset=1)
+
+        for materialized in [False, True]:
+            if materialized:
+                rebuild_schedule()
+            with self.subTest(materialized=materialized):
+                shows = filter_shows(MovieShow.objects.all(), {'day': 'today', 'from': '11:00', 'to': '21:00',
+                                                               'hall': other_hall.pk})
+                self.assertEqual(list(shows), [evening_show])
+
+                shows = filter_shows(MovieShow.objects.all(), {'day': 'next_day', 'sort_by': 'start_time'})
+                self.assertEqual([show.start_time.hour for show in shows], [10, 12])
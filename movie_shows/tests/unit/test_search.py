@@ -0,0 +1,54 @@
+from django.test import TestCase
+
+from movie_shows.models import Movie
+from movie_shows.search import match_movies, search_movies
+
+
+class MovieSearchTest(TestCase):
+    def setUp(self):
+        self.interstellar = Movie.objects.create(title='Interstellar', director='Christopher Nolan',
+                                                 description='Explorers travel through a wormhole.',
+                                                 duration_in_minutes=169)
+        self.tenet = Movie.objects.create(title='Tenet', director='Christopher Nolan',
+                                          description='A secret agent manipulates the flow of time.',
+                                          duration_in_minutes=150)
+        self.aladdin = Movie.objects.create(title='Aladdin', director='Guy Ritchie',
+                                            description='A street urchin finds a lamp with a genie inside.',
+                                            duration_in_minutes=128)
+
+    def search(self, text):
+        return list(search_movies(Movie.objects.all(), text))
+
+    def test_matches_title_director_and_description(self):
+        self.assertEqual(self.search('Interstellar'), [self.interstellar])
+        self.assertEqual(self.search('ritchie'), [self.aladdin])
+        self.assertEqual(self.search('wormhole'), [self.interstellar])
+
+    def test_every_word_has_to_match(self):
+        self.assertEqual(set(self.search('nolan')), {self.interstellar, self.tenet})
+        self.assertEqual(self.search('nolan wormhole'), [self.interstellar])
+        self.assertEqual(self.search('ritchie wormhole'), [])
+
+    def test_matches_the_word_being_typed(self):
+        self.assertEqual(self.search('Inter'), [self.interstellar])
+        self.assertEqual(self.search('christopher nola'), self.search('christopher nolan'))
+        self.assertEqual(self.search('Ala'), [self.aladdin])
+
+    def test_titles_rank_before_descriptions(self):
+        genie = Movie.objects.create(title='Genie', director='Test Director', description='',
+                                     duration_in_minutes=100)
+        self.assertEqual(self.search('genie'), [genie, self.aladdin])
+
+    def test_search_follows_saved_changes(self):
+        self.tenet.title = 'Oppenheimer'
+        self.tenet.save()
+        self.assertEqual(self.search('oppenheimer'), [self.tenet])
+        self.assertEqual(self.search('tenet'), [])
+
+        self.tenet.duration_in_minutes = 180
+        self.tenet.save(update_fields=['duration_in_minutes'])
+        self.assertEqual(self.search('oppenheimer'), [self.tenet])
+
+    def test_text_without_words_matches_nothing(self):
+        self.assertEqual(self.search(' -- '), [])
+        self.assertFalse(match_movies(Movie.objects.all(), '').exists())
@@ -0,0 +1,169 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from movie_shows.exceptions import BookingException, NoFreeSeatsException, InsufficientBalanceException
+from movie_shows.models import CinemaHall, Movie, MovieShow, Order
+from movie_shows.services import book_many, book_seats
+from users.models import Customer
+
+
+class BookSeatsTest(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(username='testuser', balance=100)
+        self.cinema_hall = CinemaHall.objects.create(name='Test Hall', seats=10)
+        self.movie = Movie.objects.create(
+                title='Test Movie',
+                description='This is a test movie description.',
+                duration_in_minutes=120,
+                director='Test Director',
+        )
+        self.movie_show = MovieShow.objects.create(
+                movie=self.movie,
+                movie_hall=self.cinema_hall,
+                start_time='12:00',
+                start_date=timezone.now().date(),
+                end_time='14:00',
+                end_date=timezone.now().date(),
+                sold_seats=5,
+                ticket_price=Decimal('10.00'),
+        )
+
+    def test_book_seats_creates_order(self):
+        order = book_seats(self.customer, self.movie_show, 3)
+
+        self.assertEqual(order.customer, self.customer)
+        self.assertEqual(order.seat_quantity, 3)
+        self.assertEqual(order.total_cost, Decimal('30.00'))
+
+        self.movie_show.refresh_from_db()
+        self.customer.refresh_from_db()
+        self.assertEqual(self.movie_show.sold_seats, 8)
+        self.assertEqual(self.customer.balance, Decimal('70.00'))
+
+    def test_book_seats_updates_the_customer_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            book_seats(self.customer, self.movie_show, 3)
+        customer_updates = [query for query in queries
+                            if query['sql'].startswith(f'UPDATE "{Customer._meta.db_table}"')]
+        self.assertEqual(len(customer_updates), 1)
+
+        self.customer.refresh_from_db()
+        self.assertEqual((self.customer.balance, self.customer.total_spent, self.customer.order_count),
+                         (Decimal('70.00'), Decimal('30.00'), 1))
+
+    def test_book_last_free_seats(self):
+        book_seats(self.customer, self.movie_show, 5)
+
+        self.movie_show.refresh_from_db()
+        self.assertEqual(self.movie_show.sold_seats, self.cinema_hall.seats)
+
+    def test_book_more_seats_than_available(self):
+        with self.assertRaises(NoFreeSeatsException):
+            book_seats(self.customer, self.movie_show, 6)
+
+        self.movie_show.refresh_from_db()
+        self.customer.refresh_from_db()
+        self.assertEqual(self.movie_show.sold_seats, 5)
+        self.assertEqual(self.customer.balance, Decimal('100.00'))
+        self.assertFalse(Order.objects.exists())
+
+    def test_stale_movie_show_cannot_oversell(self):
+        stale_movie_show = MovieShow.objects.get(pk=self.movie_show.pk)
+        book_seats(self.customer, self.movie_show, 4)
+
+        with self.assertRaises(NoFreeSeatsException):
+            book_seats(self.customer, stale_movie_show, 4)
+
+        self.movie_show.refresh_from_db()
+        self.assertEqual(self.movie_show.sold_seats, 9)
+
+    def test_insufficient_balance_releases_seats(self):
+        self.customer.balance = 20
+        self.customer.save()
+
+        with self.assertRaises(InsufficientBalanceException):
+            book_seats(self.customer, self.movie_show, 3)
+
+        self.movie_show.refresh_from_db()
+        self.customer.refresh_from_db()
+        self.assertEqual(self.movie_show.sold_seats, 5)
+        self.assertEqual(self.customer.balance, Decimal('20.00'))
+        self.assertFalse(Order.objects.exists())
+
+
+class BookManyTest(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(username='testuser', balance=100)
+        self.other_customer = Customer.objects.create(username='otheruser', balance=15)
+        self.cinema_hall = CinemaHall.objects.create(name='Test Hall', seats=10)
+        self.movie = Movie.objects.create(
+                title='Test Movie',
+                description='This is a test movie description.',
+                duration_in_minutes=120,
+                director='Test Director',
+        )
+        self.movie_shows = [
+            MovieShow.objects.create(
+                    movie=self.movie,
+                    movie_hall=self.cinema_hall,
+                    start_time=start_time,
+                    start_date=timezone.now().date(),
+                    end_time=end_time,
+                    end_date=timezone.now().date(),
+                    ticket_price=Decimal('5.00'),
+            )
+            for start_time, end_time in [('12:00', '14:00'), ('16:00', '18:00')]
+        ]
+
+    def line(self, customer, movie_show, seat_quantity):
+        return {'customer': customer.pk, 'movie_show': movie_show.pk, 'seat_quantity': seat_quantity}
+
+    def test_book_many_applies_every_valid_line(self):
+        first, second = self.movie_shows
+        results = book_many([
+            self.line(self.customer, first, 4),
+            self.line(self.customer, second, 2),
+            self.line(self.other_customer, first, 3),
+        ])
+
+        self.assertTrue(all(isinstance(result, Order) for result in results))
+        self.assertEqual(Order.objects.count(), 3)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.sold_seats, second.sold_seats), (7, 2))
+
+        self.customer.refresh_from_db()
+        self.other_customer.refresh_from_db()
+        self.assertEqual((self.customer.balance, self.customer.total_spent, self.customer.order_count),
+                         (Decimal('70.00'), Decimal('30.00'), 2))
+        self.assertEqual(self.other_customer.balance, Decimal('0.00'))
+
+    def test_book_many_reports_failed_lines(self):
+        first, second = self.movie_shows
+        results = book_many([
+            self.line(self.customer, first, 8),
+            self.line(self.customer, first, 3),
+            self.line(self.other_customer, second, 4),
+            {'customer': self.customer.pk, 'movie_show': 0, 'seat_quantity': 1},
+            self.line(self.other_customer, second, 3),
+        ])
+
+        self.assertIsInstance(results[0], Order)
+        self.assertIsInstance(results[1], NoFreeSeatsException)
+        self.assertIsInstance(results[2], InsufficientBalanceException)
+        self.assertIsInstance(results[3], BookingException)
+        self.assertIsInstance(results[4], Order)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.sold_seats, second.sold_seats), (8, 3))
+
+    def test_book_many_query_count_does_not_grow_with_lines(self):
+        lines = [self.line(self.customer, movie_show, 1) for movie_show in self.movie_shows] * 4
+        # Savepoint, two locking reads, two bulk updates, the insert, the rollup update and the savepoint release.
+        with self.assertNumQueries(8):
+            results = book_many(lines)
+        self.assertEqual(len(results), 8)
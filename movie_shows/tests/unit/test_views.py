@@ -5,11 +5,13 @@ from django.http import Http404
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
 from django.test.client import RequestFactory
 from django.utils import timezone
 
 from movie_shows.forms import OrderCreateForm
 from movie_shows.models import CinemaHall, MovieShow, Movie
+from movie_shows.schedule import rebuild_schedule
 from movie_shows.views import CinemaHallDetailView, CinemaHallUpdateView, CinemaHallDeleteView, MovieShowDetailView, \
     MovieShowListView, MovieShowUpdateView
 from users.models import Customer
@@ -336,3 +338,60 @@ class MovieShowUpdateViewTest(TestCase):
         view.setup(request)
         success_url = view.get_success_url()
         self.assertEqual(success_url, '/cinema/')
+
+
+class MovieShowListViewQueryBudgetTest(TestCase):
+    QUERY_BUDGET = 2
+
+    def setUp(self):
+        for index in range(10):
+            hall = CinemaHall.objects.create(name=f'Hall {index}', seats=100)
+            movie = Movie.objects.create(
+                    title=f'Movie {index}',
+                    description='This is a test movie description.',
+                    duration_in_minutes=120,
+                    director='Test Director',
+            )
+            MovieShow.objects.create(
+                    movie=movie,
+                    movie_hall=hall,
+                    start_time='12:00',
+                    start_date=timezone.now().date(),
+                    end_time='14:00',
+                    end_date=timezone.now().date(),
+                    ticket_price=10.00
+            )
+        rebuild_schedule()
+
+    def get_rendered_page(self, data=None):
+        request = RequestFactory().get(reverse('shows:show_list'), data)
+        request.user = AnonymousUser()
+        response = MovieShowListView.as_view()(request)
+        return response.render()
+
+    def test_show_list_query_budget(self):
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            response = self.get_rendered_page()
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Movie 0')
+
+    def test_show_list_query_budget_with_filters(self):
+        # The day filter also looks up whether the day is materialized.
+        with self.assertNumQueries(self.QUERY_BUDGET + 1):
+            response = self.get_rendered_page({'day': 'today', 'sort_by': 'ticket_price', 'sort_order': 'desc',
+                                               'page': 2})
+        self.assertEqual(response.status_code, 200)
+
+
+class MovieListViewSearchTest(TestCase):
+    def setUp(self):
+        for title in ['Arrival', 'Alien', 'Aliens', 'Heat']:
+            Movie.objects.create(title=title, description='', duration_in_minutes=120, director='Test Director')
+
+    def test_search_filters_the_list(self):
+        response = self.client.get(reverse('shows:movie_list'), {'q': 'alie'})
+        self.assertEqual([movie.title for movie in response.context['movies']], ['Alien', 'Aliens'])
+        self.assertContains(response, 'value="alie"')
+
+        response = self.client.get(reverse('shows:movie_list'), {'q': 'jaws'})
+        self.assertContains(response, 'No movies match')
@@ -2,7 +2,7 @@ from django.urls import path, include
 
 from movie_shows.views import CinemaHallCreateView, CinemaHallDetailView, CinemaHallListView, MovieShowListView, \
     MovieShowDetailView, MovieShowCreateView, MovieListView, CinemaHallUpdateView, CinemaHallDeleteView, \
-    MovieShowUpdateView, MovieShowDeleteView, OrderCreateView
+    MovieShowUpdateView, MovieShowDeleteView, MovieShowSeatsView, OrderCreateView
 
 app_name = 'shows'
 
@@ -19,6 +19,7 @@ urlpatterns = [
     path('show/<int:pk>/', MovieShowDetailView.as_view(), name='show_detail'),
     path('show/<int:pk>/delete/', MovieShowDeleteView.as_view(), name='delete_show'),
     path('show/<int:pk>/edit/', MovieShowUpdateView.as_view(), name='update_show'),
+    path('show/<int:pk>/seats/', MovieShowSeatsView.as_view(), name='show_seats'),
 
     path('show/<int:pk>/order/', OrderCreateView.as_view(), name='create_order'),
 
@@ -1,16 +1,19 @@
-from datetime import timedelta
-
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db import transaction
-from django.http import HttpResponseRedirect
+from django.http import Http404, HttpResponse, HttpResponseRedirect
 from django.urls import reverse_lazy
-from django.utils import timezone
+from django.views import View
 from django.views.generic import CreateView, DetailView, ListView, UpdateView, DeleteView
 
+from movie_shows.availability import EVENT_STREAM_HEADERS, available_seats, first_event
+from movie_shows.cache import schedule_cache_key, get_or_build
+from movie_shows.exceptions import BookingException
 from movie_shows.forms import CinemaHallCreateForm, MovieShowCreateForm, OrderCreateForm
-from movie_shows.mixins import AdminRequiredMixin, SoldTicketCheckMixin
+from movie_shows.mixins import AdminRequiredMixin, SoldTicketCheckMixin, ScheduleCacheMixin
 from movie_shows.models import CinemaHall, MovieShow, Movie, Order
+from movie_shows.schedule import shows_on_day, resolve_day
+from movie_shows.search import search_movies
+from movie_shows.services import book_seats
 
 
 class MovieListView(ListView):
@@ -20,6 +23,15 @@ class MovieListView(ListView):
     paginate_by = 2
     ordering = ['-title']
 
+    def get_queryset(self):
+        query = self.request.GET.get('q', '').strip()
+        if query:
+            return search_movies(Movie.objects.all(), query)
+        return super().get_queryset()
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(query=self.request.GET.get('q', '').strip(), **kwargs)
+
 
 class CinemaHallDetailView(LoginRequiredMixin, DetailView):
     login_url = reverse_lazy('users:login')
@@ -28,7 +40,10 @@ class CinemaHallDetailView(LoginRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['shows'] = self.object.shows.all().order_by('-start_date')
+        context['shows'] = get_or_build(
+                schedule_cache_key('hall_shows', {'hall': self.object.pk}, hall_id=self.object.pk),
+                lambda: list(self.object.shows.select_related('movie', 'movie_hall').order_by('-start_date')),
+        )
         return context
 
 
@@ -44,7 +59,8 @@ class CinemaHallUpdateView(AdminRequiredMixin, SoldTicketCheckMixin, UpdateView)
         return self.object.get_absolute_url()
 
 
-class CinemaHallListView(ListView):
+class CinemaHallListView(ScheduleCacheMixin, ListView):
+    cache_prefix = 'hall_list'
     model = CinemaHall
     template_name = 'movie_shows/halls/hall_list.html'
     paginate_by = 5
@@ -75,14 +91,15 @@ class CinemaHallCreateView(AdminRequiredMixin, CreateView):
         return self.object.get_absolute_url()
 
 
-class MovieShowListView(ListView):
+class MovieShowListView(ScheduleCacheMixin, ListView):
+    cache_prefix = 'show_list'
     model = MovieShow
     template_name = 'movie_shows/shows/show_list.html'
     context_object_name = 'shows'
     paginate_by = 3
 
     def get_queryset(self):
-        queryset = MovieShow.objects.all()
+        queryset = MovieShow.objects.for_listing()
 
         sort_by = self.request.GET.get('sort_by', 'start_time')
         sort_order = self.request.GET.get('sort_order', 'asc')
@@ -93,18 +110,8 @@ class MovieShowListView(ListView):
         else:
             queryset = queryset.order_by(f'-{sort_by}', '-ticket_price')
 
-        if day == 'today':
-            today = timezone.now().date()
-            queryset = queryset.filter(
-                    start_date__lte=today,
-                    end_date__gte=today
-            )
-        elif day == 'next_day':
-            next_day = timezone.now().date() + timedelta(days=1)
-            queryset = queryset.filter(
-                    start_date__lte=next_day,
-                    end_date__gte=next_day
-            )
+        if day in ['today', 'next_day']:
+            queryset = shows_on_day(queryset, resolve_day(day))
 
         return queryset
 
@@ -130,6 +137,18 @@ class MovieShowDetailView(DetailView):
         return context
 
 
+class MovieShowSeatsView(View):
+    http_method_names = ['get']
+
+    def get(self, request, pk):
+        # Under ASGI the stream is served by SeatStreamMiddleware before Django sees the request. Other servers
+        # answer with the current count and the browser asks again after the retry delay.
+        seats = available_seats([pk])
+        if pk not in seats:
+            raise Http404
+        return HttpResponse(first_event(pk, seats[pk]), headers=EVENT_STREAM_HEADERS)
+
+
 class MovieShowCreateView(AdminRequiredMixin, CreateView):
     login_url = reverse_lazy('users:login')
     model = MovieShow
@@ -183,23 +202,17 @@ class OrderCreateView(LoginRequiredMixin, CreateView):
         return kwargs
 
     def form_valid(self, form):
-        order = form.save(commit=False)
-        seat_quantity = form.cleaned_data['seat_quantity']
-        movie_show = form.cleaned_data['movie_show']
-
-        movie_show.sold_seats += seat_quantity
-        order.total_cost = seat_quantity * movie_show.ticket_price
-        order.customer = form.request.user
-        order.movie_show = movie_show
-
-        order.customer.balance -= order.total_cost
-
-        with transaction.atomic():
-            order.save()
-            order.customer.save()
-            movie_show.save()
+        try:
+            self.object = book_seats(
+                    customer=form.request.user,
+                    movie_show=form.cleaned_data['movie_show'],
+                    seat_quantity=form.cleaned_data['seat_quantity'],
+            )
+        except BookingException as e:
+            messages.error(self.request, str(e))
+            return self.form_invalid(form)
         messages.success(self.request, "Order successful!")
-        return super().form_valid(form=form)
+        return HttpResponseRedirect(self.get_success_url())
 
     def form_invalid(self, form):
         return HttpResponseRedirect(reverse_lazy('shows:show_detail', kwargs={'pk': self.kwargs.get('pk')}))
@@ -13,4 +13,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'picture_palace_hub.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from movie_shows.availability import SeatStreamMiddleware  # noqa: E402, needs the app registry set up above
+
+application = SeatStreamMiddleware(django_application)
@@ -0,0 +1,171 @@
+import gzip
+import json
+import time
+from collections import Counter, defaultdict
+
+from django.core import serializers
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class FixtureFormatError(ValueError):
+    pass
+
+
+def open_fixture(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+def iter_objects(source, chunk_size=CHUNK_SIZE):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+    started = False
+
+    while True:
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            buffer = source.read(chunk_size)
+            position = 0
+            eof = not buffer
+
+        if position == len(buffer):
+            raise FixtureFormatError('The fixture ended before its closing bracket.')
+        if not started:
+            if buffer[position] != '[':
+                raise FixtureFormatError('A fixture must be a JSON list of objects.')
+            started = True
+            position += 1
+            continue
+        if buffer[position] == ']':
+            return
+
+        while True:
+            try:
+                obj, position = decoder.raw_decode(buffer, position)
+                break
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise FixtureFormatError(f'Invalid JSON: {e}')
+                # The object straddles the end of the buffer, so read on and decode it again.
+                chunk = source.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+        yield obj
+
+
+def timestamp_fields(model):
+    return [field.name for field in model._meta.local_concrete_fields
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is reported in kilobytes on Linux.
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class StreamingLoader:
+    def __init__(self, batch_size=2000, ignore_nonexistent=False, progress=None, progress_every=100000):
+        self.batch_size = batch_size
+        self.ignore_nonexistent = ignore_nonexistent
+        self.progress = progress
+        self.progress_every = progress_every
+        self.pending = defaultdict(list)
+        self.pending_m2m = defaultdict(list)
+        self.counts = Counter()
+
+    def load(self, source):
+        started = time.perf_counter()
+        with transaction.atomic():
+            # Rows of a model may point at rows further down the file, so constraints are checked once at the end.
+            with connection.constraint_checks_disabled():
+                for number, obj in enumerate(iter_objects(source), start=1):
+                    self.add(obj)
+                    if self.progress and number % self.progress_every == 0:
+                        self.progress(self.stats(started))
+                for model in list(self.pending):
+                    self.flush(model)
+                for through in list(self.pending_m2m):
+                    self.flush_m2m(through)
+
+            models = list(self.counts)
+            connection.check_constraints(table_names=[model._meta.db_table for model in models])
+            self.reset_sequences(models)
+        return self.stats(started)
+
+    def add(self, obj):
+        for deserialized in serializers.deserialize('python', [obj], ignorenonexistent=self.ignore_nonexistent):
+            instance = deserialized.object
+            model = type(instance)
+            self.pending[model].append(instance)
+            for name, pks in deserialized.m2m_data.items():
+                field = model._meta.get_field(name)
+                through = field.remote_field.through
+                source, target = f'{field.m2m_field_name()}_id', f'{field.m2m_reverse_field_name()}_id'
+                self.pending_m2m[through].extend(through(**{source: instance.pk, target: pk}) for pk in pks)
+                if len(self.pending_m2m[through]) >= self.batch_size:
+                    self.flush_m2m(through)
+            if len(self.pending[model]) >= self.batch_size:
+                self.flush(model)
+
+    def flush(self, model):
+        rows = self.pending.pop(model, [])
+        update_fields = [field.name for field in model._meta.local_concrete_fields if not field.primary_key]
+        # Like loaddata, a row whose pk is already in the table replaces it, and a later row with the same pk wins.
+        with_pk = list({row.pk: row for row in rows if row.pk is not None}.values())
+        without_pk = [row for row in rows if row.pk is None]
+        timestamps = timestamp_fields(model)
+        fixture_timestamps = [[getattr(row, name) for name in timestamps] for row in rows]
+        if update_fields:
+            model._base_manager.bulk_create(with_pk, batch_size=self.batch_size, update_conflicts=True,
+                                            unique_fields=[model._meta.pk.name], update_fields=update_fields)
+        else:
+            model._base_manager.bulk_create(with_pk, batch_size=self.batch_size)
+        model._base_manager.bulk_create(without_pk, batch_size=self.batch_size)
+        if timestamps:
+            # bulk_create stamps auto_now and auto_now_add fields with the current time. Like the raw saves of
+            # loaddata, the fixture keeps its own dates, so they are written back over the stamped ones.
+            for row, values in zip(rows, fixture_timestamps):
+                for name, value in zip(timestamps, values):
+                    if value is not None:
+                        setattr(row, name, value)
+            written = with_pk + [row for row in without_pk if row.pk is not None]
+            model._base_manager.bulk_update(written, timestamps, batch_size=self.batch_size)
+        self.counts[model] += len(rows)
+
+    def flush_m2m(self, through):
+        rows = self.pending_m2m.pop(through, [])
+        # Links that are already in the table are kept, so loading the same fixture again does not fail on them.
+        through.objects.bulk_create(rows, batch_size=self.batch_size, ignore_conflicts=True)
+        self.counts[through] += len(rows)
+
+    def reset_sequences(self, models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def stats(self, started):
+        elapsed = time.perf_counter() - started
+        rows = sum(self.counts.values())
+        return {
+            'rows': rows,
+            'seconds': round(elapsed, 2),
+            'rows_per_s': round(rows / elapsed, 1) if elapsed else None,
+            'peak_rss_mb': peak_rss_mb(),
+            'models': {model._meta.label: count for model, count in self.counts.items()},
+        }
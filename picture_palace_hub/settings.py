@@ -43,11 +43,14 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'users',
     'movie_shows',
+    'monitoring',
+    'tasks',
     'rest_framework',
     'rest_framework.authtoken',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middlewares.QueryStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -144,13 +147,72 @@ AUTH_USER_MODEL = "users.Customer"
 LOGIN_URL = reverse_lazy('users:login')
 LOGOUT_REDIRECT_URL = "cinema/shows/"
 
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+SCHEDULE_CACHE_ALIAS = 'default'
+SCHEDULE_CACHE_TIMEOUT = 300  # seconds
+DAILY_SCHEDULE_DAYS = 2  # days from today kept in the materialized daily schedule
+
+QUERY_STATS_ENABLED = os.environ.get('QUERY_STATS_ENABLED') == '1'
+QUERY_STATS_SAMPLES = 1000  # latest requests kept per view
+QUERY_STATS_CACHE_ALIAS = 'default'
+QUERY_STATS_PUBLISH_INTERVAL = 10  # seconds
+QUERY_STATS_TTL = 3600  # seconds
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+POSTER_RENDITIONS_DIR = 'renditions'  # under MEDIA_ROOT
+POSTER_RENDITION_WIDTHS = [250, 500, 750]  # 1x, 2x and 3x of the 250px poster cards
+POSTER_RENDITION_FORMATS = ['webp', 'jpeg']  # the last one is the <img> fallback
+POSTER_RENDITION_QUALITY = 80
+POSTER_DISPLAY_SIZES = '250px'
+
+TASKS_EAGER = os.environ.get('TASKS_EAGER') == '1'  # run tasks inline instead of queueing them, e.g. without a worker
+TASK_QUEUES = ['default', 'posters', 'reports', 'exports']
+TASK_QUEUE_CONCURRENCY = {'exports': 2}  # running tasks per queue across all workers
+TASK_CONCURRENCY = 4  # tasks run at once by one worker
+TASK_MAX_ATTEMPTS = 3
+TASK_RETRY_DELAY = 30  # seconds, doubled after every failed attempt
+TASK_LEASE_SECONDS = 600  # running tasks whose worker has not renewed them for this long are assumed to be lost
+TASK_HEARTBEAT_INTERVAL = 60  # seconds between lease renewals of the tasks a worker is running
+TASK_POLL_INTERVAL = 1.0  # seconds
+EXPORTS_DIR = 'exports'  # under MEDIA_ROOT
+
 TIME_SINCE_LAST_ACTION = 60  # seconds
+LAST_ACTION_GRANULARITY = 10  # seconds between idle timestamp updates
 
 TOKEN_TTL = 60
 
+TOKEN_CACHE_SIZE = 1024
+TOKEN_CACHE_TTL = 30  # seconds, 0 disables the token cache
+TOKEN_CACHE_ALIAS = 'default'  # CACHES alias shared by every process, None or a LocMemCache caches per process
+TOKEN_CACHE_LOCAL_TTL = 5  # seconds, a token deleted on one process is still accepted this long by the others
+
+BOOKING_RETRIES = 3
+BULK_ORDER_MAX_LINES = 500
+
+ORDER_HISTORY_PAGE_SIZE = 20
+CUSTOMER_RECENT_ORDERS = 10  # orders embedded in the customer API payload
+HALL_UPCOMING_SHOWS_DAYS = 7
+HALL_UPCOMING_SHOWS_LIMIT = 20  # shows embedded per hall in the hall API payload
+ORDER_EXPORT_CHUNK_SIZE = 2000  # rows fetched per round trip while streaming an export
+ASYNC_SCHEDULE_API = os.environ.get('ASYNC_SCHEDULE_API') == '1'  # serve show, hall and movie reads as async views
+
+SEAT_STREAM_POLL_INTERVAL = 1.0  # seconds between availability queries, shared by every open stream of a process
+SEAT_STREAM_KEEPALIVE = 15  # seconds, keeps idle connections open through proxies
+SEAT_STREAM_RETRY = 3000  # milliseconds browsers wait before reconnecting, or polling again without ASGI
+
+SEARCH_RESULTS_LIMIT = 20
+SEARCH_MAX_TERMS = 8
+SEARCH_MIN_PREFIX = 4  # letters before the last word also matches longer words, titles match from the first letter
+SEARCH_CANDIDATES = 100  # matches ranked per index, bounds the cost of searches that match much of a large catalog
+
 TIME_FORMAT = 'H:i:s'
 
 REST_FRAMEWORK = {
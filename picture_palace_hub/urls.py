@@ -22,6 +22,8 @@ from django.urls import path, include
 urlpatterns = [
     path('user/', include('users.urls')),
     path('cinema/', include('movie_shows.urls')),
+    path('monitoring/', include('monitoring.urls')),
+    path('tasks/', include('tasks.urls')),
     path('admin/', admin.site.urls),
 ]
 
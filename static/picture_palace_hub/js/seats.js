@@ -0,0 +1,19 @@
+(function () {
+    var counter = document.getElementById('available-seats');
+    if (!counter || !window.EventSource) {
+        return;
+    }
+    var buyButton = document.querySelector('form input[type="submit"]');
+    var source = new EventSource(counter.dataset.stream);
+
+    source.addEventListener('seats', function (event) {
+        var available = JSON.parse(event.data).available_seats;
+        counter.textContent = available;
+        if (buyButton) {
+            buyButton.disabled = available <= 0;
+        }
+        if (available <= 0) {
+            source.close();
+        }
+    });
+})();
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from tasks.models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'queue', 'status', 'attempts', 'run_at', 'finished_at']
+    list_filter = ['status', 'queue', 'name']
+    search_fields = ['name', 'key']
+    readonly_fields = ['locked_by', 'locked_at', 'result', 'last_error', 'created_at', 'finished_at']
@@ -0,0 +1,34 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Runs queued background tasks, SIGINT or SIGTERM stops claiming new ones and waits for the running ones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queue', action='append', dest='queues',
+                            help='Queue to take tasks from, can be repeated. Defaults to every configured queue.')
+        parser.add_argument('--concurrency', type=int, default=settings.TASK_CONCURRENCY)
+        parser.add_argument('--pool', choices=['thread', 'process'], default='thread',
+                            help='Use processes for CPU heavy tasks such as poster resizing.')
+        parser.add_argument('--poll-interval', type=float, default=settings.TASK_POLL_INTERVAL)
+        parser.add_argument('--burst', action='store_true', help='Exit once no task is ready to run.')
+        parser.add_argument('--max-tasks', type=int, help='Exit after this many tasks, e.g. to recycle memory.')
+
+    def handle(self, *args, **options):
+        worker = Worker(
+                queues=options['queues'] or settings.TASK_QUEUES,
+                concurrency=options['concurrency'],
+                pool=options['pool'],
+                poll_interval=options['poll_interval'],
+                log=self.stderr.write,
+        )
+        signal.signal(signal.SIGINT, worker.stop)
+        signal.signal(signal.SIGTERM, worker.stop)
+        self.stdout.write(f'Worker {worker.name} is taking tasks from {", ".join(worker.queues)}')
+        processed = worker.run(burst=options['burst'], max_tasks=options['max_tasks'])
+        self.stdout.write(f'Processed {processed} tasks')
@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-18 13:40
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+from django.utils import timezone
+
+
+def fail_duplicate_tasks(apps, schema_editor):
+    # Concurrent enqueues could queue a key twice before the constraint, the oldest task of each key is kept.
+    Task = apps.get_model('tasks', 'Task')
+    active = Task.objects.filter(status__in=['queued', 'running']).exclude(key='')
+    for row in active.values('key').annotate(tasks=Count('pk'), first=Min('pk')).filter(tasks__gt=1).order_by():
+        active.filter(key=row['key']).exclude(pk=row['first']).update(
+                status='failed', last_error='A duplicate of an earlier task with the same key.',
+                finished_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_tasks, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running']), models.Q(('key', ''), _negated=True)), fields=('key',), name='task_active_key_unique'),
+        ),
+    ]
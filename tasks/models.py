@@ -0,0 +1,45 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=255)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    queue = models.CharField(max_length=64, default='default')
+    key = models.CharField(max_length=255, blank=True, help_text='Only one queued or running task per key.')
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['queue', 'run_at', 'id'], condition=models.Q(status='queued'), name='task_ready_idx'),
+            models.Index(fields=['queue', 'locked_at'], condition=models.Q(status='running'), name='task_running_idx'),
+            models.Index(fields=['key'], condition=~models.Q(key=''), name='task_key_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['key'], name='task_active_key_unique',
+                                    condition=models.Q(status__in=['queued', 'running']) & ~models.Q(key='')),
+        ]
@@ -0,0 +1,18 @@
+import signal
+
+import django
+from django.db import close_old_connections
+
+
+def setup():
+    django.setup()
+    # The parent handles SIGINT and lets running tasks finish.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def run(pk):
+    # Spawned processes unpickle this module before setup() has run, so models are only imported once it has.
+    from tasks.queue import execute
+
+    close_old_connections()
+    return execute(pk)
@@ -0,0 +1,142 @@
+import datetime
+import traceback
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from tasks.models import Task
+
+registry = {}
+
+
+class TaskFunction:
+    def __init__(self, func, queue, max_attempts):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.queue = queue
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return enqueue(self, args, kwargs)
+
+    def delay_once(self, key, *args, **kwargs):
+        return enqueue(self, args, kwargs, key=key)
+
+
+def task(queue='default', max_attempts=None):
+    def register(func):
+        task_function = TaskFunction(func, queue, max_attempts or settings.TASK_MAX_ATTEMPTS)
+        registry[task_function.name] = task_function
+        return task_function
+    return register
+
+
+def get_task_function(name):
+    if name not in registry:
+        # Importing the function registers it, a worker may not have loaded its module yet.
+        import_string(name)
+    return registry[name]
+
+
+def enqueue(task_function, args=(), kwargs=None, key='', run_at=None):
+    job = Task(
+            name=task_function.name,
+            args=list(args),
+            kwargs=kwargs or {},
+            queue=task_function.queue,
+            key=key,
+            max_attempts=task_function.max_attempts,
+            run_at=run_at or timezone.now(),
+    )
+    if settings.TASKS_EAGER:
+        # Without a worker the task runs right here, once, and is kept as a record of what happened.
+        job.status, job.attempts, job.max_attempts = Task.RUNNING, 1, 1
+    if not key:
+        job.save()
+    while key:
+        pending = Task.objects.filter(key=key, status__in=[Task.QUEUED, Task.RUNNING]).first()
+        if pending:
+            return pending
+        try:
+            with transaction.atomic():
+                job.save()
+            break
+        except IntegrityError:
+            # The unique constraint on active keys caught a task queued concurrently, which the next lookup finds.
+            continue
+
+    if settings.TASKS_EAGER:
+        execute(job.pk)
+        job.refresh_from_db()
+    return job
+
+
+def running_counts(queues):
+    counts = {queue: 0 for queue in queues}
+    for queue in Task.objects.filter(status=Task.RUNNING, queue__in=queues).values_list('queue', flat=True):
+        counts[queue] += 1
+    return counts
+
+
+def claim(worker, queues, limit):
+    now = timezone.now()
+    claimed = []
+    with transaction.atomic():
+        running = running_counts(queues)
+        for queue in queues:
+            free = limit - len(claimed)
+            queue_limit = settings.TASK_QUEUE_CONCURRENCY.get(queue)
+            if queue_limit is not None:
+                # Best effort across workers, two of them may both see the last free slot.
+                free = min(free, queue_limit - running[queue])
+            if free <= 0:
+                continue
+            # SKIP LOCKED lets every worker take a different batch instead of queueing on the same rows.
+            ids = list(Task.objects.select_for_update(skip_locked=True).filter(
+                    status=Task.QUEUED, queue=queue, run_at__lte=now,
+            ).order_by('run_at', 'id').values_list('pk', flat=True)[:free])
+            Task.objects.filter(pk__in=ids).update(
+                    status=Task.RUNNING, locked_by=worker, locked_at=now, attempts=F('attempts') + 1)
+            claimed.extend(ids)
+    return claimed
+
+
+def heartbeat(worker):
+    # Renewing the lease keeps a long task from being taken for lost and run a second time by another worker.
+    return Task.objects.filter(status=Task.RUNNING, locked_by=worker).update(locked_at=timezone.now())
+
+
+def requeue_stale(queues):
+    cutoff = timezone.now() - datetime.timedelta(seconds=settings.TASK_LEASE_SECONDS)
+    stale = Task.objects.filter(status=Task.RUNNING, queue__in=queues, locked_at__lt=cutoff)
+    # The worker that held these died mid-task, the attempt it used still counts.
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+            status=Task.FAILED, last_error='The worker running this task stopped.', finished_at=timezone.now())
+    return failed + stale.update(status=Task.QUEUED, locked_by='', locked_at=None)
+
+
+def execute(pk):
+    job = Task.objects.get(pk=pk)
+    try:
+        result = get_task_function(job.name)(*job.args, **job.kwargs)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        job.locked_by, job.locked_at = '', None
+        if job.attempts >= job.max_attempts:
+            job.status, job.finished_at = Task.FAILED, timezone.now()
+        else:
+            job.status = Task.QUEUED
+            job.run_at = timezone.now() + datetime.timedelta(
+                    seconds=settings.TASK_RETRY_DELAY * 2 ** (job.attempts - 1))
+        job.save(update_fields=['status', 'run_at', 'last_error', 'locked_by', 'locked_at', 'finished_at'])
+        return job.status
+
+    job.status, job.result, job.finished_at = Task.DONE, result, timezone.now()
+    job.save(update_fields=['status', 'result', 'finished_at'])
+    return job.status
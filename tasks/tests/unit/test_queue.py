@@ -0,0 +1,123 @@
+import datetime
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.queue import claim, execute, heartbeat, requeue_stale, task
+from tasks.worker import Worker
+from users.models import Customer
+
+calls = []
+
+
+@task()
+def add(a, b):
+    calls.append((a, b))
+    return a + b
+
+
+@task(queue='limited', max_attempts=2)
+def fail():
+    raise ValueError('Something went wrong')
+
+
+@override_settings(TASKS_EAGER=False, TASK_RETRY_DELAY=30, TASK_QUEUE_CONCURRENCY={'limited': 1})
+class TaskQueueTest(TestCase):
+    def run_ready(self, queues=('default', 'limited')):
+        for pk in claim('test-worker', list(queues), limit=10):
+            execute(pk)
+
+    def test_tasks_run_with_their_arguments(self):
+        job = add.delay(2, b=3)
+        self.assertEqual((job.status, job.queue, job.args, job.kwargs), (Task.QUEUED, 'default', [2], {'b': 3}))
+        self.run_ready()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.attempts), (Task.DONE, 5, 1))
+
+    def test_failed_tasks_are_retried_with_backoff(self):
+        job = fail.delay()
+        self.run_ready()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Task.QUEUED, 1))
+        self.assertGreater(job.run_at, timezone.now() + datetime.timedelta(seconds=25))
+        self.assertIn('Something went wrong', job.last_error)
+
+        Task.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.run_ready()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Task.FAILED, 2))
+
+    def test_keyed_tasks_are_queued_once(self):
+        first = add.delay_once('add:1', 1, 1)
+        self.assertEqual(add.delay_once('add:1', 1, 1), first)
+        self.run_ready()
+        self.assertNotEqual(add.delay_once('add:1', 1, 1), first)
+
+    def test_one_active_task_per_key(self):
+        first = add.delay_once('add:1', 1, 1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Task.objects.create(name=first.name, key='add:1', status=Task.RUNNING)
+
+        Task.objects.filter(pk=first.pk).update(status=Task.FAILED)
+        self.assertNotEqual(add.delay_once('add:1', 1, 1), first)
+
+    def test_queue_concurrency_limit(self):
+        running, waiting = fail.delay(), fail.delay()
+        Task.objects.filter(pk=running.pk).update(status=Task.RUNNING, locked_at=timezone.now())
+        self.assertEqual(claim('test-worker', ['limited'], limit=10), [])
+
+        Task.objects.filter(pk=running.pk).update(status=Task.DONE)
+        self.assertEqual(claim('test-worker', ['limited'], limit=10), [waiting.pk])
+
+    def test_tasks_of_a_lost_worker_are_requeued(self):
+        lost, exhausted = add.delay(1, 2), fail.delay()
+        Task.objects.filter(pk=lost.pk).update(status=Task.RUNNING, attempts=1,
+                                               locked_at=timezone.now() - datetime.timedelta(hours=1))
+        Task.objects.filter(pk=exhausted.pk).update(status=Task.RUNNING, attempts=2,
+                                                    locked_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertEqual(requeue_stale(['default', 'limited']), 2)
+        self.assertEqual(Task.objects.get(pk=lost.pk).status, Task.QUEUED)
+        self.assertEqual(Task.objects.get(pk=exhausted.pk).status, Task.FAILED)
+
+    def test_heartbeat_keeps_long_tasks_running(self):
+        job = add.delay(1, 2)
+        Task.objects.filter(pk=job.pk).update(status=Task.RUNNING, attempts=1, locked_by='test-worker',
+                                              locked_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertEqual(heartbeat('test-worker'), 1)
+        self.assertEqual(requeue_stale(['default']), 0)
+        self.assertEqual(Task.objects.get(pk=job.pk).status, Task.RUNNING)
+
+    def test_eager_tasks_run_inline(self):
+        with self.settings(TASKS_EAGER=True):
+            job = add.delay(4, 5)
+        self.assertEqual((job.status, job.result), (Task.DONE, 9))
+
+    def test_status_view_is_staff_only(self):
+        job = add.delay(1, 1)
+        url = reverse('tasks:task_status', args=[job.pk])
+        self.client.force_login(Customer.objects.create(username='user'))
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(Customer.objects.create(username='staff', is_staff=True))
+        self.assertEqual(self.client.get(url).json()['status'], Task.QUEUED)
+
+
+@override_settings(TASKS_EAGER=False)
+class WorkerTest(TransactionTestCase):
+    def test_burst_run_drains_the_queue(self):
+        calls.clear()
+        jobs = [add.delay(index, index) for index in range(5)]
+        processed = Worker(['default'], concurrency=2, poll_interval=0.01, log=lambda message: None).run(burst=True)
+        self.assertEqual(processed, 5)
+        results = Task.objects.filter(pk__in=[job.pk for job in jobs]).values_list('result', flat=True)
+        self.assertEqual(sorted(results), [0, 2, 4, 6, 8])
+        self.assertEqual(len(calls), len(jobs))
+
+    def test_max_tasks(self):
+        for index in range(3):
+            add.delay(index, 1)
+        self.assertEqual(Worker(['default'], concurrency=2, poll_interval=0.01).run(max_tasks=2), 2)
+        self.assertEqual(Task.objects.filter(status=Task.QUEUED).count(), 1)
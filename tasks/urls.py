@@ -0,0 +1,9 @@
+from django.urls import path
+
+from tasks.views import TaskStatusView
+
+app_name = 'tasks'
+
+urlpatterns = [
+    path('<int:pk>/', TaskStatusView.as_view(), name='task_status'),
+]
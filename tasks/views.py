@@ -0,0 +1,25 @@
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views import View
+
+from tasks.models import Task
+
+
+class TaskStatusView(UserPassesTestMixin, View):
+    raise_exception = True
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, pk):
+        task = get_object_or_404(Task, pk=pk)
+        return JsonResponse({
+            'id': task.pk,
+            'name': task.name,
+            'status': task.status,
+            'attempts': task.attempts,
+            'result': task.result,
+            'error': task.last_error.strip().splitlines()[-1] if task.last_error else None,
+            'finished_at': task.finished_at,
+        })
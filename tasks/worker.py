@@ -0,0 +1,83 @@
+import multiprocessing
+import os
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import connection
+
+from tasks import process
+from tasks.queue import claim, execute, heartbeat, requeue_stale
+
+
+def run_in_thread(pk):
+    try:
+        return execute(pk)
+    finally:
+        # Every pool thread has its own connection, it would otherwise stay open until the worker exits.
+        connection.close()
+
+
+class Worker:
+    def __init__(self, queues, concurrency, pool='thread', poll_interval=1.0, name=None, log=print):
+        self.queues = queues
+        self.concurrency = concurrency
+        self.pool = pool
+        self.poll_interval = poll_interval
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.log = log
+        self.stopping = False
+        self.processed = 0
+
+    def make_executor(self):
+        if self.pool == 'process':
+            # Spawned processes open their own connections instead of sharing the parent's socket.
+            return ProcessPoolExecutor(self.concurrency, mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=process.setup)
+        return ThreadPoolExecutor(self.concurrency, thread_name_prefix='task')
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def run(self, burst=False, max_tasks=None):
+        run = process.run if self.pool == 'process' else run_in_thread
+        running = set()
+        last_requeue = last_heartbeat = 0
+        with self.make_executor() as executor:
+            while not self.stopping:
+                if time.monotonic() - last_requeue > 60:
+                    requeue_stale(self.queues)
+                    last_requeue = time.monotonic()
+                if running and time.monotonic() - last_heartbeat > settings.TASK_HEARTBEAT_INTERVAL:
+                    heartbeat(self.name)
+                    last_heartbeat = time.monotonic()
+
+                free = self.concurrency - len(running)
+                if max_tasks is not None:
+                    free = min(free, max_tasks - self.processed - len(running))
+                claimed = claim(self.name, self.queues, free) if free > 0 else []
+                running.update(executor.submit(run, pk) for pk in claimed)
+
+                if not running:
+                    if burst or (max_tasks is not None and self.processed >= max_tasks):
+                        break
+                    time.sleep(self.poll_interval)
+                    continue
+                done, running = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.finish(future)
+            for future in wait(running).done:
+                self.finish(future)
+        return self.processed
+
+    def finish(self, future):
+        try:
+            future.result()
+        except Exception as e:
+            # Task errors are stored on the task, this is the worker itself failing, e.g. losing the database.
+            # The task stays running until its lease expires and another worker picks it up again, so it is not
+            # counted as processed.
+            self.log(f'Task execution failed: {e!r}')
+        else:
+            self.processed += 1
@@ -6,5 +6,5 @@ from users.models import Customer
 
 @admin.register(Customer)
 class CustomerAdmin(admin.ModelAdmin):
-    list_display = ['id', 'username', 'first_name', 'last_name', 'email', 'balance']
+    list_display = ['id', 'username', 'first_name', 'last_name', 'email', 'balance', 'total_spent', 'order_count']
     list_filter = ['username', 'balance']
@@ -1,24 +1,120 @@
+import copy
 import datetime
+import threading
+import time
+from collections import OrderedDict
+from functools import cache
+from itertools import islice
 
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
 from django.utils import timezone
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.authtoken.models import Token
 from rest_framework.exceptions import AuthenticationFailed
 
-from picture_palace_hub import settings
+
+# Every process keeps its own copies, so a token deleted or logged out on one worker is still accepted by the others
+# until its entry runs out, which max_ttl keeps to a few seconds.
+class LocalTokenCache:
+    def __init__(self, max_size, max_ttl):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, token = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return token
+
+    def set(self, key, token, ttl):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + min(ttl, self.max_ttl), token)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class SharedTokenCache:
+    key_prefix = 'auth:token:'
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def get(self, key):
+        return self.cache.get(self.key_prefix + key)
+
+    def set(self, key, token, ttl):
+        self.cache.set(self.key_prefix + key, token, ttl)
+
+    def delete(self, key):
+        self.cache.delete(self.key_prefix + key)
+
+    def clear(self):
+        # The alias may hold other keys, like the schedule pages, so only the keys of existing tokens are removed.
+        keys = Token.objects.values_list('key', flat=True).iterator(chunk_size=1000)
+        while chunk := [self.key_prefix + key for key in islice(keys, 1000)]:
+            self.cache.delete_many(chunk)
+
+
+@cache
+def local_token_cache(max_size, max_ttl):
+    return LocalTokenCache(max_size, max_ttl)
+
+
+def get_token_cache():
+    # A local memory backend lives in one process like LocalTokenCache, so only other backends are shared.
+    if settings.TOKEN_CACHE_ALIAS and not isinstance(caches[settings.TOKEN_CACHE_ALIAS], LocMemCache):
+        return SharedTokenCache(settings.TOKEN_CACHE_ALIAS)
+    return local_token_cache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_LOCAL_TTL)
+
+
+def evict_user_tokens(user_ids):
+    token_cache = get_token_cache()
+    for key in Token.objects.filter(user__in=user_ids).values_list('key', flat=True):
+        token_cache.delete(key)
 
 
 class TokenExpiredAuthentication(TokenAuthentication):
     keyword = 'Bearer'
 
     def authenticate_credentials(self, key):
-        try:
-            token = Token.objects.get(key=key)
-        except Token.DoesNotExist:
-            raise AuthenticationFailed('Invalid token')
+        token_cache = get_token_cache() if settings.TOKEN_CACHE_TTL else None
+        token = token_cache.get(key) if token_cache else None
+        from_cache = token is not None
+        if not from_cache:
+            try:
+                token = Token.objects.select_related('user').get(key=key)
+            except Token.DoesNotExist:
+                raise AuthenticationFailed('Invalid token')
 
-        if token.created < timezone.now() - datetime.timedelta(seconds=settings.TOKEN_TTL):
+        expires_at = token.created + datetime.timedelta(seconds=settings.TOKEN_TTL)
+        if expires_at < timezone.now():
             token.delete()
             raise AuthenticationFailed(f'Token was created more the {settings.TOKEN_TTL} seconds ago.')
 
+        if not from_cache and token_cache:
+            ttl = min(settings.TOKEN_CACHE_TTL, (expires_at - timezone.now()).total_seconds())
+            token_cache.set(key, token, ttl)
+
+        # Cached instances are shared between requests, so every request gets its own copies to work with.
+        token = copy.copy(token)
+        token.user = copy.copy(token.user)
         return token.user, token
@@ -1,15 +1,20 @@
 import datetime
 
+from django.conf import settings
 from django.contrib.auth.hashers import make_password
+from django.db.models import Prefetch
 from django.utils import timezone
 from rest_framework import views, status, viewsets
 from rest_framework.authtoken.models import Token
+from rest_framework.decorators import action
 from rest_framework.authtoken.views import ObtainAuthToken
 
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from picture_palace_hub import settings
+from movie_shows.api.pagination import KeysetPagination
+from movie_shows.api.serializers import OrderReadSerializer
+from movie_shows.models import Order
 from users.api.serializers import CustomerRegisterSerializer, CustomerReadSerializer
 from users.models import Customer
 
@@ -39,6 +44,10 @@ class LogoutApiView(views.APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class OrderHistoryPagination(KeysetPagination):
+    keyset_by_default = True
+
+
 class CustomerViewSet(viewsets.ModelViewSet):
     queryset = Customer.objects.all()
 
@@ -46,6 +55,12 @@ class CustomerViewSet(viewsets.ModelViewSet):
         queryset = super().get_queryset()
         if not self.request.user.is_superuser:
             queryset = queryset.filter(id__in=[self.request.user.pk])
+        if self.request.method == 'GET' and self.action != 'orders':
+            queryset = queryset.prefetch_related(Prefetch(
+                    'orders',
+                    queryset=Order.objects.history()[:settings.CUSTOMER_RECENT_ORDERS],
+                    to_attr='recent_orders',
+            ))
         return queryset
 
     def get_serializer_class(self):
@@ -58,10 +73,16 @@ class CustomerViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         if self.request.method == 'POST':
             permission_classes = []
-        elif self.action in ['list']:
+        else:
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
 
+    @action(detail=True, methods=['get'], pagination_class=OrderHistoryPagination)
+    def orders(self, request, pk=None):
+        page = self.paginate_queryset(self.get_object().orders.history())
+        serializer = OrderReadSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+
     def perform_create(self, serializer):
         password = make_password(serializer.validated_data['password'])
         user = serializer.save(password=password)
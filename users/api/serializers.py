@@ -1,9 +1,8 @@
-from django.db.models import Sum
+from django.conf import settings
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from movie_shows.api.serializers import OrderReadSerializer
-from movie_shows.models import Order
 from users.models import Customer
 
 
@@ -16,12 +15,17 @@ class CustomerWriteSerializer(serializers.ModelSerializer):
 
 
 class CustomerReadSerializer(serializers.ModelSerializer):
-    orders = OrderReadSerializer(many=True)
+    orders = serializers.SerializerMethodField()
     total_amount = serializers.SerializerMethodField()
 
+    def get_orders(self, obj):
+        orders = getattr(obj, 'recent_orders', None)
+        if orders is None:
+            orders = obj.orders.history()[:settings.CUSTOMER_RECENT_ORDERS]
+        return OrderReadSerializer(orders, many=True, context=self.context).data
+
     def get_total_amount(self, obj):
-        total_amount = Order.objects.filter(customer=obj).aggregate(total_amount=Sum('total_cost')).get('total_amount')
-        return total_amount or 0
+        return obj.total_spent
 
     class Meta:
         model = Customer
@@ -0,0 +1,80 @@
+from decimal import Decimal
+from urllib.parse import parse_qs, urlparse
+
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from movie_shows.models import CinemaHall, Movie, MovieShow, Order
+from users.api.resources import CustomerViewSet
+from users.models import Customer
+
+
+@override_settings(CUSTOMER_RECENT_ORDERS=5)
+class CustomerViewSetOrdersTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.admin_user = Customer.objects.create(username='admin', is_staff=True, is_superuser=True)
+        hall = CinemaHall.objects.create(name='Test Hall', seats=100)
+        movie = Movie.objects.create(title='Test Movie', description='', duration_in_minutes=120,
+                                     director='Test Director')
+        self.show = MovieShow.objects.create(movie=movie, movie_hall=hall, start_time='12:00',
+                                             start_date='2024-01-01', end_time='14:00', end_date='2024-01-01',
+                                             ticket_price=Decimal('10.00'))
+        self.customers = [Customer.objects.create(username=f'user{index}') for index in range(3)]
+        self.orders = {
+            customer.pk: [self.create_order(customer) for _ in range(20)]
+            for customer in self.customers
+        }
+
+    def create_order(self, customer):
+        return Order.objects.create(customer=customer, movie_show=self.show, total_cost=Decimal('10.00'))
+
+    def test_retrieve_embeds_recent_orders_only(self):
+        customer = self.customers[0]
+        view = CustomerViewSet.as_view({'get': 'retrieve'})
+        request = self.factory.get(f'/api/users/{customer.pk}/')
+        force_authenticate(request, user=customer)
+        response = view(request, pk=customer.pk)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([order['id'] for order in response.data['orders']],
+                         [order.pk for order in reversed(self.orders[customer.pk])][:5])
+
+    def test_list_query_count_does_not_grow_with_orders(self):
+        view = CustomerViewSet.as_view({'get': 'list'})
+        request = self.factory.get('/api/users/')
+        force_authenticate(request, user=self.admin_user)
+        # Count, customers page and one prefetch for all of their orders.
+        with self.assertNumQueries(3):
+            response = view(request)
+            response.render()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(all(len(customer['orders']) <= 5 for customer in response.data['results']))
+
+    def test_orders_action_walks_full_history(self):
+        customer = self.customers[1]
+        view = CustomerViewSet.as_view({'get': 'orders'})
+        pages = 0
+        seen = []
+        params = {}
+        while True:
+            request = self.factory.get(f'/api/users/{customer.pk}/orders/', params)
+            force_authenticate(request, user=customer)
+            response = view(request, pk=customer.pk)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages += 1
+            seen.extend(order['id'] for order in response.data['results'])
+            if not response.data['next']:
+                break
+            params = parse_qs(urlparse(response.data['next']).query)
+
+        self.assertEqual(pages, 2)
+        self.assertEqual(seen, [order.pk for order in reversed(self.orders[customer.pk])])
+
+    def test_orders_action_hides_other_customers(self):
+        owner, other = self.customers[0], self.customers[2]
+        view = CustomerViewSet.as_view({'get': 'orders'})
+        request = self.factory.get(f'/api/users/{owner.pk}/orders/')
+        force_authenticate(request, user=other)
+        response = view(request, pk=owner.pk)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from users.totals import backfill_totals, customer_id_batches
+
+
+class Command(BaseCommand):
+    help = 'Recomputes total_spent and order_count of every customer from their orders, batch by batch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        updated = 0
+        for ids in customer_id_batches(options['batch_size']):
+            updated += backfill_totals(ids)
+        self.stdout.write(f'Backfilled {updated} customers.')
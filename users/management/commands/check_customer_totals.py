@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.totals import customer_id_batches, find_inconsistent
+
+
+class Command(BaseCommand):
+    help = 'Compares the stored customer totals with their orders without locking or writing anything.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        checked = 0
+        inconsistent = 0
+        for ids in customer_id_batches(options['batch_size']):
+            checked += len(ids)
+            for row in find_inconsistent(ids):
+                inconsistent += 1
+                self.stdout.write(
+                        f'{row["pk"]} {row["username"]}: '
+                        f'total_spent {row["total_spent"]} != {row["expected_total_spent"]}, '
+                        f'order_count {row["order_count"]} != {row["expected_order_count"]}'
+                )
+
+        if inconsistent:
+            raise CommandError(f'{inconsistent} of {checked} customers have inconsistent totals.')
+        self.stdout.write(f'All {checked} customers are consistent.')
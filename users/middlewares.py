@@ -1,16 +1,26 @@
+import time
+
+from django.conf import settings
 from django.contrib.auth import logout
 from django.utils.deprecation import MiddlewareMixin
-from picture_palace_hub import settings
-import datetime
 
 
 class LogoutMiddleware(MiddlewareMixin):
     def process_request(self, request):
-        if not request.user.is_staff or not request.user.is_superuser:
-            now = datetime.datetime.now()
-            last_action_not_found = request.session.get('last_action')
-            if last_action_not_found:
-                last_action = datetime.datetime.strptime(last_action_not_found, "%H-%M-%S %d/%m/%y")
-                if (now - last_action).seconds > settings.TIME_SINCE_LAST_ACTION:
-                    logout(request)
-            request.session['last_action'] = datetime.datetime.now().strftime("%H-%M-%S %d/%m/%y")
+        if request.path.startswith((settings.STATIC_URL, settings.MEDIA_URL)):
+            return
+        if not request.user.is_authenticated or (request.user.is_staff and request.user.is_superuser):
+            return
+
+        now = int(time.time())
+        last_action = request.session.get('last_action')
+        if not isinstance(last_action, int):
+            last_action = None
+
+        if last_action is not None and now - last_action > settings.TIME_SINCE_LAST_ACTION:
+            logout(request)
+            return
+
+        # Only touch the session when the stored timestamp is stale enough, so most requests do not save it.
+        if last_action is None or now - last_action >= settings.LAST_ACTION_GRANULARITY:
+            request.session['last_action'] = now
@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-18 14:20
+
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, DecimalField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_totals(apps, schema_editor):
+    # The totals start at zero, so the orders placed before they existed are added up once here.
+    Customer = apps.get_model('users', 'Customer')
+    Order = apps.get_model('movie_shows', 'Order')
+    orders = Order.objects.filter(customer=OuterRef('pk')).order_by().values('customer')
+    Customer.objects.update(
+            total_spent=Coalesce(Subquery(orders.annotate(total=Sum('total_cost')).values('total')),
+                                 Value(Decimal('0')), output_field=DecimalField()),
+            order_count=Coalesce(Subquery(orders.annotate(count=Count('pk')).values('count')),
+                                 Value(0), output_field=IntegerField()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_shows', '0004_alter_order_seat_quantity'),
+        ('users', '0007_customer_totals'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
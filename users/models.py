@@ -5,3 +5,5 @@ from rest_framework.authentication import TokenAuthentication
 
 class Customer(AbstractUser):
     balance = models.DecimalField(max_digits=10, decimal_places=2, default=10000000)
+    total_spent = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    order_count = models.PositiveIntegerField(default=0)
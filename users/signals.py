@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from users.api.authentication import evict_user_tokens, get_token_cache
+from users.models import Customer
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    get_token_cache().delete(instance.key)
+
+
+@receiver(post_save, sender=Customer)
+def evict_customer_tokens(sender, instance, created, **kwargs):
+    if not created:
+        evict_user_tokens([instance.pk])
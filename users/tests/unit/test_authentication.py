@@ -0,0 +1,158 @@
+import datetime
+import tempfile
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+
+from movie_shows.models import CinemaHall, Movie, MovieShow
+from movie_shows.services import book_many, book_seats
+from users.api.authentication import TokenExpiredAuthentication, LocalTokenCache, SharedTokenCache, get_token_cache, \
+    local_token_cache
+from users.models import Customer
+
+
+class TokenExpiredAuthenticationTest(TestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        self.user = Customer.objects.create_user(username='testuser', password='testpassword')
+        self.token = Token.objects.create(user=self.user)
+        self.authentication = TokenExpiredAuthentication()
+
+    def test_valid_token_is_cached(self):
+        with self.assertNumQueries(1):
+            user, token = self.authentication.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            cached_user, cached_token = self.authentication.authenticate_credentials(self.token.key)
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(cached_user, self.user)
+        self.assertEqual(cached_token.key, self.token.key)
+
+    def test_cached_user_is_copied_per_request(self):
+        first_user, _ = self.authentication.authenticate_credentials(self.token.key)
+        first_user.balance = 0
+        second_user, _ = self.authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(second_user.balance, self.user.balance)
+
+    def test_invalid_token(self):
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate_credentials('invalid')
+
+    def test_expired_token_is_deleted(self):
+        Token.objects.filter(pk=self.token.pk).update(created=timezone.now() - datetime.timedelta(days=1))
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate_credentials(self.token.key)
+        self.assertFalse(Token.objects.filter(pk=self.token.pk).exists())
+
+    def test_deleted_token_is_evicted(self):
+        key = self.token.key
+        self.authentication.authenticate_credentials(key)
+        self.token.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate_credentials(key)
+
+    @override_settings(TOKEN_CACHE_TTL=0)
+    def test_cache_can_be_disabled(self):
+        with self.assertNumQueries(1):
+            self.authentication.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(1):
+            self.authentication.authenticate_credentials(self.token.key)
+
+    def test_local_memory_backend_is_cached_per_process(self):
+        self.assertIsInstance(get_token_cache(), LocalTokenCache)
+        self.assertEqual(get_token_cache().max_ttl, 5)
+
+    def test_shared_backend_is_used_by_default(self):
+        location = tempfile.TemporaryDirectory()
+        self.addCleanup(location.cleanup)
+        shared = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location.name}
+        with override_settings(CACHES={'default': shared}):
+            self.assertIsInstance(get_token_cache(), SharedTokenCache)
+            self.authentication.authenticate_credentials(self.token.key)
+            with self.assertNumQueries(0):
+                user, _ = self.authentication.authenticate_credentials(self.token.key)
+            self.assertEqual(user, self.user)
+
+            # The eviction reaches every process, here one that starts without a cache of its own.
+            key = self.token.key
+            self.token.delete()
+            local_token_cache.cache_clear()
+            with self.assertRaises(AuthenticationFailed):
+                TokenExpiredAuthentication().authenticate_credentials(key)
+
+    def test_logout_evicts_token(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token.key}')
+        response = client.post('/user/api/logout/')
+        self.assertEqual(response.status_code, 204)
+
+        response = client.post('/user/api/logout/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_customer_changes_evict_token(self):
+        self.authentication.authenticate_credentials(self.token.key)
+        self.user.balance = 5
+        self.user.save()
+        user, _ = self.authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(user.balance, 5)
+
+    def test_bookings_evict_token(self):
+        self.user.balance = 100
+        self.user.save()
+        hall = CinemaHall.objects.create(name='Hall', seats=10)
+        movie = Movie.objects.create(title='Movie', description='', duration_in_minutes=120, director='Director')
+        today = timezone.now().date()
+        show = MovieShow.objects.create(movie=movie, movie_hall=hall, start_date=today, end_date=today,
+                                        start_time='10:00', end_time='12:00', ticket_price=Decimal('10.00'))
+
+        self.authentication.authenticate_credentials(self.token.key)
+        with self.captureOnCommitCallbacks(execute=True):
+            book_seats(self.user, show, 2)
+        user, _ = self.authentication.authenticate_credentials(self.token.key)
+        self.assertEqual((user.balance, user.order_count), (80, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            book_many([{'customer': self.user.pk, 'movie_show': show.pk, 'seat_quantity': 1}])
+        user, _ = self.authentication.authenticate_credentials(self.token.key)
+        self.assertEqual((user.balance, user.order_count), (70, 2))
+
+
+class SharedTokenCacheTest(TestCase):
+    def test_clear_keeps_other_keys(self):
+        user = Customer.objects.create_user(username='testuser', password='testpassword')
+        token = Token.objects.create(user=user)
+        cache = SharedTokenCache('default')
+        cache.set(token.key, token, ttl=60)
+        caches['default'].set('schedule:test', 'page', 60)
+
+        cache.clear()
+        self.assertIsNone(cache.get(token.key))
+        self.assertEqual(caches['default'].get('schedule:test'), 'page')
+
+
+class LocalTokenCacheTest(TestCase):
+    def test_least_recently_used_entry_is_dropped(self):
+        cache = LocalTokenCache(max_size=2, max_ttl=60)
+        cache.set('a', 'token a', ttl=60)
+        cache.set('b', 'token b', ttl=60)
+        cache.get('a')
+        cache.set('c', 'token c', ttl=60)
+
+        self.assertEqual(cache.get('a'), 'token a')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 'token c')
+
+    def test_entry_expires(self):
+        cache = LocalTokenCache(max_size=2, max_ttl=60)
+        cache.set('a', 'token a', ttl=0)
+        self.assertIsNone(cache.get('a'))
+
+    def test_entries_are_kept_at_most_max_ttl(self):
+        cache = LocalTokenCache(max_size=2, max_ttl=0)
+        cache.set('a', 'token a', ttl=60)
+        self.assertIsNone(cache.get('a'))
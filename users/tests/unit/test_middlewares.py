@@ -0,0 +1,56 @@
+import time
+from unittest import mock
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from users.models import Customer
+
+
+class LogoutMiddlewareTest(TestCase):
+    def setUp(self):
+        self.user = Customer.objects.create_user(username='testuser', password='testpassword')
+        self.url = reverse('shows:show_list')
+
+    def count_session_saves(self, requests):
+        with mock.patch.object(SessionStore, 'save', autospec=True, side_effect=SessionStore.save) as save:
+            for _ in range(requests):
+                self.client.get(self.url)
+        return save.call_count
+
+    def test_anonymous_requests_do_not_save_the_session(self):
+        self.assertEqual(self.count_session_saves(50), 0)
+
+    def test_authenticated_burst_saves_the_session_once(self):
+        self.client.login(username='testuser', password='testpassword')
+        self.assertEqual(self.count_session_saves(50), 1)
+
+    @override_settings(LAST_ACTION_GRANULARITY=0)
+    def test_zero_granularity_saves_every_request(self):
+        self.client.login(username='testuser', password='testpassword')
+        self.assertEqual(self.count_session_saves(5), 5)
+
+    def test_last_action_is_an_epoch_timestamp(self):
+        self.client.login(username='testuser', password='testpassword')
+        self.client.get(self.url)
+        self.assertAlmostEqual(self.client.session['last_action'], int(time.time()), delta=2)
+
+    def test_idle_user_is_logged_out(self):
+        self.client.login(username='testuser', password='testpassword')
+        session = self.client.session
+        session['last_action'] = int(time.time()) - 3600
+        session.save()
+
+        response = self.client.get(self.url)
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    def test_legacy_last_action_is_replaced(self):
+        self.client.login(username='testuser', password='testpassword')
+        session = self.client.session
+        session['last_action'] = '10-00-00 01/01/23'
+        session.save()
+
+        response = self.client.get(self.url)
+        self.assertTrue(response.wsgi_request.user.is_authenticated)
+        self.assertIsInstance(self.client.session['last_action'], int)
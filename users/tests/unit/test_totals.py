@@ -0,0 +1,99 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+from django.utils import timezone
+
+from movie_shows.models import CinemaHall, Movie, MovieShow, Order
+from movie_shows.services import book_seats
+from users.models import Customer
+
+
+class CustomerTotalsTest(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(username='testuser')
+        self.other_customer = Customer.objects.create(username='otheruser')
+        cinema_hall = CinemaHall.objects.create(name='Test Hall', seats=100)
+        movie = Movie.objects.create(title='Test Movie', description='', duration_in_minutes=120,
+                                     director='Test Director')
+        self.movie_show = MovieShow.objects.create(
+                movie=movie,
+                movie_hall=cinema_hall,
+                start_time='12:00',
+                start_date=timezone.now().date(),
+                end_time='14:00',
+                end_date=timezone.now().date(),
+                ticket_price=Decimal('12.50'),
+        )
+
+    def test_booking_updates_totals(self):
+        book_seats(self.customer, self.movie_show, 2)
+        book_seats(self.customer, self.movie_show, 1)
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.total_spent, Decimal('37.50'))
+        self.assertEqual(self.customer.order_count, 2)
+
+    def test_orders_saved_and_deleted_elsewhere_update_totals(self):
+        order = Order.objects.create(customer=self.customer, movie_show=self.movie_show, seat_quantity=2,
+                                     total_cost=25)
+        book_seats(self.customer, self.movie_show, 1)
+        order.delete()
+        self.customer.refresh_from_db()
+        self.assertEqual((self.customer.total_spent, self.customer.order_count), (Decimal('12.50'), 1))
+
+        # Deleting the show cascades to its orders.
+        self.movie_show.delete()
+        self.customer.refresh_from_db()
+        self.assertEqual((self.customer.total_spent, self.customer.order_count), (Decimal('0'), 0))
+
+    def test_edited_orders_update_totals(self):
+        order = Order.objects.create(customer=self.customer, movie_show=self.movie_show, seat_quantity=2,
+                                     total_cost=25)
+        order.total_cost = Decimal('20.00')
+        order.save()
+        self.customer.refresh_from_db()
+        self.assertEqual((self.customer.total_spent, self.customer.order_count), (Decimal('20.00'), 1))
+
+        order.customer = self.other_customer
+        order.save()
+        self.customer.refresh_from_db()
+        self.other_customer.refresh_from_db()
+        self.assertEqual((self.customer.total_spent, self.customer.order_count), (Decimal('0'), 0))
+        self.assertEqual((self.other_customer.total_spent, self.other_customer.order_count), (Decimal('20.00'), 1))
+
+        # Saving a booked order again does not count it twice.
+        booked = book_seats(self.customer, self.movie_show, 1)
+        booked.save()
+        self.customer.refresh_from_db()
+        self.assertEqual((self.customer.total_spent, self.customer.order_count), (Decimal('12.50'), 1))
+
+    def test_backfill_recomputes_totals(self):
+        Order.objects.create(customer=self.customer, movie_show=self.movie_show, seat_quantity=2, total_cost=25)
+        Order.objects.create(customer=self.customer, movie_show=self.movie_show, seat_quantity=1, total_cost=12.5)
+        Customer.objects.filter(pk=self.customer.pk).update(total_spent=0, order_count=0)
+        Customer.objects.filter(pk=self.other_customer.pk).update(total_spent=99, order_count=9)
+
+        call_command('backfill_customer_totals', batch_size=1, stdout=StringIO())
+
+        self.customer.refresh_from_db()
+        self.other_customer.refresh_from_db()
+        self.assertEqual(self.customer.total_spent, Decimal('37.50'))
+        self.assertEqual(self.customer.order_count, 2)
+        self.assertEqual(self.other_customer.total_spent, Decimal('0'))
+        self.assertEqual(self.other_customer.order_count, 0)
+
+    def test_check_passes_for_consistent_totals(self):
+        book_seats(self.customer, self.movie_show, 2)
+        out = StringIO()
+        call_command('check_customer_totals', stdout=out)
+        self.assertIn('All 2 customers are consistent.', out.getvalue())
+
+    def test_check_reports_inconsistent_totals(self):
+        Order.objects.create(customer=self.customer, movie_show=self.movie_show, seat_quantity=2, total_cost=25)
+        Customer.objects.filter(pk=self.customer.pk).update(order_count=0)
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('check_customer_totals', stdout=out)
+        self.assertIn('testuser', out.getvalue())
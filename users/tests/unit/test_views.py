@@ -1,7 +1,10 @@
-from django.test import TestCase, Client
+from decimal import Decimal
+
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import AuthenticationForm
+from movie_shows.models import CinemaHall, Movie, MovieShow, Order
 from users.forms import RegisterForm
 from users.models import Customer
 from users.views import Login
@@ -114,3 +117,42 @@ class CustomerDetailViewTestCase(TestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 302)
         self.assertRedirects(response, reverse('users:login') + '?next=' + self.url)
+
+
+@override_settings(ORDER_HISTORY_PAGE_SIZE=10)
+class CustomerOrderHistoryViewTest(TestCase):
+    def setUp(self):
+        self.user = Customer.objects.create_user(username='testuser', password='testpass')
+        hall = CinemaHall.objects.create(name='Test Hall', seats=100)
+        movie = Movie.objects.create(title='Test Movie', description='', duration_in_minutes=120,
+                                     director='Test Director')
+        show = MovieShow.objects.create(movie=movie, movie_hall=hall, start_time='12:00', start_date='2024-01-01',
+                                        end_time='14:00', end_date='2024-01-01', ticket_price=Decimal('10.00'))
+        self.orders = [Order.objects.create(customer=self.user, movie_show=show, total_cost=Decimal('10.00'))
+                       for _ in range(25)]
+        self.url = reverse('users:profile', kwargs={'pk': self.user.pk})
+        self.client.login(username='testuser', password='testpass')
+
+    def test_orders_are_paginated_newest_first(self):
+        seen = []
+        url = self.url
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.context['orders']), 10)
+            seen.extend(order.pk for order in response.context['orders'])
+            cursor = response.context['next_cursor']
+            url = f'{self.url}?before={cursor}' if cursor else None
+
+        self.assertEqual(seen, [order.pk for order in reversed(self.orders)])
+
+    def test_orders_load_show_and_movie_with_the_page(self):
+        response = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            titles = [order.movie_show.movie.title for order in response.context['orders']]
+        self.assertEqual(titles, ['Test Movie'] * 10)
+        self.assertContains(response, f'?before={response.context["next_cursor"]}')
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'before': 'yesterday'})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,55 @@
+from decimal import Decimal
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from movie_shows.models import Order
+from users.api.authentication import evict_user_tokens
+from users.models import Customer
+
+
+def order_totals():
+    orders = Order.objects.filter(customer=OuterRef('pk')).order_by().values('customer')
+    total = orders.annotate(total=Sum('total_cost')).values('total')
+    count = orders.annotate(count=Count('pk')).values('count')
+    return {
+        'expected_total_spent': Coalesce(Subquery(total), Value(Decimal('0')), output_field=DecimalField()),
+        'expected_order_count': Coalesce(Subquery(count), Value(0), output_field=IntegerField()),
+    }
+
+
+def adjust_totals(customer_id, total_cost, sign=1):
+    Customer.objects.filter(pk=customer_id).update(
+            total_spent=F('total_spent') + sign * Decimal(str(total_cost)),
+            order_count=F('order_count') + sign,
+    )
+    transaction.on_commit(partial(evict_user_tokens, [customer_id]))
+
+
+def customer_id_batches(batch_size):
+    last_id = 0
+    while True:
+        ids = list(Customer.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def backfill_totals(ids):
+    totals = order_totals()
+    with transaction.atomic():
+        # Locking the customers first makes concurrent bookings for them wait until the batch is recomputed.
+        list(Customer.objects.select_for_update().filter(pk__in=ids).values_list('pk', flat=True))
+        return Customer.objects.filter(pk__in=ids).update(
+                total_spent=totals['expected_total_spent'],
+                order_count=totals['expected_order_count'],
+        )
+
+
+def find_inconsistent(ids):
+    return Customer.objects.filter(pk__in=ids).annotate(**order_totals()).filter(
+            ~Q(total_spent=F('expected_total_spent')) | ~Q(order_count=F('expected_order_count'))
+    ).values('pk', 'username', 'total_spent', 'expected_total_spent', 'order_count', 'expected_order_count')
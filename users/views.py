@@ -1,11 +1,14 @@
+import datetime
+
+from django.conf import settings
 from django.contrib.auth import login
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.views import LoginView, LogoutView
-from django.db.models import Sum
+from django.db.models import Q
+from django.http import Http404
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, DetailView
 
-from movie_shows.models import Order
 from users.forms import RegisterForm
 from users.models import Customer
 
@@ -41,7 +44,27 @@ class CustomerDetailView(LoginRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['orders'] = Order.objects.filter(customer=self.object).all()
-        total_spent = Order.objects.filter(customer=self.object).aggregate(Sum('total_cost'))
-        context['total_spent'] = total_spent['total_cost__sum']
+        orders = self.object.orders.history().select_related('movie_show__movie').only(
+                'seat_quantity', 'total_cost', 'ordered_at', 'movie_show__movie__title',
+        )
+        cursor = self.request.GET.get('before')
+        if cursor:
+            ordered_at, pk = self.parse_cursor(cursor)
+            orders = orders.filter(Q(ordered_at__lt=ordered_at) | Q(ordered_at=ordered_at, pk__lt=pk))
+
+        page_size = settings.ORDER_HISTORY_PAGE_SIZE
+        orders = list(orders[:page_size + 1])
+        context['orders'] = orders[:page_size]
+        context['next_cursor'] = None
+        if len(orders) > page_size:
+            last = orders[page_size - 1]
+            context['next_cursor'] = f'{last.ordered_at.isoformat()}_{last.pk}'
+        context['total_spent'] = self.object.total_spent
         return context
+
+    def parse_cursor(self, cursor):
+        try:
+            ordered_at, pk = cursor.split('_')
+            return datetime.date.fromisoformat(ordered_at), int(pk)
+        except ValueError:
+            raise Http404('Invalid cursor')